@@ -0,0 +1,100 @@
+# UltraSteelChallenge/app/api/cache.py
+
+import json
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Hashable, Optional, Tuple
+from fastapi import Request, Response
+
+
+class ResponseCache:
+    """
+    Serialized JSON bodies keyed on (endpoint, params, store version).
+
+    The store version only grows, so when a body for a newer version is
+    stored, every entry of an older version is dropped: it can never be
+    requested again. ``max_entries`` bounds the cache for the current version.
+    ``build`` returns a JSON-serializable value, or bytes that are already JSON.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], bytes]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, endpoint: str, params: Hashable, version: int, build: Callable[[], Any]) -> bytes:
+        key = (endpoint, params)
+        with self._lock:
+            if version == self._version and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        body = build()
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._entries.clear()
+                self._version = version
+            if version == self._version:
+                self._entries[key] = body
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "version": self._version, "hits": self.hits, "misses": self.misses}
+
+    def metric_families(self) -> list:
+        return [
+            ("response_cache_hits_total", "counter", "Read responses served from the cache.", [({}, self.hits)]),
+            ("response_cache_misses_total", "counter", "Read responses that had to be serialized.", [({}, self.misses)]),
+        ]
+
+
+def _not_modified(request: Request, etag: str, modified_at: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified has whole seconds, so compare at that precision: the
+        # header we sent must match even when the change was mid-second
+        return int(modified_at) <= since
+    return False
+
+
+def conditional_json(request: Request, cache: ResponseCache, endpoint: str, params: Hashable,
+                     version: Tuple[int, float], build: Callable[[], Any]) -> Response:
+    """
+    JSON response with ETag/Last-Modified for the given store version. Answers
+    304 when the client already has this version, and otherwise reuses the
+    serialized body cached for (endpoint, params, version).
+    """
+    number, modified_at = version
+    etag = f'"{number}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified_at, usegmt=True),
+        # Clients may keep the body but must revalidate before using it
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, etag, modified_at):
+        return Response(status_code=304, headers=headers)
+    body = cache.get_or_build(endpoint, params, number, build)
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,14 +1,46 @@
 # UltraSteelChallenge/app/api/endpoints.py
 
-from fastapi import APIRouter, HTTPException
+import json
+from itertools import islice
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from app.models.item import InventoryItem
+from app.models.record import records_to_json
 from app.database import client as db
 from app.rfid.rfid_module import RFIDModule
+from app.rfid.encoder import EncodeJob, encode_jobs
+from app.utils.metrics import registry, CONTENT_TYPE
+from app.api.cache import ResponseCache, conditional_json
+from app.config import EPC_FORMAT
 from datetime import datetime
 
 router = APIRouter()
 rfid_module = RFIDModule()
 
+MAX_PAGE_SIZE = 1000
+
+# Serialized read responses, reused until the inventory version changes
+response_cache = ResponseCache()
+registry.register_collector(response_cache.metric_families)
+
+
+def _bulk_response(items: List[InventoryItem], results: List[int], invalid: Optional[Dict[int, dict]] = None) -> dict:
+    # ``invalid`` maps positions in the request to the entries that could not be read
+    invalid = invalid or {}
+    accepted = sum(results)
+    added = iter(
+        {"uid": item.uid, "status": "accepted" if result == 1 else "duplicate"}
+        for item, result in zip(items, results)
+    )
+    return {
+        "message": f"{accepted} items added",
+        "accepted": accepted,
+        "duplicates": len(results) - accepted,
+        "invalid": len(invalid),
+        "results": [invalid[i] if i in invalid else next(added) for i in range(len(results) + len(invalid))],
+    }
+
 @router.get("/health")
 def health_check():
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
@@ -30,10 +62,11 @@ def add_inventory(item: InventoryItem):
 @router.post("/add_from_tag/{epc_ascii}")
 def add_from_tag(epc_ascii: str):
     """
-    Agrega un ítem al inventario a partir del EPC leído de una etiqueta.
+    Agrega un ítem al inventario a partir del EPC leído de una etiqueta
+    (12 caracteres ASCII o 24 dígitos hex de una etiqueta binaria).
     """
     try:
-        item = InventoryItem.from_epc_ascii(epc_ascii)
+        item = InventoryItem.from_epc(epc_ascii)
         result = db.add_item(item)
         if result == 0:
             raise HTTPException(status_code=400, detail="Item already exists")
@@ -41,6 +74,36 @@ def add_from_tag(epc_ascii: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/add_bulk")
+def add_inventory_bulk(items: List[InventoryItem]):
+    """
+    Agrega varios ítems al inventario en una sola escritura.
+    """
+    try:
+        return _bulk_response(items, db.add_items_bulk(items))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/add_from_tags")
+def add_from_tags(epcs: List[str] = Body(...)):
+    """
+    Agrega varios ítems a partir de una lista de EPCs leídos de etiquetas.
+    Los EPCs que no se pueden leer quedan como "invalid" en ``results``; solo
+    se rechaza la petición (422) si no se puede leer ninguno.
+    """
+    items, invalid = [], {}
+    for i, epc in enumerate(epcs):
+        try:
+            items.append(InventoryItem.from_epc(epc))
+        except ValueError as e:
+            invalid[i] = {"epc": epc, "status": "invalid", "error": str(e)}
+    if invalid and not items:
+        raise HTTPException(status_code=422, detail=_bulk_response([], [], invalid))
+    try:
+        return _bulk_response(items, db.add_items_bulk(items), invalid)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/exit_item/{uid}")
 def exit_inventory(uid: str):
     """
@@ -54,28 +117,124 @@ def exit_inventory(uid: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _ndjson_lines(items):
+    for item in items:
+        yield item.to_json() + "\n"
+
 @router.get("/get_all_items")
-def list_inventory():
+def list_inventory(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after_uid: Optional[str] = None,
+    sku: Optional[str] = None,
+    lot: Optional[str] = None,
+    status: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """
+    Devuelve los ítems del inventario.
+    Con ``limit``/``after_uid`` pagina por UID, ``sku``/``lot``/``status`` filtran
+    en el servidor y ``format=ndjson`` transmite un ítem por línea sin cargar todo en memoria.
+    Las respuestas JSON llevan ETag y responden 304 si el inventario no cambió.
+    """
+    try:
+        if format == "ndjson":
+            items = db.iter_items(sku, lot, status, after_uid)
+            if limit is not None:
+                items = islice(items, limit)
+            return StreamingResponse(_ndjson_lines(items), media_type="application/x-ndjson")
+
+        def build():
+            # Serialized straight from the stored records, without a dict per item
+            if limit is None and after_uid is None and sku is None and lot is None and status is None:
+                return f'{{"items": {records_to_json(db.get_all_items())}}}'.encode()
+            if limit is None:
+                items, next_after_uid = db.iter_items(sku, lot, status, after_uid), None
+            else:
+                items, next_after_uid = db.get_items_page(limit, after_uid, sku, lot, status)
+            return f'{{"items": {records_to_json(items)}, "next_after_uid": {json.dumps(next_after_uid)}}}'.encode()
+
+        params = (limit, after_uid, sku, lot, status)
+        return conditional_json(request, response_cache, "get_all_items", params, db.get_version(), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/summary")
+def summary(request: Request):
+    """
+    Devuelve conteos por sku, lote y estado, y el valor total del stock.
+    """
+    try:
+        return conditional_json(request, response_cache, "summary", (), db.get_version(), db.get_summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analytics/group_by")
+def group_by(request: Request, by: str = Query("lot", pattern="^(sku|lot|received_by|date|status)$"),
+             sku: Optional[str] = None, lot: Optional[str] = None, status: Optional[str] = None):
+    """
+    Cuenta ítems y suma su precio agrupando por un campo, con filtros opcionales.
+    """
+    try:
+        params = (by, sku, lot, status)
+        return conditional_json(request, response_cache, "group_by", params, db.get_version(),
+                                lambda: db.group_items(by, sku=sku, lot=lot, status=status))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes")
+def list_changes(since: int = Query(0, ge=0), limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                 epoch: Optional[str] = None):
+    """
+    Cambios del inventario posteriores a ``since`` (número de secuencia), para
+    sincronizar clientes sin descargar todo el inventario. Con ``resync_required``
+    el cliente debe recargar /get_all_items y continuar desde ``last_seq``.
+    """
+    try:
+        return db.get_changes(since, limit, epoch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/movements/daily")
+def daily_movements(days: int = Query(90, ge=1, le=3660), end: Optional[str] = None,
+                    lot: Optional[str] = None, sku: Optional[str] = None):
+    """
+    Entradas y salidas por día de los últimos ``days`` días hasta ``end``
+    (fecha %j%y, hoy por defecto), opcionalmente de un lote o un sku.
+    """
+    try:
+        return {"lot": lot, "sku": sku, "days": db.get_daily_movements(days, end, lot=lot, sku=sku)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/movements/stock")
+def stock_on_date(date: str, lot: Optional[str] = None, sku: Optional[str] = None):
     """
-    Devuelve todos los ítems del inventario.
+    Nivel de stock al final del día ``date`` (fecha %j%y), opcionalmente de un lote o un sku.
     """
     try:
-        items = db.get_all_items()
-        return {"items": [item.to_dict() for item in items]}
+        return {"date": date, "lot": lot, "sku": sku, "stock": db.get_stock_on(date, lot=lot, sku=sku)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/find_item_by_uid/{uid}")
-def get_item(uid: str):
+def get_item(uid: str, request: Request):
     """
     Busca un ítem por UID.
     """
-    try:
+    def build():
         item = db.find_item_by_uid(uid)
         print(item)
         if item is None:
             return {"item": "Item not found"}
         return {"item": item.to_dict()}
+
+    try:
+        return conditional_json(request, response_cache, "find_item_by_uid", uid, db.get_version(), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -91,6 +250,11 @@ def modify_item(uid: str, updated_item: InventoryItem):
             raise HTTPException(status_code=404, detail="Item not found")
         db.update_item(uid, updated_item)
         return {"message": "Item updated", "data": updated_item.to_dict()}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # El nuevo uid ya pertenece a otro ítem
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -130,6 +294,44 @@ def start_reading():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/start_portal")
+def start_portal():
+    """
+    Inicia los lectores del portal (exterior e interior) a la vez: la dirección
+    de cada pallet se deduce del orden en que pasa por las antenas.
+    """
+    try:
+        rfid_module.start_portal()
+        return {"message": "Portal reading started", "readers": rfid_module.readers.portal_names}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/portal")
+def portal_status():
+    """
+    Devuelve las etiquetas que están pasando por el portal y sus contadores.
+    """
+    return {**rfid_module.portal.stats(), "tags": rfid_module.portal.active()}
+
+@router.get("/reading_stats")
+def reading_stats():
+    """
+    Devuelve estadísticas de lectura, incluidas las lecturas repetidas filtradas.
+    """
+    try:
+        return rfid_module.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Métricas en formato de texto de Prometheus.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 @router.post("/stop_reading")
 def stop_reading():
     """
@@ -141,13 +343,77 @@ def stop_reading():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/readers")
+def list_readers():
+    """
+    Devuelve el estado de todos los lectores configurados.
+    """
+    return {"readers": rfid_module.readers.statuses()}
+
+@router.get("/readers/{name}")
+def reader_status(name: str):
+    """
+    Devuelve el estado de un lector.
+    """
+    try:
+        return rfid_module.readers.status(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Reader not found")
+
+@router.post("/readers/{name}/start")
+def start_reader(name: str, role: Optional[str] = None):
+    """
+    Inicia la lectura en un lector (opcionalmente con otro rol: entry/exit).
+    """
+    try:
+        rfid_module.readers.start(name, role)
+        return {"message": f"Reader '{name}' started"}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Reader not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/readers/{name}/stop")
+def stop_reader(name: str):
+    """
+    Detiene la lectura en un lector.
+    """
+    try:
+        rfid_module.readers.stop(name)
+        return {"message": f"Reader '{name}' stopped"}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Reader not found")
+
 @router.post("/write_tag")
 def write_to_tag(data: str):
     """
     Escribe datos a una etiqueta RFID.
     """
     try:
-        rfid_module.write(data)
+        if not rfid_module.write(data):
+            raise HTTPException(status_code=500, detail="RFID tag write failed")
         return {"message": "Data written to RFID tag"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/encode_jobs")
+def create_encode_job(items: List[InventoryItem], epc_format: str = Query(EPC_FORMAT, pattern="^(ascii|binary)$")):
+    """
+    Inicia en segundo plano la escritura y verificación de un lote de etiquetas.
+    ``epc_format`` elige el formato del EPC: binario (v1) o ASCII (etiquetas antiguas).
+    """
+    try:
+        job = encode_jobs.submit(EncodeJob(items, epc_format=epc_format))
+        return {"message": "Encode job started", "job_id": job.id, "total": len(items)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/encode_jobs/{job_id}")
+def get_encode_job(job_id: str):
+    """
+    Devuelve el progreso y el estado por etiqueta de un lote de escritura.
+    """
+    job = encode_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Encode job not found")
+    return job.to_dict()
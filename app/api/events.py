@@ -0,0 +1,63 @@
+# UltraSteelChallenge/app/api/events.py
+
+import asyncio
+import json
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.utils.event_bus import tag_events
+
+router = APIRouter()
+
+SSE_KEEPALIVE = 15  # seconds
+
+
+@router.websocket("/ws/tags")
+async def tag_events_websocket(websocket: WebSocket):
+    """
+    Envía cada lectura de etiqueta en tiempo real por WebSocket.
+    """
+    await websocket.accept()
+    subscription = tag_events.subscribe()
+
+    async def forward():
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    # Forward events in the background and keep receiving to notice disconnects
+    sender = asyncio.create_task(forward())
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        subscription.close()
+
+@router.get("/events/tags")
+async def tag_events_stream(request: Request):
+    """
+    Envía cada lectura de etiqueta en tiempo real como Server-Sent Events.
+    """
+    subscription = tag_events.subscribe()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: tag\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/events/stats")
+def tag_events_stats():
+    """
+    Devuelve estadísticas del bus de eventos (suscriptores y eventos descartados).
+    """
+    return tag_events.stats()
@@ -0,0 +1,230 @@
+# UltraSteelChallenge/app/benchmarks/bench_database.py
+#
+# Scaling benchmark of the inventory client: add_item, find_item_by_uid,
+# update_item, exit_item and count_items_by_lot on synthetic datasets of
+# growing size. Reports ops/s, p50/p99 latency and peak memory, and saves the
+# results as JSON so runs can be compared.
+#
+# A latency that grows with the dataset size is flagged: every operation here
+# should stay roughly flat, so a growth exponent near 1 means a linear scan
+# per call (quadratic over a batch) slipped into the client.
+#
+# Uso: python -m app.benchmarks.bench_database [--sizes 1000 10000 100000 1000000]
+#          [--backend csv|sqlite|record] [--ops 2000] [--budget 5] [--output results.json] [--compare previous.json]
+
+import argparse
+import json
+import math
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.database.client import (
+    add_item, add_items_bulk, find_item_by_uid, update_item, exit_item, count_items_by_lot,
+    init_db, reset_store
+)
+from app.models.item import InventoryItem
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS = ("add_item", "find_item_by_uid", "update_item", "exit_item", "count_items_by_lot")
+SUFFIXES = {"csv": ".csv", "sqlite": ".db", "record": ".rec"}
+# Largest accepted growth exponent of p50 latency between the smallest and largest size
+MAX_EXPONENT = 0.5
+# Time limit per operation and size; at least MIN_OPS calls are always timed
+BUDGET_SECONDS = 5.0
+MIN_OPS = 20
+
+_UID_ALPHABET = string.digits + string.ascii_uppercase
+
+
+def make_uid(n: int, width: int = 6) -> str:
+    """
+    Base-36 uid; the 2-character EPC uid only covers 1296 items, not enough for a scaling run.
+    """
+    chars = []
+    for _ in range(width):
+        n, digit = divmod(n, 36)
+        chars.append(_UID_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def make_items(count: int, start: int = 0, seed: int = 0, lots: int = 100) -> List[InventoryItem]:
+    """
+    Synthetic InventoryItems with unique uids, spread over ``lots`` lots and ten SKUs.
+    """
+    rng = random.Random(seed)
+    items = []
+    for n in range(start, start + count):
+        items.append(InventoryItem(
+            sku=rng.choice(string.ascii_uppercase[:10]),
+            lot=f"{rng.choice(string.ascii_uppercase)}{rng.randrange(lots) % 10}",
+            uid=make_uid(n),
+            received_by=rng.choice(["DC", "JM", "AL", "RG"]),
+            date=f"{rng.randint(1, 365):03d}{rng.randint(22, 25)}",
+            price=round(rng.uniform(1, 500), 2),
+        ))
+    return items
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(operation: Callable[[int], object], count: int, budget: float = BUDGET_SECONDS) -> dict:
+    """
+    Time up to ``count`` calls, stopping early (after MIN_OPS calls) once ``budget``
+    seconds are spent, so an O(n) operation on 1M rows does not run for hours.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - t0)
+        if i + 1 >= MIN_OPS and t0 - start > budget:
+            break
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed if elapsed else float("inf"),
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def bench_size(size: int, backend: str, ops: int, budget: float = BUDGET_SECONDS, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    ops = min(ops, size)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / f"inventory{SUFFIXES[backend]}"
+        init_db(db_file)
+        dataset = make_items(size, seed=seed)
+
+        # Peak memory of loading the dataset into the store
+        tracemalloc.start()
+        start = time.perf_counter()
+        add_items_bulk(dataset, db_file)
+        load_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        uids = [item.uid for item in rng.sample(dataset, ops)]
+        lots = sorted({item.lot for item in dataset})
+        new_items = make_items(ops, start=size, seed=seed + 1)
+        del dataset
+
+        def update(i):
+            item = find_item_by_uid(uids[i], db_file)
+            update_item(uids[i], item._replace(price=item.price + 1), db_file)
+
+        # exit_item runs last: it flips the same uids that the earlier operations used
+        operations = {
+            "add_item": lambda i: add_item(new_items[i], db_file),
+            "find_item_by_uid": lambda i: find_item_by_uid(uids[i], db_file),
+            "update_item": update,
+            "exit_item": lambda i: exit_item(uids[i], db_file),
+            "count_items_by_lot": lambda i: count_items_by_lot(lots[i % len(lots)], db_file),
+        }
+        results = {name: measure(operations[name], ops, budget) for name in OPERATIONS}
+        reset_store(db_file)
+
+    return {
+        "size": size,
+        "load_seconds": load_seconds,
+        "load_rows_per_sec": size / load_seconds if load_seconds else float("inf"),
+        "peak_memory_mb": peak / 2**20,
+        "operations": results,
+    }
+
+
+def growth_exponents(runs: List[dict]) -> Dict[str, float]:
+    """
+    Slope of log(p50) against log(size) between the smallest and largest run:
+    ~0 for constant time, ~1 for a per-call scan.
+    """
+    if len(runs) < 2:
+        return {}
+    small, large = runs[0], runs[-1]
+    size_ratio = math.log(large["size"] / small["size"])
+    exponents = {}
+    for name in OPERATIONS:
+        p50_small = small["operations"][name]["p50_us"]
+        p50_large = large["operations"][name]["p50_us"]
+        exponents[name] = math.log(p50_large / p50_small) / size_ratio if p50_small > 0 else 0.0
+    return exponents
+
+
+def print_run(run: dict):
+    print(f"\n{run['size']:,} rows  (load {run['load_rows_per_sec']:,.0f} rows/s, "
+          f"peak {run['peak_memory_mb']:.1f} MB)")
+    for name, result in run["operations"].items():
+        print(f"  {name:<20} {result['ops']:>6} calls {result['ops_per_sec']:>12,.0f} ops/s  "
+              f"p50 {result['p50_us']:>9.1f} us  p99 {result['p99_us']:>9.1f} us")
+
+
+def compare(report: dict, previous: dict):
+    previous_runs = {run["size"]: run for run in previous.get("runs", [])}
+    print(f"\nCompared with {previous.get('created_at')} ({previous.get('backend')}):")
+    for run in report["runs"]:
+        old = previous_runs.get(run["size"])
+        if old is None:
+            continue
+        for name, result in run["operations"].items():
+            old_result = old["operations"].get(name)
+            if old_result:
+                change = result["ops_per_sec"] / old_result["ops_per_sec"] - 1
+                print(f"  {run['size']:>9,} {name:<20} {change:>+8.1%} ops/s")
+
+
+def main(sizes: List[int] = DEFAULT_SIZES, backend: str = "csv", ops: int = 2000,
+         output: Optional[Path] = None, previous: Optional[Path] = None,
+         budget: float = BUDGET_SECONDS) -> int:
+    runs = []
+    for size in sorted(sizes):
+        runs.append(bench_size(size, backend, ops, budget))
+        print_run(runs[-1])
+
+    exponents = growth_exponents(runs)
+    regressions = [name for name, exponent in exponents.items() if exponent > MAX_EXPONENT]
+    if exponents:
+        print("\nGrowth exponent of p50 latency (0 = flat, 1 = linear per call):")
+        for name, exponent in exponents.items():
+            print(f"  {name:<20} {exponent:>6.2f}{'  ⚠ grows with the dataset' if name in regressions else ''}")
+
+    report = {
+        "benchmark": "database",
+        "backend": backend,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "ops_per_size": ops,
+        "runs": runs,
+        "growth_exponents": exponents,
+        "regressions": regressions,
+    }
+    if previous is not None:
+        compare(report, json.loads(previous.read_text()))
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Results saved to {output}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the inventory database layer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backend", choices=sorted(SUFFIXES), default="csv")
+    parser.add_argument("--ops", type=int, default=2000, help="Timed calls per operation and size.")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS,
+                        help="Seconds spent at most on each operation and size.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument("--compare", type=Path, help="Previous JSON results to compare with.")
+    args = parser.parse_args()
+    sys.exit(main(args.sizes, args.backend, args.ops, args.output, args.compare, args.budget))
@@ -0,0 +1,64 @@
+# UltraSteelChallenge/app/benchmarks/bench_pipeline.py
+#
+# Load test of the full tag -> parse -> queue -> DB pipeline against the simulated reader.
+#
+# Uso: python -m app.benchmarks.bench_pipeline [tags_in_field] [seconds] [readers] [ascii|binary]
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from app.database.client import add_items_bulk, init_db, reset_store
+from app.rfid.ingest_queue import IngestQueue
+from app.rfid.manager import ReaderManager, ReaderConfig
+from app.rfid.transport import close_transport
+
+
+def main(tags: int = 1000, seconds: float = 5.0, readers: int = 1, epc_format: str = "ascii"):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "inventory.csv"
+        init_db(db_file)
+        counts = {"tags": 0, "added": 0}
+        lock = threading.Lock()
+
+        def apply_batch(batch):
+            added = sum(add_items_bulk([epc_ascii for epc_ascii, _, _ in batch], db_file))
+            with lock:
+                counts["tags"] += len(batch)
+                counts["added"] += added
+
+        ingest_queue = IngestQueue(apply_batch, policy="drop", name="bench")
+
+        # Dedupe off: every read goes to the database, as the worst case
+        ports = [f"sim://bench{n}?tags={tags}&rounds=20&seed={n}&epc={epc_format}" for n in range(readers)]
+        manager = ReaderManager(
+            [ReaderConfig(f"bench{n}", port=port, mode="multi", dedupe_ttl=0) for n, port in enumerate(ports)],
+            ingest=lambda epc_ascii, role, reader_name: ingest_queue.put((epc_ascii, role, reader_name)),
+        )
+        start = time.perf_counter()
+        manager.start_all()
+        time.sleep(seconds)
+        manager.stop_all()
+        ingest_queue.flush()
+        elapsed = time.perf_counter() - start
+
+        frames = sum(status["transport"]["frames"] for status in manager.statuses())
+        errors = sum(status["transport"]["checksum_errors"] for status in manager.statuses())
+        for port in ports:
+            close_transport(port)
+        reset_store(db_file)
+
+    print(f"{readers} reader(s), {tags} {epc_format} tags in field each, {elapsed:.1f} s")
+    print(f"frames parsed   {frames:>10}  {frames / elapsed:>12,.0f} /s  ({errors} checksum errors)")
+    print(f"tags ingested   {counts['tags']:>10}  {counts['tags'] / elapsed:>12,.0f} /s")
+    print(f"new items       {counts['added']:>10}")
+    queue_stats = ingest_queue.stats()
+    print(f"batches         {queue_stats['batches']:>10}  avg {queue_stats['avg_batch_size']:.1f} tags, "
+          f"{queue_stats['dropped']} dropped")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:5]
+    main(int(args[0]) if args else 1000, float(args[1]) if len(args) > 1 else 5.0,
+         int(args[2]) if len(args) > 2 else 1, args[3] if len(args) > 3 else "ascii")
@@ -0,0 +1,59 @@
+# UltraSteelChallenge/app/benchmarks/bench_protocol.py
+#
+# Microbenchmark: frames parsed per second by FrameParser against the old
+# hex-string + regex path of _read_loop.
+#
+# Uso: python -m app.benchmarks.bench_protocol [frames] [chunk_size]
+
+import random
+import re
+import sys
+import time
+from app.rfid.protocol import FrameParser, build_notification
+
+
+def make_stream(count: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    alphabet = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    return b"".join(build_notification(bytes(rng.choice(alphabet) for _ in range(12))) for _ in range(count))
+
+
+def legacy_parse(response: bytes) -> list:
+    # Copy of the previous _read_loop parsing, kept here only for comparison
+    response_str = ' '.join(f'{b:02X}' for b in response)
+    tags = re.findall(r'AA(?: [0-9A-F]{2})*? DD', response_str.strip())
+    epcs = []
+    for tag in tags:
+        tag_parts = tag.split(" ")
+        try:
+            header_index = tag_parts.index('AA')
+            epc_len = int(tag_parts[header_index + 2], 16) // 2
+            epc_data = tag_parts[header_index + 8:header_index + 3 + epc_len]
+            epcs.append(''.join(chr(int(b, 16)) for b in epc_data if 32 <= int(b, 16) <= 126))
+        except Exception:
+            pass
+    return epcs
+
+
+def bench(name: str, parse, chunks: list, expected: int) -> float:
+    start = time.perf_counter()
+    parsed = sum(len(parse(chunk)) for chunk in chunks)
+    elapsed = time.perf_counter() - start
+    rate = parsed / elapsed if elapsed else float("inf")
+    print(f"{name:<14} {parsed:>8}/{expected} frames  {elapsed * 1000:9.1f} ms  {rate:>12,.0f} frames/s")
+    return rate
+
+
+def main(count: int = 50000, chunk_size: int = 64):
+    stream = make_stream(count)
+    chunks = [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+    print(f"{count} notification frames, {len(stream)} bytes, read in {chunk_size}-byte chunks\n")
+    legacy = bench("regex (old)", legacy_parse, chunks, count)
+    parser = FrameParser()
+    current = bench("FrameParser", parser.feed_tags, chunks, count)
+    print(f"\nSpeed-up: {current / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
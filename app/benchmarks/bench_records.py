@@ -0,0 +1,76 @@
+# UltraSteelChallenge/app/benchmarks/bench_records.py
+#
+# Benchmark of the read path of /get_all_items: loading the CSV into rows and
+# serializing them to JSON, with pydantic InventoryItem models (the previous
+# path) against trusted ItemRecord tuples. Reports time and the memory
+# allocated per row (tracemalloc).
+#
+# Uso: python -m app.benchmarks.bench_records [rows]
+
+import csv
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord, records_to_json
+from app.database.backend import FIELDS
+from app.benchmarks.bench_database import make_items
+
+
+def legacy_load(path: Path) -> list:
+    # Previous store load: one validated model per row, copied again on every read
+    with open(path, mode='r', newline='') as file:
+        items = [InventoryItem(**row) for row in csv.DictReader(file)]
+    return [item.model_copy() for item in items]
+
+def legacy_serialize(items: list) -> bytes:
+    return json.dumps({"items": [item.to_dict() for item in items]}).encode()
+
+def record_load(path: Path) -> list:
+    with open(path, mode='r', newline='') as file:
+        reader = csv.reader(file)
+        next(reader)
+        return [ItemRecord.from_csv(*row) for row in reader]
+
+def record_serialize(records: list) -> bytes:
+    return f'{{"items": {records_to_json(records)}}}'.encode()
+
+
+def measure(name: str, load, serialize, path: Path, rows: int) -> dict:
+    start = time.perf_counter()
+    items = load(path)
+    loaded = time.perf_counter()
+    body = serialize(items)
+    done = time.perf_counter()
+    del items
+    # Allocation is measured on a separate run: tracemalloc slows everything down
+    tracemalloc.start()
+    items = load(path)
+    per_row = tracemalloc.get_traced_memory()[0] / rows
+    tracemalloc.stop()
+    print(f"{name:<22} load {(loaded - start) * 1000:8.1f} ms   serialize {(done - loaded) * 1000:8.1f} ms"
+          f"   {per_row:7.0f} B/row resident")
+    return {"load": loaded - start, "serialize": done - loaded, "bytes_per_row": per_row, "body": body}
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "inventory.csv"
+        with open(path, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            writer.writerows(ItemRecord.from_item(item) for item in make_items(rows))
+        print(f"{rows} rows\n")
+        legacy = measure("InventoryItem (old)", legacy_load, legacy_serialize, path, rows)
+        current = measure("ItemRecord", record_load, record_serialize, path, rows)
+    assert json.loads(legacy["body"]) == json.loads(current["body"]), "Both paths must produce the same JSON"
+    print(f"\nLoad speed-up: {legacy['load'] / current['load']:.1f}x, "
+          f"serialize speed-up: {legacy['serialize'] / current['serialize']:.1f}x, "
+          f"memory per row: {legacy['bytes_per_row'] / current['bytes_per_row']:.1f}x less")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -8,3 +8,51 @@ TIMEOUT = 1
 
 # Inventory item settings
 DATE = datetime.now().strftime('%j%y')  # e.g., 00325 for Jan 3, 2025
+
+# Storage settings
+STORAGE_BACKEND = 'csv'  # 'csv', 'sqlite' or 'record' (fixed-size records in a memory-mapped file)
+CSV_PATH = 'app/database/inventory.csv'
+SQLITE_PATH = 'app/database/inventory.db'
+RECORD_PATH = 'app/database/inventory.rec'
+FILE_LOCK_TIMEOUT = 10.0  # seconds a worker waits for the CSV lock file before giving up
+ANALYTICS_ENGINE = 'store'  # counts and summaries: 'store' (maintained aggregates) or 'columnar' (needs numpy)
+CHANGELOG_SIZE = 10000  # recent changes kept per inventory for /changes; older cursors must resync
+
+# RFID read deduplication
+DEDUPE_TTL = 5.0         # seconds a repeated read of the same EPC is ignored
+DEDUPE_MAX_TAGS = 10000  # EPCs remembered at most (LRU)
+
+# Inventory polling
+READ_MODE = 'multi'       # 'single': one poll command per cycle, 'multi': continuous multi-poll
+MULTI_POLL_COUNT = 10000  # inventory rounds per multi-poll command (1..65535)
+POLL_INTERVAL = 0.0       # extra pause between single-poll cycles, in seconds
+READ_TIMEOUT = 0.05       # serial read timeout; also the quiet gap that ends a single poll
+MULTI_POLL_REARM = 0.5    # seconds without data before the multi-poll command is sent again
+
+# Ingestion queue between the readers and the database
+INGEST_QUEUE_SIZE = 10000   # tag events buffered at most
+INGEST_BATCH_SIZE = 200     # events written per store operation at most
+INGEST_MAX_DELAY = 0.05     # seconds a batch waits to fill up after its first event
+INGEST_BACKPRESSURE = 'drop'  # full queue: 'drop' the new event or 'block' the reader
+
+# Entry/exit portals (readers with role 'portal')
+PORTAL_IDLE_TIMEOUT = 2.0  # seconds without reads that end a tag's passage through a portal
+PORTAL_MAX_TAGS = 10000    # passages tracked at once at most
+
+# Live tag events (WebSocket / SSE)
+EVENT_QUEUE_SIZE = 256  # events buffered per client before the oldest is dropped
+
+# Batch tag encoding
+ENCODE_RETRIES = 3  # write + verify attempts per tag
+ENCODE_JOB_TTL = 3600  # seconds a finished encode job stays available to /encode_jobs/{job_id}
+ENCODE_JOBS_MAX = 100  # finished encode jobs kept at most, the oldest are dropped first
+EPC_FORMAT = 'binary'  # layout written to new tags: 'binary' (v1, wide uid) or 'ascii' (legacy 12 characters)
+
+# Readers run by the ReaderManager, one worker per reader. Keys match ReaderConfig;
+# the first reader is the one used by /start_reading and /start_reading_exits.
+# A portal pairs two readers with role 'portal' and zone 'outside' / 'inside', e.g.
+#   {"name": "door_out", "port": "COM7", "role": "portal", "zone": "outside"},
+#   {"name": "door_in", "port": "COM8", "role": "portal", "zone": "inside"},
+READERS = [
+    {"name": "dock1", "port": SERIAL_PORT, "baudrate": BAUDRATE, "role": "entry"},
+]
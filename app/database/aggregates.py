@@ -0,0 +1,75 @@
+# UltraSteelChallenge/app/database/aggregates.py
+
+from typing import Dict, Iterable, Tuple
+from app.models.item import InventoryItem
+
+# Dimensions the summary is broken down by
+SUMMARY_FIELDS = ("sku", "lot", "status")
+# Prices are summed as integer millionths so adding and removing items never drifts
+VALUE_SCALE = 1_000_000
+
+
+def value_units(price: float) -> int:
+    return round(price * VALUE_SCALE)
+
+
+def build_summary(count: int, value: int, groups: Dict[str, Dict[str, Tuple[int, int]]]) -> dict:
+    """
+    Summary returned by every backend: totals plus count and value per sku, lot and status.
+    ``value`` and the group values are in millionths (see VALUE_SCALE).
+    """
+    by = {
+        field: {
+            key: {"count": group_count, "value": group_value / VALUE_SCALE}
+            for key, (group_count, group_value) in sorted(groups.get(field, {}).items())
+        }
+        for field in SUMMARY_FIELDS
+    }
+    in_stock = by["status"].get("1", {"count": 0, "value": 0.0})
+    return {
+        "total_items": count,
+        "total_value": value / VALUE_SCALE,
+        "in_stock": in_stock["count"],
+        "stock_value": in_stock["value"],
+        "by_sku": by["sku"],
+        "by_lot": by["lot"],
+        "by_status": by["status"],
+    }
+
+
+class InventoryAggregates:
+    """
+    Item count and price total overall and per sku, lot and status, kept up to
+    date with one O(1) ``add``/``remove`` per changed item.
+    """
+
+    def __init__(self, items: Iterable[InventoryItem] = ()):
+        self.clear()
+        for item in items:
+            self.add(item)
+
+    def clear(self):
+        self.count = 0
+        self.value = 0
+        self.groups: Dict[str, Dict[str, list]] = {field: {} for field in SUMMARY_FIELDS}
+
+    def add(self, item: InventoryItem, sign: int = 1):
+        units = sign * value_units(item.price)
+        self.count += sign
+        self.value += units
+        for field in SUMMARY_FIELDS:
+            key = getattr(item, field)
+            groups = self.groups[field]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0, 0]
+            group[0] += sign
+            group[1] += units
+            if group[0] == 0:
+                del groups[key]
+
+    def remove(self, item: InventoryItem):
+        self.add(item, sign=-1)
+
+    def to_dict(self) -> dict:
+        return build_summary(self.count, self.value, self.groups)
@@ -0,0 +1,131 @@
+# UltraSteelChallenge/app/database/backend.py
+
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple, Union
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+
+FIELDS = list(ItemRecord._fields)
+
+# Writes accept validated models or records read back from a store
+Item = Union[InventoryItem, ItemRecord]
+
+
+class StorageBackend(ABC):
+    """
+    Operations every inventory storage backend has to provide.
+
+    ``app.database.client`` only talks to this interface, so the CSV store, the
+    SQLite store and the record file store can be swapped through
+    ``STORAGE_BACKEND`` in ``app/config.py``.
+    Reads return immutable ``ItemRecord`` rows, built without pydantic validation.
+    """
+
+    INDEXED_FIELDS = ("lot", "sku", "status")
+
+    def load(self):
+        """
+        Refresh any state cached from disk. Backends without a cache do nothing.
+        """
+
+    def close(self):
+        """
+        Release open files or connections. Backends without any do nothing.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __contains__(self, uid: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get(self, uid: str) -> Optional[ItemRecord]:
+        """
+        Return the item with the given uid, or None.
+        """
+
+    @abstractmethod
+    def all(self) -> List[ItemRecord]:
+        """
+        Return every item in insertion order.
+        """
+
+    @abstractmethod
+    def iter_items(self, after_uid: Optional[str] = None, **filters: str) -> Iterator[ItemRecord]:
+        """
+        Yield items ordered by uid, starting after ``after_uid``.
+        ``filters`` maps indexed fields (lot, sku, status) to the value to match.
+        Implementations read in small chunks, so a full scan never holds the
+        whole table in memory and never keeps the store locked between chunks.
+        """
+
+    @abstractmethod
+    def count_by(self, field: str, value: str) -> int:
+        """
+        Count items whose indexed ``field`` equals ``value``.
+        """
+
+    @abstractmethod
+    def version(self) -> Tuple[int, float]:
+        """
+        Return ``(version, modified_at)``. The version grows with every change,
+        made by this process or any other one, and ``modified_at`` is the POSIX
+        timestamp of the last change. Equal versions mean equal data.
+        """
+
+    @abstractmethod
+    def summary(self) -> dict:
+        """
+        Item count and stock value overall and per sku, lot and status
+        (see ``app.database.aggregates.build_summary``). Kept up to date on every
+        change, so reading it never scans the inventory.
+        """
+
+    @abstractmethod
+    def rows_snapshot(self) -> Tuple[int, List[ItemRecord]]:
+        """
+        Return ``(version, rows)``: every item in insertion order, read
+        atomically with the version, for bulk readers such as ``app.database.columnar``.
+        """
+
+    @abstractmethod
+    def add(self, item: Item) -> bool:
+        """
+        Add an item unless its uid already exists. Returns True if it was added.
+        """
+
+    @abstractmethod
+    def add_many(self, items: List[Item]) -> List[bool]:
+        """
+        Add a batch of items in a single write. Items whose uid already exists,
+        in the store or earlier in the batch, are skipped.
+        Returns one flag per input item telling whether it was added.
+        """
+
+    @abstractmethod
+    def update(self, uid: str, updated_item: Item) -> bool:
+        """
+        Replace the item stored under ``uid``. Returns False if it does not exist.
+        """
+
+    @abstractmethod
+    def set_status(self, uid: str, status: str) -> bool:
+        """
+        Change only the status of an item. Returns False if it does not exist.
+        """
+
+    @abstractmethod
+    def set_status_many(self, uids: List[str], status: str) -> List[bool]:
+        """
+        Change the status of many items in a single write.
+        Returns one flag per uid telling whether the item exists.
+        """
+
+    @abstractmethod
+    def delete(self, uid: str) -> bool:
+        """
+        Remove an item. Returns False if it does not exist.
+        """
@@ -0,0 +1,229 @@
+# UltraSteelChallenge/app/database/changelog.py
+
+import csv
+import io
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from app.models.record import ItemRecord
+from app.database.filelock import FileLock, atomic_write
+from app.config import CHANGELOG_SIZE, FILE_LOCK_TIMEOUT
+
+OPS = ("add", "update", "exit", "delete")
+
+
+def changelog_path(file_path: Path) -> Path:
+    """
+    Change log file kept next to an inventory, e.g. inventory.csv.changes (a CSV file).
+    """
+    return Path(f"{file_path}.changes")
+
+
+class Change(NamedTuple):
+    seq: int
+    op: str                     # "add", "update", "exit" or "delete"
+    uid: str
+    item: Optional[ItemRecord]  # the new row for "add" and "update", None otherwise
+    at: float                   # POSIX timestamp of the change
+
+    def to_row(self) -> tuple:
+        return (self.seq, f"{self.at:.3f}", self.op, self.uid, *(self.item if self.item is not None else ()))
+
+    @classmethod
+    def from_row(cls, row: List[str]) -> "Change":
+        seq, at, op, uid, *item = row
+        return cls(int(seq), op, uid, ItemRecord.from_csv(*item) if item else None, float(at))
+
+    def to_dict(self) -> dict:
+        return {"seq": self.seq, "op": self.op, "uid": self.uid,
+                "item": self.item.to_dict() if self.item is not None else None, "at": self.at}
+
+
+class ChangeLog:
+    """
+    Bounded, sequence-numbered log of the inventory changes made through
+    ``app.database.client``, so mirrors can sync the deltas instead of
+    downloading the whole inventory again.
+
+    The log is an append-only CSV file next to the inventory, shared by every
+    worker process: appends hold ``<log>.lock``, which also stores the last
+    sequence number, and each process reads the rows others appended from
+    where it stopped reading. Sequence numbers start at 1 and have no gaps.
+    Only the last ``max_entries`` changes are served; once the file holds
+    twice that many it is rewritten with the recent ones. A client whose
+    cursor is older than that, or that comes from another log (a deleted and
+    recreated file, told apart by ``epoch``), has to resync from a full snapshot.
+
+    The client holds ``writing()`` around the store operation and its record,
+    so the log order is the order in which the store applied the changes,
+    across processes too.
+    """
+
+    def __init__(self, file_path: Path, max_entries: int = CHANGELOG_SIZE):
+        self.file_path = Path(file_path)
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(Path(f"{self.file_path}.lock"), FILE_LOCK_TIMEOUT)
+        self._entries: "deque[Change]" = deque(maxlen=max_entries)
+        self._offset = 0          # bytes of the file already read
+        self._rows = 0            # changes in the file, served or not
+        self._version = (0, 0)    # (last sequence number, trim generation) from the lock file
+        self.epoch: Optional[str] = None
+        self.last_seq = 0
+        with self._lock, self._file_lock:
+            self._sync()
+
+    # Reading the file
+    def _reset(self):
+        self._entries.clear()
+        self._offset, self._rows = 0, 0
+        self.epoch, self.last_seq = None, 0
+
+    def _sync(self):
+        # Read what other processes appended since the last call; holds the file lock
+        version = self._file_lock.read_version()
+        if version[1] != self._version[1]:
+            # Another process trimmed the file: read it again from the start
+            self._reset()
+        try:
+            size = os.stat(self.file_path).st_size
+        except FileNotFoundError:
+            self._reset()
+            size = 0
+        if size < self._offset:
+            self._reset()
+        if size > self._offset:
+            with open(self.file_path, mode='rb') as file:
+                file.seek(self._offset)
+                data = file.read()
+            self._offset += len(data)
+            for row in csv.reader(io.StringIO(data.decode())):
+                if not row:
+                    continue
+                if row[0] == "epoch":
+                    self.epoch = row[1]
+                    continue
+                change = Change.from_row(row)
+                self._entries.append(change)
+                self._rows += 1
+                self.last_seq = change.seq
+        self._version = version
+
+    def refresh(self):
+        """
+        Pick up changes logged by other processes. Costs one read of the lock file when there are none.
+        """
+        with self._lock:
+            if self._file_lock.read_version() != self._version:
+                with self._file_lock:
+                    self._sync()
+
+    @contextmanager
+    def writing(self):
+        """
+        Hold the log, for this thread and across processes, starting from the latest entries.
+        """
+        with self._lock, self._file_lock:
+            self._sync()
+            yield self
+
+    # Writing
+    def record(self, op: str, uid: str, item: Optional[ItemRecord] = None) -> int:
+        """
+        Append one change and return its sequence number.
+        """
+        return self.record_many(op, [(uid, item)])
+
+    def record_many(self, op: str, changes: Iterable[Tuple[str, Optional[ItemRecord]]]) -> int:
+        """
+        Append ``(uid, item)`` changes of one kind; returns the last sequence number.
+        """
+        if op not in OPS:
+            raise ValueError(f"Change op must be one of {OPS}.")
+        now = time.time()
+        with self.writing():
+            seq = self.last_seq
+            new = []
+            for uid, item in changes:
+                seq += 1
+                new.append(Change(seq, op, uid, item, now))
+            if not new:
+                return seq
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if self.epoch is None:
+                self.epoch = uuid.uuid4().hex[:12]
+                writer.writerow(("epoch", self.epoch))
+            writer.writerows(change.to_row() for change in new)
+            data = buffer.getvalue().encode()
+            with open(self.file_path, mode='ab') as file:
+                file.write(data)
+            self._offset += len(data)
+            self._rows += len(new)
+            self._entries.extend(new)
+            self.last_seq = seq
+            self._version = (seq, self._version[1])
+            if self._rows > 2 * self.max_entries:
+                self._trim()
+            self._file_lock.write_version(*self._version)
+            return seq
+
+    def _trim(self):
+        # Keep only the changes still served; other processes see the new trim generation
+        with atomic_write(self.file_path) as file:
+            writer = csv.writer(file)
+            writer.writerow(("epoch", self.epoch))
+            writer.writerows(change.to_row() for change in self._entries)
+        self._offset = os.stat(self.file_path).st_size
+        self._rows = len(self._entries)
+        self._version = (self._version[0], self._version[1] + 1)
+
+    # Reading
+    @property
+    def oldest_seq(self) -> int:
+        """
+        Sequence number of the oldest change still kept (last_seq + 1 when empty).
+        """
+        with self._lock:
+            return self._entries[0].seq if self._entries else self.last_seq + 1
+
+    def since(self, seq: int, limit: int, epoch: Optional[str] = None) -> dict:
+        """
+        Up to ``limit`` changes after ``seq``. ``resync_required`` is set, with
+        no changes, when the changes right after ``seq`` were already dropped
+        or ``seq``/``epoch`` belong to another log. The client then reloads the
+        full inventory and continues from the ``last_seq`` of this response.
+        """
+        self.refresh()
+        with self._lock:
+            oldest, last = self.oldest_seq, self.last_seq
+            resync = seq < oldest - 1 or seq > last or (epoch is not None and epoch != self.epoch)
+            changes: List[Change] = []
+            if not resync and seq < last:
+                # Sequence numbers have no gaps: seq + 1 is at a known position
+                start = seq + 1 - oldest
+                changes = [self._entries[i] for i in range(start, min(start + limit, len(self._entries)))]
+            current_epoch = self.epoch
+        next_seq = changes[-1].seq if changes else (last if resync else seq)
+        return {
+            "epoch": current_epoch,
+            "resync_required": resync,
+            "oldest_seq": oldest,
+            "last_seq": last,
+            "next_seq": next_seq,
+            "has_more": next_seq < last,
+            "changes": [change.to_dict() for change in changes],
+        }
+
+    def close(self):
+        with self._lock:
+            self._file_lock.close()
+
+    def stats(self) -> dict:
+        return {"epoch": self.epoch, "entries": len(self._entries), "max_entries": self.max_entries,
+                "oldest_seq": self.oldest_seq, "last_seq": self.last_seq}
@@ -1,70 +1,350 @@
 import csv
+import threading
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+from app.models.epc import decode_epc
+from app.config import STORAGE_BACKEND, CSV_PATH, SQLITE_PATH, RECORD_PATH, ANALYTICS_ENGINE
+from app.database.backend import StorageBackend, FIELDS
+from app.database.aggregates import VALUE_SCALE, value_units
+from app.database.store import InventoryStore
+from app.database.sqlite_store import SQLiteStore
+from app.database.record_store import RecordStore
+from app.database.columnar import ColumnarInventory, columnar_available
+from app.database.changelog import ChangeLog, changelog_path
+from app.database.ledger import MovementLedger, ledger_path, julian_to_ordinal
+from app.utils.metrics import DB_OPERATION_SECONDS, timed
 
-CSV_FILE = Path("app/database/inventory.csv")
-FIELDS = ["sku", "lot", "uid", "received_by", "date", "status", "price"]
+CSV_FILE = Path(CSV_PATH)
+SQLITE_FILE = Path(SQLITE_PATH)
+RECORD_FILE = Path(RECORD_PATH)
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+RECORD_SUFFIXES = {".rec"}
 
+# One store per file, shared by the API and the RFID reader thread
+_stores: Dict[Path, StorageBackend] = {}
+_stores_lock = threading.Lock()
+# Columnar snapshot per file, rebuilt when the store version moves on
+_columnar: Dict[Path, ColumnarInventory] = {}
+_columnar_lock = threading.Lock()
+# Recent changes per file, for incremental sync (see /changes)
+_changelogs: Dict[Path, ChangeLog] = {}
+# Movement ledger per file (see app.database.ledger)
+_ledgers: Dict[Path, MovementLedger] = {}
 
-def init_db(file_path: Path = CSV_FILE):
-    if not file_path.exists():
-        with open(file_path, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=FIELDS)
-            writer.writeheader()
 
-def add_item(item: InventoryItem, file_path: Path = CSV_FILE) -> int:
-    if find_item_by_uid(item.uid, file_path) is not None:
+def _resolve_path(file_path: Optional[Path]) -> Path:
+    if file_path is not None:
+        return Path(file_path)
+    if STORAGE_BACKEND == "sqlite":
+        return SQLITE_FILE
+    return RECORD_FILE if STORAGE_BACKEND == "record" else CSV_FILE
+
+def _backend(file_path: Path) -> type:
+    suffix = file_path.suffix.lower()
+    if suffix in SQLITE_SUFFIXES:
+        return SQLiteStore
+    return RecordStore if suffix in RECORD_SUFFIXES else InventoryStore
+
+def get_store(file_path: Optional[Path] = None) -> StorageBackend:
+    """
+    Return the process-resident store for ``file_path``, opening it on first use.
+    Without a path the backend configured in ``app/config.py`` is used; an
+    explicit path picks SQLite for .db/.sqlite files, the record file backend
+    for .rec files and CSV otherwise.
+    """
+    file_path = _resolve_path(file_path)
+    key = file_path.resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = _backend(file_path)(file_path)
+        return store
+
+def reset_store(file_path: Optional[Path] = None):
+    """
+    Drop the cached store for ``file_path`` so the next call reloads it from disk.
+    """
+    file_path = _resolve_path(file_path)
+    with _stores_lock:
+        store = _stores.pop(file_path.resolve(), None)
+    with _columnar_lock:
+        _columnar.pop(file_path.resolve(), None)
+    with _stores_lock:
+        log = _changelogs.pop(file_path.resolve(), None)
+        ledger = _ledgers.pop(file_path.resolve(), None)
+    for opened in (store, log, ledger):
+        if opened is not None:
+            opened.close()
+
+def get_changelog(file_path: Optional[Path] = None) -> ChangeLog:
+    """
+    Change log of the inventory at ``file_path``, kept in a file next to it
+    and shared by every worker process.
+    """
+    file_path = _resolve_path(file_path)
+    key = file_path.resolve()
+    with _stores_lock:
+        log = _changelogs.get(key)
+        if log is None:
+            log = _changelogs[key] = ChangeLog(changelog_path(file_path))
+        return log
+
+def get_changes(since: int, limit: int, epoch: Optional[str] = None, file_path: Optional[Path] = None) -> dict:
+    """
+    Up to ``limit`` changes after sequence number ``since`` (see ``ChangeLog.since``).
+    """
+    return get_changelog(file_path).since(since, limit, epoch)
+
+def get_ledger(file_path: Optional[Path] = None) -> MovementLedger:
+    """
+    Movement ledger of the inventory at ``file_path``. A missing ledger is
+    seeded from the items already in the inventory.
+    """
+    file_path = _resolve_path(file_path)
+    key = file_path.resolve()
+    with _stores_lock:
+        ledger = _ledgers.get(key)
+        if ledger is not None:
+            return ledger
+    store = get_store(file_path)
+    with _stores_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = _ledgers[key] = MovementLedger(ledger_path(file_path))
+            if not ledger.file_path.exists() and len(store):
+                ledger.backfill(store.all())
+        return ledger
+
+@contextmanager
+def _recording(file_path: Optional[Path]):
+    # Store, change log and ledger of one inventory. The log is held, across
+    # processes too, so changes are recorded in the order the store applies them.
+    log = get_changelog(file_path)
+    ledger = get_ledger(file_path)
+    with log.writing():
+        yield get_store(file_path), log, ledger
+
+def init_db(file_path: Optional[Path] = None):
+    file_path = _resolve_path(file_path)
+    if _backend(file_path) is not InventoryStore:
+        # Opening the store creates the schema or the record file
+        get_store(file_path)
+    elif not file_path.exists():
+        # Exclusive create: another worker may be initialising the same file
+        try:
+            with open(file_path, mode='x', newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDS)
+                writer.writeheader()
+        except FileExistsError:
+            return
+        reset_store(file_path)
+
+@timed(DB_OPERATION_SECONDS, operation="add_item")
+def add_item(item: Union[InventoryItem, ItemRecord], file_path: Optional[Path] = None) -> int:
+    # Repeated tag reads are the common case: reject them before taking the change log lock
+    if get_store(file_path).get(item.uid) is not None:
         return 0
-    with open(file_path, mode='a', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=FIELDS)
-        writer.writerow(item.to_dict())
-    return 1
+    with _recording(file_path) as (store, log, ledger):
+        added = store.add(item)
+        if added:
+            log.record("add", item.uid, ItemRecord.from_item(item))
+            if item.status == "1":
+                ledger.record("receive", [item])
+    return 1 if added else 0
+
+@timed(DB_OPERATION_SECONDS, operation="add_items_bulk")
+def add_items_bulk(items: List[Union[InventoryItem, ItemRecord, str]], file_path: Optional[Path] = None) -> List[int]:
+    """
+    Add many items at once. Strings are treated as EPCs read from tags, in
+    either layout (see ``app.models.epc``).
+    Duplicates are detected within the batch and against the store in one pass
+    and all accepted rows are written together.
+    Returns 1 (added) or 0 (duplicate) per input item, like ``add_item``.
+    """
+    items = [decode_epc(item) if isinstance(item, str) else item for item in items]
+    with _recording(file_path) as (store, log, ledger):
+        results = store.add_many(items)
+        accepted = [item for item, added in zip(items, results) if added]
+        log.record_many("add", [(item.uid, ItemRecord.from_item(item)) for item in accepted])
+        ledger.record("receive", [item for item in accepted if item.status == "1"])
+    return [1 if added else 0 for added in results]
 
-def get_all_items(file_path: Path = CSV_FILE) -> List[InventoryItem]:
-    if not file_path.exists():
+@timed(DB_OPERATION_SECONDS, operation="get_all_items")
+def get_all_items(file_path: Optional[Path] = None) -> List[ItemRecord]:
+    file_path = _resolve_path(file_path)
+    if _backend(file_path) is InventoryStore and not file_path.exists():
         return []
-    with open(file_path, mode='r') as file:
-        reader = csv.DictReader(file)
-        return [InventoryItem(**row) for row in reader]
-
-def find_item_by_uid(uid: str, file_path: Path = CSV_FILE) -> Optional[InventoryItem]:
-    items = get_all_items(file_path)
-    return next((item for item in items if item.uid == uid), None)
-
-def update_item(uid: str, updated_item: InventoryItem, file_path: Path = CSV_FILE):
-    items = get_all_items(file_path)
-    with open(file_path, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=FIELDS)
-        writer.writeheader()
-        for item in items:
-            if item.uid == uid:
-                writer.writerow(updated_item.to_dict())
-            else:
-                writer.writerow(item.to_dict())
-
-def delete_item(uid: str, file_path: Path = CSV_FILE):
-    items = get_all_items(file_path)
-    with open(file_path, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=FIELDS)
-        writer.writeheader()
-        for item in items:
-            if item.uid != uid:
-                writer.writerow(item.to_dict())
-
-def count_items_by_lot(lot: str, file_path: Path = CSV_FILE) -> int:
-    return sum(1 for item in get_all_items(file_path) if item.lot == lot)
-
-def count_items_by_sku(sku: str, file_path: Path = CSV_FILE) -> int:
-    return sum(1 for item in get_all_items(file_path) if item.sku == sku)
-
-def exit_item(uid: str, file_path: Path = CSV_FILE) -> bool:
-    item = find_item_by_uid(uid, file_path)
-    if item is None:
-        return False
-    item.set_status("0")
-    update_item(uid, item, file_path)
-    return True
+    return get_store(file_path).all()
+
+def iter_items(sku: Optional[str] = None, lot: Optional[str] = None, status: Optional[str] = None,
+               after_uid: Optional[str] = None, file_path: Optional[Path] = None) -> Iterator[ItemRecord]:
+    """
+    Lazily yield items ordered by uid, optionally filtered and starting after ``after_uid``.
+    """
+    return get_store(file_path).iter_items(after_uid=after_uid, sku=sku, lot=lot, status=status)
+
+@timed(DB_OPERATION_SECONDS, operation="get_items_page")
+def get_items_page(limit: int, after_uid: Optional[str] = None, sku: Optional[str] = None,
+                   lot: Optional[str] = None, status: Optional[str] = None,
+                   file_path: Optional[Path] = None) -> Tuple[List[ItemRecord], Optional[str]]:
+    """
+    Return up to ``limit`` items after ``after_uid`` and the cursor for the next page
+    (None when there are no more items).
+    """
+    items = list(islice(iter_items(sku, lot, status, after_uid, file_path), limit + 1))
+    if len(items) > limit:
+        return items[:limit], items[limit - 1].uid
+    return items, None
+
+@timed(DB_OPERATION_SECONDS, operation="find_item_by_uid")
+def find_item_by_uid(uid: str, file_path: Optional[Path] = None) -> Optional[ItemRecord]:
+    return get_store(file_path).get(uid)
+
+@timed(DB_OPERATION_SECONDS, operation="update_item")
+def update_item(uid: str, updated_item: Union[InventoryItem, ItemRecord], file_path: Optional[Path] = None):
+    with _recording(file_path) as (store, log, ledger):
+        current = store.get(uid)
+        if current is not None and store.update(uid, updated_item):
+            if updated_item.uid != uid:
+                # A re-keyed item disappears under its old uid
+                log.record("delete", uid)
+            log.record("update", updated_item.uid, ItemRecord.from_item(updated_item))
+            # A status edit moves the item in or out of stock
+            if current.status == "1" and updated_item.status != "1":
+                ledger.record("exit", [current])
+            elif current.status != "1" and updated_item.status == "1":
+                ledger.record("receive", [updated_item])
+            elif current.status == "1" and (current.lot, current.sku) != (updated_item.lot, updated_item.sku):
+                # Moved to another lot or sku: it leaves the old indexes and enters the new ones
+                ledger.record("exit", [current])
+                ledger.record("receive", [updated_item])
+
+@timed(DB_OPERATION_SECONDS, operation="delete_item")
+def delete_item(uid: str, file_path: Optional[Path] = None):
+    with _recording(file_path) as (store, log, ledger):
+        current = store.get(uid)
+        if current is not None and store.delete(uid):
+            log.record("delete", uid)
+            if current.status == "1":
+                ledger.record("delete", [current])
+
+def _use_columnar(engine: Optional[str]) -> bool:
+    return (engine or ANALYTICS_ENGINE) == "columnar" and columnar_available()
+
+@timed(DB_OPERATION_SECONDS, operation="get_columnar")
+def get_columnar(file_path: Optional[Path] = None) -> ColumnarInventory:
+    """
+    Columnar snapshot of the inventory for vectorized filters and group-bys.
+    Built from raw rows on first use and again only after the data changed.
+    """
+    store = get_store(file_path)
+    key = _resolve_path(file_path).resolve()
+    with _columnar_lock:
+        view = _columnar.get(key)
+        if view is not None and view.version == store.version()[0]:
+            return view
+        # Built under the lock so concurrent readers wait instead of building it twice
+        version, rows = store.rows_snapshot()
+        view = _columnar[key] = ColumnarInventory(rows, version)
+        return view
+
+@timed(DB_OPERATION_SECONDS, operation="count_items_by_lot")
+def count_items_by_lot(lot: str, file_path: Optional[Path] = None, engine: Optional[str] = None) -> int:
+    if _use_columnar(engine):
+        return get_columnar(file_path).count(lot=lot)
+    return get_store(file_path).count_by("lot", lot)
+
+@timed(DB_OPERATION_SECONDS, operation="count_items_by_sku")
+def count_items_by_sku(sku: str, file_path: Optional[Path] = None, engine: Optional[str] = None) -> int:
+    if _use_columnar(engine):
+        return get_columnar(file_path).count(sku=sku)
+    return get_store(file_path).count_by("sku", sku)
+
+@timed(DB_OPERATION_SECONDS, operation="group_items")
+def group_items(by: str, sku: Optional[str] = None, lot: Optional[str] = None, status: Optional[str] = None,
+                file_path: Optional[Path] = None, engine: Optional[str] = None) -> Dict[str, dict]:
+    """
+    Count and stock value per value of ``by`` (sku, lot, received_by, date or status)
+    over the items matching the filters.
+    """
+    if _use_columnar(engine):
+        return get_columnar(file_path).group_by(by, sku=sku, lot=lot, status=status)
+    if by not in FIELDS or by in ("uid", "price"):
+        raise ValueError(f"Cannot group by '{by}'.")
+    groups: Dict[str, dict] = {}
+    for item in iter_items(sku, lot, status, file_path=file_path):
+        group = groups.setdefault(getattr(item, by), {"count": 0, "units": 0})
+        group["count"] += 1
+        group["units"] += value_units(item.price)
+    return {key: {"count": group["count"], "value": group["units"] / VALUE_SCALE}
+            for key, group in sorted(groups.items())}
+
+def get_version(file_path: Optional[Path] = None) -> Tuple[int, float]:
+    """
+    ``(version, modified_at)`` of the inventory; the version changes whenever the data does.
+    """
+    return get_store(file_path).version()
+
+@timed(DB_OPERATION_SECONDS, operation="get_summary")
+def get_summary(file_path: Optional[Path] = None, engine: Optional[str] = None) -> dict:
+    """
+    Counts and stock value per sku, lot and status, maintained on every change
+    (or computed from the columnar snapshot with the columnar engine).
+    """
+    if _use_columnar(engine):
+        return get_columnar(file_path).summary()
+    return get_store(file_path).summary()
+
+@timed(DB_OPERATION_SECONDS, operation="get_daily_movements")
+def get_daily_movements(days: int, end: Optional[str] = None, lot: Optional[str] = None,
+                        sku: Optional[str] = None, file_path: Optional[Path] = None) -> List[dict]:
+    """
+    Items received ("in") and exited ("out") per day over the ``days`` days
+    ending on the %j%y date ``end`` (today by default), from the movement ledger.
+    """
+    ledger = get_ledger(file_path)
+    return ledger.daily(days, julian_to_ordinal(end) if end else None, lot=lot, sku=sku)
+
+@timed(DB_OPERATION_SECONDS, operation="get_stock_on")
+def get_stock_on(date: str, lot: Optional[str] = None, sku: Optional[str] = None,
+                 file_path: Optional[Path] = None) -> int:
+    """
+    Items in stock at the end of the %j%y date ``date``, from the movement ledger.
+    """
+    return get_ledger(file_path).stock_on(julian_to_ordinal(date), lot=lot, sku=sku)
+
+@timed(DB_OPERATION_SECONDS, operation="exit_item")
+def exit_item(uid: str, file_path: Optional[Path] = None) -> bool:
+    with _recording(file_path) as (store, log, ledger):
+        current = store.get(uid)
+        exited = current is not None and store.set_status(uid, "0")
+        # Repeated exit reads change nothing: no change and no movement
+        if exited and current.status == "1":
+            log.record("exit", uid)
+            ledger.record("exit", [current])
+    return exited
+
+@timed(DB_OPERATION_SECONDS, operation="exit_items_bulk")
+def exit_items_bulk(uids: List[str], file_path: Optional[Path] = None) -> List[bool]:
+    """
+    Mark many items as exited in one store operation.
+    Returns True per uid that exists, like ``exit_item``.
+    """
+    with _recording(file_path) as (store, log, ledger):
+        # Only items still in stock really exit, each once however often it was read
+        in_stock = {}
+        for uid in uids:
+            current = store.get(uid)
+            if current is not None and current.status == "1":
+                in_stock[uid] = current
+        results = store.set_status_many(uids, "0")
+        log.record_many("exit", [(uid, None) for uid in in_stock])
+        ledger.record("exit", in_stock.values())
+    return results
 
 
 if __name__ == "__main__":
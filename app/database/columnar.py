@@ -0,0 +1,134 @@
+# UltraSteelChallenge/app/database/columnar.py
+#
+# Optional columnar view of the inventory for reporting over millions of rows.
+# String fields are dictionary-encoded into int32 code arrays and prices kept
+# in float64/int64 arrays, so filters, group-by counts and price sums run as
+# vectorized NumPy operations without building an InventoryItem per row.
+# NumPy is optional: without it columnar_available() is False and
+# app.database.client keeps using the row-based store.
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.database.backend import FIELDS
+from app.database.aggregates import SUMMARY_FIELDS, VALUE_SCALE, build_summary
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+# Dictionary-encoded columns; uid is unique per row and kept as a plain list
+ENCODED_FIELDS = ("sku", "lot", "received_by", "date", "status")
+
+
+def columnar_available() -> bool:
+    return np is not None
+
+
+class ColumnarInventory:
+    """
+    Immutable column snapshot of the inventory at store ``version``.
+    Filters take ``field=value`` or ``field=[values]`` for the encoded fields,
+    plus ``min_price``/``max_price``.
+    """
+
+    def __init__(self, rows: Sequence[tuple], version: int = 0):
+        if np is None:
+            raise RuntimeError("The columnar engine needs numpy (pip install numpy).")
+        self.version = version
+        self.size = len(rows)
+        columns = dict(zip(FIELDS, zip(*rows))) if rows else {field: () for field in FIELDS}
+        self.uids: List[str] = list(columns["uid"])
+        self.codes: Dict[str, "np.ndarray"] = {}
+        self.dictionaries: Dict[str, List[str]] = {}
+        self._lookup: Dict[str, Dict[str, int]] = {}
+        for field in ENCODED_FIELDS:
+            self._encode(field, columns[field])
+        self.price = np.asarray(columns["price"], dtype=np.float64)
+        # Same integer millionths as the store summaries, so totals match exactly
+        self.value_units = np.rint(self.price * VALUE_SCALE).astype(np.int64)
+
+    def _encode(self, field: str, values: Iterable[str]):
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values),
+                            dtype=np.int32, count=self.size)
+        self.codes[field] = codes
+        self._lookup[field] = lookup
+        self.dictionaries[field] = list(lookup)
+
+    def __len__(self) -> int:
+        return self.size
+
+    # Filtering
+    def mask(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+             **conditions) -> "np.ndarray":
+        """
+        Boolean row mask for the given conditions (None values are ignored).
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for field, wanted in conditions.items():
+            if wanted is None:
+                continue
+            if field not in ENCODED_FIELDS:
+                raise ValueError(f"Cannot filter by '{field}'.")
+            lookup = self._lookup[field]
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                codes = [lookup[value] for value in wanted if value in lookup]
+                mask &= np.isin(self.codes[field], codes)
+            elif wanted in lookup:
+                mask &= self.codes[field] == lookup[wanted]
+            else:
+                return np.zeros(self.size, dtype=bool)
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+        return mask
+
+    def count(self, **filters) -> int:
+        return int(np.count_nonzero(self.mask(**filters)))
+
+    def sum_price(self, **filters) -> float:
+        return int(self.value_units[self.mask(**filters)].sum()) / VALUE_SCALE
+
+    def _group_units(self, by: str, mask: "np.ndarray") -> Dict[str, Tuple[int, int]]:
+        if by not in ENCODED_FIELDS:
+            raise ValueError(f"Cannot group by '{by}'.")
+        codes = self.codes[by][mask]
+        size = len(self.dictionaries[by])
+        counts = np.bincount(codes, minlength=size)
+        # float64 weights are exact for sums below 2**53 millionths
+        values = np.bincount(codes, weights=self.value_units[mask], minlength=size)
+        dictionary = self.dictionaries[by]
+        return {dictionary[code]: (int(counts[code]), int(round(values[code])))
+                for code in np.flatnonzero(counts)}
+
+    def group_by(self, by: str, **filters) -> Dict[str, dict]:
+        """
+        Count and summed price of the matching rows per value of ``by``.
+        """
+        groups = self._group_units(by, self.mask(**filters))
+        return {key: {"count": count, "value": units / VALUE_SCALE} for key, (count, units) in sorted(groups.items())}
+
+    def summary(self, **filters) -> dict:
+        """
+        Same structure as StorageBackend.summary(), optionally over a filtered subset.
+        """
+        mask = self.mask(**filters)
+        groups = {field: self._group_units(field, mask) for field in SUMMARY_FIELDS}
+        return build_summary(int(np.count_nonzero(mask)), int(self.value_units[mask].sum()), groups)
+
+    def select(self, limit: Optional[int] = None, **filters) -> List[dict]:
+        """
+        Matching rows as plain dicts, decoded straight from the columns.
+        """
+        indices = np.flatnonzero(self.mask(**filters))[:limit]
+        decoded = {field: [self.dictionaries[field][code] for code in self.codes[field][indices]]
+                   for field in ENCODED_FIELDS}
+        prices = self.price[indices].tolist()
+        rows = []
+        for n, index in enumerate(indices.tolist()):
+            row = {field: decoded[field][n] for field in ENCODED_FIELDS}
+            row["uid"] = self.uids[index]
+            row["price"] = prices[n]
+            rows.append({field: row[field] for field in FIELDS})
+        return rows
@@ -0,0 +1,136 @@
+# UltraSteelChallenge/app/database/filelock.py
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# The lock file also stores the data version: (generation, rewrite generation)
+_VERSION = struct.Struct("<QQ")
+# Byte locked on Windows, past the version so readers can still read it
+_LOCK_OFFSET = 64
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every process that opens the same lock file
+    (flock on POSIX, msvcrt.locking on Windows). Re-entrant within a thread,
+    so a write that calls another write does not deadlock.
+
+    The lock file doubles as a version stamp: writers bump a generation
+    counter in it, which readers can check without taking the lock.
+    """
+
+    def __init__(self, path: Path, timeout: float = 10.0, poll: float = 0.005):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll = poll
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def _open(self):
+        # Kept open between acquisitions; only the lock itself is taken and released
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(self._fd, _LOCK_OFFSET, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, _LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._open()
+                deadline = time.monotonic() + self.timeout
+                while not self._try_lock():
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Could not lock {self.path} within {self.timeout} s.")
+                    time.sleep(self.poll)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock()
+        self._thread_lock.release()
+
+    def read_version(self) -> tuple:
+        """
+        (generation, rewrite generation) last written by any process; (0, 0) for a new file.
+        """
+        with self._thread_lock:
+            self._open()
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            data = os.read(self._fd, _VERSION.size)
+        return _VERSION.unpack(data) if len(data) == _VERSION.size else (0, 0)
+
+    def write_version(self, generation: int, rewrite_generation: int):
+        """
+        Store a new version. Only call while holding the lock.
+        """
+        with self._thread_lock:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, _VERSION.pack(generation, rewrite_generation))
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None and self._depth == 0:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+@contextmanager
+def atomic_write(path: Path, newline: str = ''):
+    """
+    Open a temporary file next to ``path`` for writing and move it over ``path``
+    once the block succeeds, so readers see either the old or the new file.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode='w', newline=newline) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
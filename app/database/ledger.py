@@ -0,0 +1,269 @@
+# UltraSteelChallenge/app/database/ledger.py
+
+import bisect
+import csv
+import io
+import os
+import threading
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.database.filelock import FileLock
+from app.config import FILE_LOCK_TIMEOUT
+
+# "receive" adds an item to the stock, "exit" takes it out; "delete" drops an
+# item that was still in stock (a correction, not counted as an outgoing movement)
+EVENTS = ("receive", "exit", "delete")
+LEDGER_FIELDS = ("ts", "event", "uid", "sku", "lot")
+
+
+def ledger_path(file_path: Path) -> Path:
+    """
+    Ledger file kept next to an inventory, e.g. inventory.csv.movements (a CSV file).
+    """
+    return Path(f"{file_path}.movements")
+
+
+# Date index: %j%y dates and timestamps as ordinal days
+@lru_cache(maxsize=4096)
+def julian_to_ordinal(value: str) -> int:
+    """
+    Ordinal day (``date.toordinal``) of a %j%y date such as 22425.
+    """
+    try:
+        return datetime.strptime(value, "%j%y").date().toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Date '{value}' is not a %j%y date such as 22425.") from None
+
+def ordinal_to_julian(day: int) -> str:
+    return date.fromordinal(day).strftime("%j%y")
+
+def timestamp_to_ordinal(ts: float) -> int:
+    return date.fromtimestamp(ts).toordinal()
+
+def ordinal_to_timestamp(day: int) -> float:
+    # Local midnight at the start of the day
+    return datetime.combine(date.fromordinal(day), datetime.min.time()).timestamp()
+
+
+class DayIndex:
+    """
+    Movements per ordinal day for one slice of the ledger (everything, one
+    lot or one sku): items received, exited and deleted, on a sorted list of
+    days with running stock totals. Events almost always land on the latest
+    day, which updates the totals in place; an older day rebuilds them on
+    the next stock query.
+    """
+
+    def __init__(self):
+        self._days: List[int] = []
+        self._moves: Dict[int, List[int]] = {}
+        self._stock: Optional[List[int]] = []  # stock at the end of each day in _days
+
+    def add(self, day: int, received: int = 0, exited: int = 0, deleted: int = 0):
+        moves = self._moves.get(day)
+        if moves is None:
+            moves = self._moves[day] = [0, 0, 0]
+            if not self._days or day > self._days[-1]:
+                self._days.append(day)
+                if self._stock is not None:
+                    self._stock.append(self._stock[-1] if self._stock else 0)
+            else:
+                bisect.insort(self._days, day)
+                self._stock = None
+        moves[0] += received
+        moves[1] += exited
+        moves[2] += deleted
+        if self._stock is not None:
+            if day == self._days[-1]:
+                self._stock[-1] += received - exited - deleted
+            else:
+                self._stock = None
+
+    def daily(self, first: int, last: int) -> Dict[int, Tuple[int, int]]:
+        """
+        ``{day: (received, exited)}`` for the days in [first, last] that had movements.
+        """
+        start = bisect.bisect_left(self._days, first)
+        end = bisect.bisect_right(self._days, last)
+        return {day: tuple(self._moves[day][:2]) for day in self._days[start:end]}
+
+    def stock_on(self, day: int) -> int:
+        """
+        Items in stock at the end of ``day``.
+        """
+        if self._stock is None:
+            stock, total = [], 0
+            for known_day in self._days:
+                received, exited, deleted = self._moves[known_day]
+                total += received - exited - deleted
+                stock.append(total)
+            self._stock = stock
+        position = bisect.bisect_right(self._days, day)
+        return self._stock[position - 1] if position else 0
+
+
+class MovementLedger:
+    """
+    Append-only ledger of stock movements with real timestamps, kept in a CSV
+    file next to the inventory. Rows are never rewritten, so the ledger keeps
+    when each item was received and when it left, which the ``status`` column
+    of the inventory does not.
+
+    Every event is indexed by ordinal day, overall and per lot and sku (the
+    ones the item had when it moved), so daily flows and the stock level on a
+    date come from the indexes without scanning the inventory. Several
+    processes can append to one ledger: appends hold ``<ledger>.lock`` and
+    each process reads the rows others appended from where it stopped reading.
+    """
+
+    def __init__(self, file_path: Path, clock=time.time):
+        self.file_path = Path(file_path)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(Path(f"{self.file_path}.lock"), FILE_LOCK_TIMEOUT)
+        self._offset = 0  # bytes of the file already indexed
+        self._indexes: Dict[Optional[Tuple[str, str]], DayIndex] = {None: DayIndex()}
+        self.events = {event: 0 for event in EVENTS}
+        with self._lock, self._file_lock:
+            self._sync()
+
+    def _index(self, ts: float, event: str, sku: str, lot: str):
+        day = timestamp_to_ordinal(ts)
+        moves = (event == "receive", event == "exit", event == "delete")
+        self.events[event] += 1
+        self._indexes[None].add(day, *moves)
+        for key in (("lot", lot), ("sku", sku)):
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = DayIndex()
+            index.add(day, *moves)
+
+    def _sync(self):
+        # Index the rows appended (by any process) since the last read; holds the file lock
+        try:
+            size = os.stat(self.file_path).st_size
+        except FileNotFoundError:
+            return
+        if size <= self._offset:
+            return
+        with open(self.file_path, mode='rb') as file:
+            file.seek(self._offset)
+            data = file.read()
+        self._offset += len(data)
+        for row in csv.reader(io.StringIO(data.decode())):
+            if row and row[0] != "ts":
+                ts, event, _, sku, lot = row
+                self._index(float(ts), event, sku, lot)
+
+    def refresh(self):
+        """
+        Pick up rows appended by other processes. Costs one stat() when there are none.
+        """
+        try:
+            size = os.stat(self.file_path).st_size
+        except FileNotFoundError:
+            return
+        if size > self._offset:
+            with self._lock, self._file_lock:
+                self._sync()
+
+    def record(self, event: str, items: Iterable, ts: Optional[float] = None) -> int:
+        """
+        Append one ``event`` per item (anything with uid, sku and lot), at
+        ``ts`` or now. Returns how many rows were written.
+        """
+        if event not in EVENTS:
+            raise ValueError(f"Ledger event must be one of {EVENTS}.")
+        ts = self._clock() if ts is None else ts
+        rows = [(f"{ts:.3f}", event, item.uid, item.sku, item.lot) for item in items]
+        return self._append(rows)
+
+    def _append(self, rows: List[tuple]) -> int:
+        if not rows:
+            return 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        with self._lock, self._file_lock:
+            self._sync()
+            if self._offset == 0:
+                writer.writerow(LEDGER_FIELDS)
+            writer.writerows(rows)
+            data = buffer.getvalue().encode()
+            with open(self.file_path, mode='ab') as file:
+                file.write(data)
+            self._offset += len(data)
+            for ts, event, _, sku, lot in rows:
+                self._index(float(ts), event, sku, lot)
+        return len(rows)
+
+    def backfill(self, items: Iterable) -> int:
+        """
+        Seed an empty ledger from an existing inventory: each item is received
+        at the start of its %j%y ``date``, and items already out (status "0")
+        exit now, since the time they left was never recorded.
+        """
+        now = self._clock()
+        rows = []
+        with self._lock, self._file_lock:
+            self._sync()
+            if self._offset:
+                return 0
+            for item in items:
+                try:
+                    received = ordinal_to_timestamp(julian_to_ordinal(item.date))
+                except ValueError:
+                    received = now
+                rows.append((f"{received:.3f}", "receive", item.uid, item.sku, item.lot))
+                if item.status != "1":
+                    rows.append((f"{now:.3f}", "exit", item.uid, item.sku, item.lot))
+            return self._append(rows)
+
+    def _get_index(self, lot: Optional[str], sku: Optional[str]) -> Optional[DayIndex]:
+        if lot is not None and sku is not None:
+            raise ValueError("Filter by lot or by sku, not both.")
+        if lot is not None:
+            return self._indexes.get(("lot", lot))
+        if sku is not None:
+            return self._indexes.get(("sku", sku))
+        return self._indexes[None]
+
+    def today(self) -> int:
+        return timestamp_to_ordinal(self._clock())
+
+    def daily(self, days: int, end: Optional[int] = None, lot: Optional[str] = None,
+              sku: Optional[str] = None) -> List[dict]:
+        """
+        Items received and exited per day over the ``days`` days ending on
+        ordinal day ``end`` (today by default), oldest first, days without
+        movements included.
+        """
+        self.refresh()
+        end = self.today() if end is None else end
+        first = end - days + 1
+        with self._lock:
+            index = self._get_index(lot, sku)
+            moves = index.daily(first, end) if index is not None else {}
+        return [
+            {"date": ordinal_to_julian(day), "in": moves.get(day, (0, 0))[0], "out": moves.get(day, (0, 0))[1]}
+            for day in range(first, end + 1)
+        ]
+
+    def stock_on(self, day: int, lot: Optional[str] = None, sku: Optional[str] = None) -> int:
+        """
+        Items in stock at the end of ordinal day ``day``.
+        """
+        self.refresh()
+        with self._lock:
+            index = self._get_index(lot, sku)
+            return index.stock_on(day) if index is not None else 0
+
+    def close(self):
+        with self._lock:
+            self._file_lock.close()
+
+    def stats(self) -> dict:
+        return {"events": dict(self.events), "lots": sum(1 for key in self._indexes if key and key[0] == "lot"),
+                "skus": sum(1 for key in self._indexes if key and key[0] == "sku")}
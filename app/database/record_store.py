@@ -0,0 +1,538 @@
+# UltraSteelChallenge/app/database/record_store.py
+
+import bisect
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+from app.database.backend import StorageBackend, Item
+from app.database.aggregates import InventoryAggregates
+from app.database.filelock import FileLock
+from app.config import FILE_LOCK_TIMEOUT
+
+# File header: magic, record size, reserved, used slots, generation, rewrite generation, modified_at
+MAGIC = b"USREC\x00\x00\x01"
+HEADER = struct.Struct("<8sIIQQQd")
+HEADER_SIZE = 64
+# One record per slot: live flag, status, uid, sku, lot, received_by, date, padding, price.
+# Text fields are UTF-8, padded with zero bytes to their width.
+RECORD = struct.Struct("<cc32s16s16s8s8s6xd")
+WIDTHS = {"uid": 32, "sku": 16, "lot": 16, "received_by": 8, "date": 8}
+# Position of each field in a tuple unpacked with RECORD
+POSITIONS = {"status": 1, "uid": 2, "sku": 3, "lot": 4}
+LIVE, TOMBSTONE = b"\x01", b"\x00"
+STATUS_OFFSET = 1  # byte of the status inside a record
+GROW_SLOTS = 1024  # slots the file grows by at least
+# Journal of in-place writes: slot and the record it held before the write
+JOURNAL_ENTRY = struct.Struct(f"<Q{RECORD.size}s")
+JOURNAL_MAX_ENTRIES = 65536  # past this the journal is cleared and other processes reload once
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\x00").decode()
+
+def _record(fields: tuple) -> ItemRecord:
+    _, status, uid, sku, lot, received_by, date, price = fields
+    return ItemRecord(_text(sku), _text(lot), _text(uid), _text(received_by), _text(date), status.decode(), price)
+
+def _pack(item: Item) -> bytes:
+    values = {}
+    for field, width in WIDTHS.items():
+        raw = getattr(item, field).encode()
+        if len(raw) > width:
+            raise ValueError(f"Field '{field}' is longer than the {width} bytes of a record.")
+        values[field] = raw
+    status = item.status.encode()
+    if len(status) != 1:
+        raise ValueError("Status must be a single character.")
+    return RECORD.pack(LIVE, status, values["uid"], values["sku"], values["lot"],
+                       values["received_by"], values["date"], float(item.price))
+
+
+class RecordStore(StorageBackend):
+    """
+    Storage backend on a file of fixed-size binary records, memory-mapped.
+
+    Every item takes one 96-byte slot (fixed-width fields, a status byte and
+    the price as a float64), so a uid -> slot index turns an update into one
+    write to one record and an exit into a single byte write, instead of a
+    rewrite of the whole file. Deletes only clear the live flag of the slot
+    (a tombstone); a background compaction moves the live records down once
+    enough tombstones piled up. Scans unpack the records straight from the
+    map, in slot order, which is insertion order.
+
+    Like the CSV store, several processes can share one file: writes hold
+    ``<file>.lock`` and bump the generation in the file header. In-place
+    writes also append the slot and its previous record to ``<file>.journal``,
+    so another process reads only the new slots after appends and re-decodes
+    only the journalled slots after in-place writes; it reloads everything
+    only after a compaction moved records. Changes are written to the shared
+    map and reach the disk when the OS writes the pages back, or on
+    ``flush``/``close``.
+    """
+
+    PAGE_CHUNK = 256
+    COMPACT_MIN_TOMBSTONES = 1024
+    COMPACT_RATIO = 0.25  # compact once this fraction of the used slots are tombstones
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(Path(f"{self.file_path}.lock"), FILE_LOCK_TIMEOUT)
+        self._slots: Dict[str, int] = {}
+        self._sorted_uids: List[str] = []
+        self._aggregates = InventoryAggregates()
+        self._used = 0
+        self._tombstones = 0
+        self._version = (0, 0)    # (generation, rewrite generation) as last synced
+        self._modified_at = 0.0
+        self._dirty = None        # "write" or "rewrite" (records moved) while a write is in progress
+        self._journal_offset = 0  # bytes of the journal already applied
+        self._compactor = None
+        self._open()
+        self.load()
+
+    # File and map
+    def _open(self):
+        self._journal_fd = os.open(f"{self.file_path}.journal",
+                                   os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        self._fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        with self._file_lock:
+            if os.fstat(self._fd).st_size == 0:
+                # New file: start from the clock so versions never repeat
+                seed = time.time_ns() // 1000
+                os.ftruncate(self._fd, HEADER_SIZE + GROW_SLOTS * RECORD.size)
+                self._mm = mmap.mmap(self._fd, 0)
+                HEADER.pack_into(self._mm, 0, MAGIC, RECORD.size, 0, 0, seed, seed, time.time())
+            else:
+                self._mm = mmap.mmap(self._fd, 0)
+        if len(self._mm) < HEADER_SIZE or HEADER.unpack_from(self._mm, 0)[:2] != (MAGIC, RECORD.size):
+            self.close()
+            raise ValueError(f"{self.file_path} is not an inventory record file.")
+
+    def _remap(self):
+        self._mm.close()
+        self._mm = mmap.mmap(self._fd, 0)
+
+    def _reserve(self, count: int):
+        # Grow the file so ``count`` more records fit
+        capacity = (len(self._mm) - HEADER_SIZE) // RECORD.size
+        if self._used + count > capacity:
+            capacity = max(self._used + count, 2 * capacity, GROW_SLOTS)
+            self._mm.close()
+            os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD.size)
+            self._mm = mmap.mmap(self._fd, 0)
+
+    def _write_header(self):
+        HEADER.pack_into(self._mm, 0, MAGIC, RECORD.size, 0, self._used, *self._version, self._modified_at)
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * RECORD.size
+
+    def _read(self, slot: int) -> ItemRecord:
+        return _record(RECORD.unpack_from(self._mm, self._offset(slot)))
+
+    def _live_fields(self, first: int = 0) -> List[Tuple[int, tuple]]:
+        # (slot, raw fields) of the live records from ``first`` on, unpacked straight from the map
+        with memoryview(self._mm) as view, view[self._offset(first):self._offset(self._used)] as records:
+            return [(slot, fields) for slot, fields in enumerate(RECORD.iter_unpack(records), first)
+                    if fields[0] == LIVE]
+
+    def _live_records(self) -> List[ItemRecord]:
+        # Every live record in slot order; the hot path of full scans
+        with memoryview(self._mm) as view, view[HEADER_SIZE:self._offset(self._used)] as records:
+            return [_record(fields) for fields in RECORD.iter_unpack(records) if fields[0] == LIVE]
+
+    def flush(self):
+        """
+        Write the changed pages of the map to disk.
+        """
+        with self._lock:
+            self._mm.flush()
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+        with self._lock:
+            if getattr(self, "_mm", None) is not None and not self._mm.closed:
+                self._mm.flush()
+                self._mm.close()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
+            self._file_lock.close()
+
+    # Loading and indexing
+    def load(self):
+        """
+        Rebuild the uid index and the aggregates from the records in the file.
+        """
+        with self._lock, self._file_lock:
+            self._slots = {}
+            self._aggregates.clear()
+            self._used, self._tombstones = 0, 0
+            self._sync_header()
+            self._index_slots(0)
+            self._sorted_uids = sorted(self._slots)
+            # Every journalled write is already in the records just read
+            self._journal_offset = os.fstat(self._journal_fd).st_size
+
+    def _sync_header(self) -> int:
+        # Take over the header written by any process; returns the used slots before it
+        _, _, _, used, generation, rewrite_generation, modified_at = HEADER.unpack_from(self._mm, 0)
+        if self._offset(used) > len(self._mm):
+            # Another process grew the file
+            self._remap()
+        previous, self._used = self._used, used
+        self._version, self._modified_at = (generation, rewrite_generation), modified_at
+        return previous
+
+    def _index_slots(self, first: int) -> List[str]:
+        live = self._live_fields(first)
+        self._tombstones += (self._used - first) - len(live)
+        uids = []
+        for slot, fields in live:
+            item = _record(fields)
+            if item.uid in self._slots:
+                # A copy left by an interrupted compaction: the first one wins
+                self._mm[self._offset(slot)] = TOMBSTONE[0]
+                self._tombstones += 1
+                continue
+            self._slots[item.uid] = slot
+            self._aggregates.add(item)
+            uids.append(item.uid)
+        return uids
+
+    def _refresh(self):
+        """
+        Bring the index up to date if another process changed the file.
+        Costs one header read from the map when nothing changed.
+        """
+        generation, rewrite_generation = HEADER.unpack_from(self._mm, 0)[4:6]
+        if (generation, rewrite_generation) == self._version:
+            return
+        with self._file_lock:
+            old_generation = self._version[0]
+            generation, rewrite_generation = HEADER.unpack_from(self._mm, 0)[4:6]
+            if generation > old_generation and rewrite_generation <= old_generation:
+                # No record moved since we last synced: index the appended
+                # slots and re-decode the ones written in place
+                first = self._sync_header()
+                for uid in self._index_slots(first):
+                    bisect.insort(self._sorted_uids, uid)
+                self._apply_journal(first)
+            elif (generation, rewrite_generation) != self._version:
+                self.load()
+
+    def _apply_journal(self, first: int):
+        # Slots below ``first`` written in place by other processes since the last sync
+        os.lseek(self._journal_fd, self._journal_offset, os.SEEK_SET)
+        data = os.read(self._journal_fd, os.fstat(self._journal_fd).st_size - self._journal_offset)
+        self._journal_offset += len(data)
+        previous = {}
+        for slot, raw in JOURNAL_ENTRY.iter_unpack(data):
+            # Slots indexed by _index_slots were read with their latest content
+            if slot < first:
+                previous.setdefault(slot, RECORD.unpack(raw))
+        added = []
+        for slot, fields in previous.items():
+            if fields[0] == LIVE:
+                old = _record(fields)
+                self._aggregates.remove(old)
+                if self._slots.get(old.uid) == slot:
+                    del self._slots[old.uid]
+                    self._sorted_remove(old.uid)
+        for slot in previous:
+            current = RECORD.unpack_from(self._mm, self._offset(slot))
+            if current[0] == LIVE:
+                added.append((slot, _record(current)))
+            elif previous[slot][0] == LIVE:
+                self._tombstones += 1
+        for slot, item in added:
+            self._slots[item.uid] = slot
+            self._aggregates.add(item)
+            bisect.insort(self._sorted_uids, item.uid)
+
+    def _journal(self, slot: int):
+        # Record the slot about to be written in place, with its current record
+        entry = JOURNAL_ENTRY.pack(slot, bytes(self._mm[self._offset(slot):self._offset(slot + 1)]))
+        os.write(self._journal_fd, entry)
+        self._journal_offset += len(entry)
+        self._dirty = self._dirty or "write"
+
+    @contextmanager
+    def _writing(self):
+        # Serialise writers across threads and processes, starting from the latest data
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._dirty = None
+            yield
+            if self._dirty is not None:
+                if self._journal_offset > JOURNAL_MAX_ENTRIES * JOURNAL_ENTRY.size:
+                    self._dirty = "rewrite"
+                if self._dirty == "rewrite":
+                    # Other processes reload, so the journal starts over
+                    os.ftruncate(self._journal_fd, 0)
+                    self._journal_offset = 0
+                generation = self._version[0] + 1
+                rewrite_generation = generation if self._dirty == "rewrite" else self._version[1]
+                self._version = (generation, rewrite_generation)
+                self._modified_at = time.time()
+                self._write_header()
+                self._dirty = None
+
+    def _append(self, records: List[Tuple[ItemRecord, bytes]]):
+        self._reserve(len(records))
+        for item, packed in records:
+            offset = self._offset(self._used)
+            self._mm[offset:offset + RECORD.size] = packed
+            self._slots[item.uid] = self._used
+            self._used += 1
+            self._aggregates.add(item)
+            bisect.insort(self._sorted_uids, item.uid)
+        self._dirty = self._dirty or "write"
+
+    def _sorted_remove(self, uid: str):
+        i = bisect.bisect_left(self._sorted_uids, uid)
+        if i < len(self._sorted_uids) and self._sorted_uids[i] == uid:
+            del self._sorted_uids[i]
+
+    # Queries
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._slots)
+
+    def __contains__(self, uid: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return uid in self._slots
+
+    def get(self, uid: str) -> Optional[ItemRecord]:
+        with self._lock:
+            self._refresh()
+            slot = self._slots.get(uid)
+            return self._read(slot) if slot is not None else None
+
+    def all(self) -> List[ItemRecord]:
+        with self._lock:
+            self._refresh()
+            return self._live_records()
+
+    def iter_items(self, after_uid: Optional[str] = None, **filters: str) -> Iterator[ItemRecord]:
+        filters = {field: value for field, value in filters.items() if value is not None}
+        for field in filters:
+            if field not in self.INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter by '{field}'.")
+        with self._lock:
+            self._refresh()
+            if filters:
+                # One pass over the map comparing the raw fixed-width fields
+                wanted = [(POSITIONS[field], value.encode().ljust(WIDTHS.get(field, 1), b"\x00"))
+                          for field, value in filters.items()]
+                uids = sorted(_text(fields[2]) for _, fields in self._live_fields()
+                              if all(fields[i] == value for i, value in wanted))
+            else:
+                uids = None
+        last = after_uid
+        while True:
+            with self._lock:
+                source = self._sorted_uids if uids is None else uids
+                start = bisect.bisect_right(source, last) if last is not None else 0
+                chunk = source[start:start + self.PAGE_CHUNK]
+                items = [self._read(self._slots[uid]) for uid in chunk if uid in self._slots]
+            if not chunk:
+                return
+            last = chunk[-1]
+            for item in items:
+                if all(getattr(item, field) == value for field, value in filters.items()):
+                    yield item
+
+    def count_by(self, field: str, value: str) -> int:
+        with self._lock:
+            self._refresh()
+            group = self._aggregates.groups[field].get(value)
+            return group[0] if group else 0
+
+    def version(self) -> Tuple[int, float]:
+        with self._lock:
+            self._refresh()
+            return self._version[0], self._modified_at
+
+    def summary(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return self._aggregates.to_dict()
+
+    def rows_snapshot(self) -> Tuple[int, List[ItemRecord]]:
+        with self._lock:
+            self._refresh()
+            return self._version[0], self._live_records()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._slots), "used_slots": self._used, "tombstones": self._tombstones,
+                    "capacity": (len(self._mm) - HEADER_SIZE) // RECORD.size, "record_size": RECORD.size}
+
+    # Mutations
+    def add(self, item: Item) -> bool:
+        # Repeated tag reads are the common case: reject them without the file lock
+        if item.uid in self:
+            return False
+        packed = _pack(item)
+        with self._writing():
+            if item.uid in self._slots:
+                return False
+            self._append([(ItemRecord.from_item(item), packed)])
+            return True
+
+    def add_many(self, items: List[Item]) -> List[bool]:
+        with self._writing():
+            accepted = {}
+            results = []
+            for item in items:
+                is_new = item.uid not in self._slots and item.uid not in accepted
+                if is_new:
+                    # Packed before anything is written, so a bad item rejects the whole batch
+                    accepted[item.uid] = (ItemRecord.from_item(item), _pack(item))
+                results.append(is_new)
+            if accepted:
+                self._append(list(accepted.values()))
+            return results
+
+    def update(self, uid: str, updated_item: Item) -> bool:
+        packed = _pack(updated_item)
+        with self._writing():
+            slot = self._slots.get(uid)
+            if slot is None:
+                return False
+            updated_item = ItemRecord.from_item(updated_item)
+            if updated_item.uid != uid and updated_item.uid in self._slots:
+                raise ValueError(f"Item '{updated_item.uid}' already exists.")
+            current = self._read(slot)
+            offset = self._offset(slot)
+            # Same slot, so the item keeps its position
+            self._journal(slot)
+            self._mm[offset:offset + RECORD.size] = packed
+            self._aggregates.remove(current)
+            self._aggregates.add(updated_item)
+            if updated_item.uid != uid:
+                del self._slots[uid]
+                self._slots[updated_item.uid] = slot
+                self._sorted_remove(uid)
+                bisect.insort(self._sorted_uids, updated_item.uid)
+            return True
+
+    def set_status(self, uid: str, status: str) -> bool:
+        return self.set_status_many([uid], status)[0]
+
+    def set_status_many(self, uids: List[str], status: str) -> List[bool]:
+        if status not in ["0", "1"]:
+            raise ValueError("Status must be '0' or '1'.")
+        code = ord(status)
+        with self._writing():
+            results = []
+            for uid in uids:
+                slot = self._slots.get(uid)
+                results.append(slot is not None)
+                if slot is None:
+                    continue
+                position = self._offset(slot) + STATUS_OFFSET
+                if self._mm[position] == code:
+                    continue
+                # One byte in place
+                current = self._read(slot)
+                self._journal(slot)
+                self._mm[position] = code
+                self._aggregates.remove(current)
+                self._aggregates.add(current._replace(status=status))
+            return results
+
+    def delete(self, uid: str) -> bool:
+        with self._writing():
+            slot = self._slots.pop(uid, None)
+            if slot is None:
+                return False
+            self._aggregates.remove(self._read(slot))
+            self._journal(slot)
+            self._mm[self._offset(slot)] = TOMBSTONE[0]
+            self._tombstones += 1
+            self._sorted_remove(uid)
+        self._maybe_compact()
+        return True
+
+    # Compaction
+    def _maybe_compact(self):
+        if self._tombstones < max(self.COMPACT_MIN_TOMBSTONES, self._used * self.COMPACT_RATIO):
+            return
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self._compact_in_background,
+                                                   name="record-compaction", daemon=True)
+                self._compactor.start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print("⚠ Error compacting the record file:", e)
+
+    def compact(self) -> int:
+        """
+        Move the live records over the tombstones, keeping their order, and
+        clear the freed slots at the end. Returns how many slots were freed.
+        Done in place, so a compaction cut short only leaves copies of
+        records behind, which ``load`` drops.
+        """
+        with self._writing():
+            if not self._tombstones:
+                return 0
+            size = RECORD.size
+            write = 0
+            for slot, fields in self._live_fields():
+                if slot != write:
+                    source, target = self._offset(slot), self._offset(write)
+                    self._mm[target:target + size] = self._mm[source:source + size]
+                    self._slots[_text(fields[2])] = write
+                write += 1
+            freed = self._used - write
+            self._mm[self._offset(write):self._offset(self._used)] = bytes(freed * size)
+            self._used, self._tombstones = write, 0
+            self._dirty = "rewrite"
+            return freed
+
+
+def migrate_csv_to_records(csv_path: Path, record_path: Path) -> int:
+    """
+    Copy every row of an inventory CSV into a record file in one write.
+    Rows whose uid is already in the record file are skipped.
+    Returns the number of rows imported.
+    """
+    store = RecordStore(record_path)
+    try:
+        with open(csv_path, mode='r', newline='') as file:
+            items = [InventoryItem(**row) for row in csv.DictReader(file)]
+        return sum(store.add_many(items))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.database.record_store [inventory.csv] [inventory.rec]
+    from app.config import CSV_PATH, RECORD_PATH
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(CSV_PATH)
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(RECORD_PATH)
+    imported = migrate_csv_to_records(source, target)
+    print(f"✅ {imported} items migrated from {source} to {target}")
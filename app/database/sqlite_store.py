@@ -0,0 +1,295 @@
+# UltraSteelChallenge/app/database/sqlite_store.py
+
+import csv
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+from app.database.backend import StorageBackend, FIELDS, Item
+from app.database.aggregates import SUMMARY_FIELDS, VALUE_SCALE, build_summary
+
+# Fixed SQL strings so sqlite3's statement cache keeps them prepared
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    uid TEXT PRIMARY KEY,
+    sku TEXT NOT NULL,
+    lot TEXT NOT NULL,
+    received_by TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT '1',
+    price REAL NOT NULL DEFAULT 0.0
+);
+CREATE INDEX IF NOT EXISTS idx_inventory_lot ON inventory (lot);
+CREATE INDEX IF NOT EXISTS idx_inventory_sku ON inventory (sku);
+CREATE INDEX IF NOT EXISTS idx_inventory_status ON inventory (status);
+CREATE TABLE IF NOT EXISTS inventory_summary (
+    dimension TEXT NOT NULL,  -- 'total', 'sku', 'lot' or 'status'
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    value INTEGER NOT NULL,   -- sum of price in millionths
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+"""
+_SUMMARY_DIMENSIONS = ("total",) + SUMMARY_FIELDS
+_UNITS = f"CAST(ROUND({{row}}.price * {VALUE_SCALE}) AS INTEGER)"
+
+
+def _summary_key(dimension: str, row: str) -> str:
+    return "''" if dimension == "total" else f"{row}.{dimension}"
+
+
+def _summary_changes(row: str, sign: str) -> str:
+    # Adds (sign "") or subtracts (sign "-") one row in every summary dimension
+    statements = []
+    for dimension in _SUMMARY_DIMENSIONS:
+        statements.append(
+            f"INSERT INTO inventory_summary VALUES ('{dimension}', {_summary_key(dimension, row)}, "
+            f"{sign}1, {sign}{_UNITS.format(row=row)}) "
+            "ON CONFLICT (dimension, key) DO UPDATE SET "
+            "count = count + excluded.count, value = value + excluded.value;"
+        )
+    return "\n    ".join(statements)
+
+
+# Triggers keep the summary table in step with every insert, update and delete, O(1) per row
+_SUMMARY_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS inventory_summary_insert AFTER INSERT ON inventory BEGIN
+    {_summary_changes("NEW", "")}
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_summary_delete AFTER DELETE ON inventory BEGIN
+    {_summary_changes("OLD", "-")}
+    DELETE FROM inventory_summary WHERE count = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_summary_update AFTER UPDATE OF sku, lot, status, price ON inventory BEGIN
+    {_summary_changes("OLD", "-")}
+    {_summary_changes("NEW", "")}
+    DELETE FROM inventory_summary WHERE count = 0;
+END;
+"""
+_REBUILD_SUMMARY = ["DELETE FROM inventory_summary"] + [
+    f"INSERT INTO inventory_summary SELECT '{dimension}', {_summary_key(dimension, 'inventory')}, "
+    f"COUNT(*), COALESCE(SUM({_UNITS.format(row='inventory')}), 0) FROM inventory"
+    + ("" if dimension == "total" else f" GROUP BY {dimension}")
+    for dimension in _SUMMARY_DIMENSIONS
+]
+_SELECT_SUMMARY = "SELECT dimension, key, count, value FROM inventory_summary"
+
+# Data version shared by every connection: bumped by triggers on each changed row
+_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    modified_at REAL NOT NULL  -- POSIX timestamp of the last change
+);
+-- Seeded from the clock so a recreated database never repeats an old version
+INSERT OR IGNORE INTO inventory_meta VALUES (
+    1, CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER), (julianday('now') - 2440587.5) * 86400.0
+);
+"""
+_BUMP_VERSION = (
+    "UPDATE inventory_meta SET version = version + 1, "
+    "modified_at = (julianday('now') - 2440587.5) * 86400.0 WHERE id = 1;"
+)
+_ROW_CHANGED = " OR ".join(f"OLD.{field} IS NOT NEW.{field}" for field in FIELDS)
+_VERSION_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS inventory_version_insert AFTER INSERT ON inventory BEGIN
+    {_BUMP_VERSION}
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_version_delete AFTER DELETE ON inventory BEGIN
+    {_BUMP_VERSION}
+END;
+CREATE TRIGGER IF NOT EXISTS inventory_version_update AFTER UPDATE ON inventory WHEN {_ROW_CHANGED} BEGIN
+    {_BUMP_VERSION}
+END;
+"""
+_SELECT_VERSION = "SELECT version, modified_at FROM inventory_meta WHERE id = 1"
+_COLUMNS = ", ".join(FIELDS)
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM inventory WHERE uid = ?"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM inventory ORDER BY rowid"
+_INSERT = f"INSERT OR IGNORE INTO inventory ({_COLUMNS}) VALUES ({', '.join('?' for _ in FIELDS)})"
+_UPDATE = f"UPDATE inventory SET {', '.join(f'{field} = ?' for field in FIELDS)} WHERE uid = ?"
+_SET_STATUS = "UPDATE inventory SET status = ? WHERE uid = ?"
+_DELETE = "DELETE FROM inventory WHERE uid = ?"
+_COUNT = "SELECT COUNT(*) FROM inventory"
+_COUNT_BY = {
+    field: f"SELECT COUNT(*) FROM inventory WHERE {field} = ?"
+    for field in StorageBackend.INDEXED_FIELDS
+}
+
+
+def _row(item: Item) -> tuple:
+    return (item.sku, item.lot, item.uid, item.received_by, item.date, item.status, item.price)
+
+
+class SQLiteStore(StorageBackend):
+    """
+    SQLite storage backend.
+
+    Rows live in one table with ``uid`` as primary key and indexes on ``lot``,
+    ``sku`` and ``status``, so single-row changes cost the same no matter how
+    big the inventory gets. The database runs in WAL mode so readers never
+    block the RFID reader thread while it writes.
+    """
+
+    PAGE_CHUNK = 500
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.file_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.executescript(_SUMMARY_TRIGGERS)
+        self._conn.executescript(_VERSION_SCHEMA)
+        self._conn.executescript(_VERSION_TRIGGERS)
+        self.rebuild_summary()
+
+    def rebuild_summary(self):
+        """
+        Recompute the summary table from the inventory (done once on open).
+        """
+        with self._lock, self._conn:
+            for statement in _REBUILD_SUMMARY:
+                self._conn.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Queries
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(_COUNT).fetchone()[0]
+
+    def __contains__(self, uid: str) -> bool:
+        with self._lock:
+            return self._conn.execute(_SELECT_ONE, (uid,)).fetchone() is not None
+
+    def get(self, uid: str) -> Optional[ItemRecord]:
+        with self._lock:
+            row = self._conn.execute(_SELECT_ONE, (uid,)).fetchone()
+        return ItemRecord._make(row) if row is not None else None
+
+    def all(self) -> List[ItemRecord]:
+        with self._lock:
+            rows = self._conn.execute(_SELECT_ALL).fetchall()
+        return list(map(ItemRecord._make, rows))
+
+    def iter_items(self, after_uid: Optional[str] = None, **filters: str) -> Iterator[ItemRecord]:
+        for field in filters:
+            if field not in self.INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter by '{field}'.")
+        clauses = [f"{field} = ?" for field, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        sql = f"SELECT {_COLUMNS} FROM inventory WHERE uid > ?"
+        if clauses:
+            sql += " AND " + " AND ".join(clauses)
+        sql += " ORDER BY uid LIMIT ?"
+        last = after_uid if after_uid is not None else ""
+        while True:
+            # Keyset pagination over the primary key, one chunk per query
+            with self._lock:
+                rows = self._conn.execute(sql, [last, *params, self.PAGE_CHUNK]).fetchall()
+            for row in rows:
+                yield ItemRecord._make(row)
+            if len(rows) < self.PAGE_CHUNK:
+                return
+            last = rows[-1][FIELDS.index("uid")]
+
+    def count_by(self, field: str, value: str) -> int:
+        with self._lock:
+            return self._conn.execute(_COUNT_BY[field], (value,)).fetchone()[0]
+
+    def version(self) -> Tuple[int, float]:
+        with self._lock:
+            version, modified_at = self._conn.execute(_SELECT_VERSION).fetchone()
+        return version, modified_at
+
+    def summary(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(_SELECT_SUMMARY).fetchall()
+        count, value, groups = 0, 0, {}
+        for dimension, key, group_count, group_value in rows:
+            if dimension == "total":
+                count, value = group_count, group_value
+            else:
+                groups.setdefault(dimension, {})[key] = (group_count, group_value)
+        return build_summary(count, value, groups)
+
+    def rows_snapshot(self) -> Tuple[int, List[ItemRecord]]:
+        with self._lock:
+            # One read transaction, so another process cannot write between the two queries
+            self._conn.execute("BEGIN")
+            try:
+                version = self._conn.execute(_SELECT_VERSION).fetchone()[0]
+                rows = self._conn.execute(_SELECT_ALL).fetchall()
+            finally:
+                self._conn.commit()
+        return version, list(map(ItemRecord._make, rows))
+
+    # Mutations
+    def add(self, item: Item) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(_INSERT, _row(item)).rowcount == 1
+
+    def add_many(self, items: List[Item]) -> List[bool]:
+        # One transaction, so the whole batch costs a single commit
+        with self._lock, self._conn:
+            return [self._conn.execute(_INSERT, _row(item)).rowcount == 1 for item in items]
+
+    def update(self, uid: str, updated_item: Item) -> bool:
+        with self._lock, self._conn:
+            # Same error as the other backends instead of the UNIQUE constraint's IntegrityError
+            if updated_item.uid != uid and self._conn.execute(_SELECT_ONE, (updated_item.uid,)).fetchone():
+                if self._conn.execute(_SELECT_ONE, (uid,)).fetchone() is None:
+                    return False
+                raise ValueError(f"Item '{updated_item.uid}' already exists.")
+            return self._conn.execute(_UPDATE, _row(updated_item) + (uid,)).rowcount == 1
+
+    def set_status(self, uid: str, status: str) -> bool:
+        if status not in ["0", "1"]:
+            raise ValueError("Status must be '0' or '1'.")
+        with self._lock, self._conn:
+            return self._conn.execute(_SET_STATUS, (status, uid)).rowcount == 1
+
+    def set_status_many(self, uids: List[str], status: str) -> List[bool]:
+        if status not in ["0", "1"]:
+            raise ValueError("Status must be '0' or '1'.")
+        with self._lock, self._conn:
+            return [self._conn.execute(_SET_STATUS, (status, uid)).rowcount == 1 for uid in uids]
+
+    def delete(self, uid: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(_DELETE, (uid,)).rowcount == 1
+
+
+def migrate_csv_to_sqlite(csv_path: Path, db_path: Path) -> int:
+    """
+    Copy every row of an inventory CSV into a SQLite database in one transaction.
+    Rows whose uid is already in the database are skipped.
+    Returns the number of rows imported.
+    """
+    store = SQLiteStore(db_path)
+    try:
+        with open(csv_path, mode='r', newline='') as file:
+            rows = [_row(InventoryItem(**row)) for row in csv.DictReader(file)]
+        with store._lock, store._conn:
+            # total_changes would also count the summary trigger writes
+            before = store._conn.execute(_COUNT).fetchone()[0]
+            store._conn.executemany(_INSERT, rows)
+            return store._conn.execute(_COUNT).fetchone()[0] - before
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.database.sqlite_store [inventory.csv] [inventory.db]
+    from app.config import CSV_PATH, SQLITE_PATH
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(CSV_PATH)
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(SQLITE_PATH)
+    imported = migrate_csv_to_sqlite(source, target)
+    print(f"✅ {imported} items migrated from {source} to {target}")
@@ -0,0 +1,344 @@
+# UltraSteelChallenge/app/database/store.py
+
+import bisect
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from app.models.record import ItemRecord
+from app.database.backend import StorageBackend, FIELDS, Item
+from app.database.aggregates import InventoryAggregates
+from app.database.filelock import FileLock, atomic_write
+from app.config import FILE_LOCK_TIMEOUT
+
+
+class InventoryStore(StorageBackend):
+    """
+    CSV storage backend with a process-resident index.
+
+    The file is parsed once into a hash index keyed on ``uid`` plus secondary
+    indexes on ``lot``, ``sku`` and ``status``. Every change is written through
+    to disk, so the CSV stays the source of truth between restarts. A sorted
+    list of uids backs cursor pagination, and the summary aggregates are
+    updated alongside the indexes. Rows are kept as immutable ItemRecord
+    tuples, so reads hand them out without copying.
+
+    Several processes (uvicorn workers) can share one file: writes hold a
+    lock file (``<csv>.lock``), rewrites replace the file atomically, and each
+    store compares the file's (inode, size, mtime) stamp before every call so
+    it reloads only after another process changed the data. Appends by other
+    processes are read incrementally from the previous end of the file.
+    A generation counter in the lock file catches changes the stat stamp
+    alone would miss (a replaced file can reuse the inode, size and mtime tick).
+    """
+
+    PAGE_CHUNK = 256
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._lock = threading.RLock()
+        self._items: Dict[str, ItemRecord] = {}
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {}
+        self._sorted_uids: List[str] = []
+        self._aggregates = InventoryAggregates()
+        self._file_lock = FileLock(Path(f"{self.file_path}.lock"), FILE_LOCK_TIMEOUT)
+        self._stamp = None        # (inode, size, mtime_ns) of the CSV as last synced
+        self._version = (0, 0)    # (generation, rewrite generation) from the lock file
+        self._dirty = None        # "append" or "rewrite" while a write is in progress
+        self.load()
+
+    # Loading and indexing
+    def load(self):
+        """
+        (Re)load the whole CSV file into memory and rebuild the indexes.
+        """
+        with self._lock, self._file_lock:
+            self._items = {}
+            self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+            self._aggregates.clear()
+            self._sorted_uids = []
+            self._stamp = self._stat()
+            self._version = self._file_lock.read_version()
+            if self._version == (0, 0):
+                # New lock file: start from the clock so versions never repeat
+                seed = time.time_ns() // 1000
+                self._version = (seed, seed)
+                self._file_lock.write_version(*self._version)
+            if self._stamp is None:
+                return
+            with open(self.file_path, mode='r', newline='') as file:
+                reader = csv.reader(file)
+                header = next(reader, None)
+                if header is None:
+                    return
+                # Columns in FIELDS order, whatever order the header lists them in
+                columns = [header.index(field) if field in header else None for field in FIELDS]
+                for row in reader:
+                    if row:
+                        self._load_row([row[i] if i is not None and i < len(row) else "" for i in columns])
+            self._sorted_uids = sorted(self._items)
+
+    def _load_row(self, row: List[str]) -> bool:
+        # Our own rows: trusted construction, no pydantic validation
+        item = ItemRecord.from_csv(*row)
+        # Keep the first occurrence, like the old linear scan did
+        if item.uid in self._items:
+            return False
+        self._items[item.uid] = item
+        self._index(item)
+        return True
+
+    def _load_appended(self, offset: int):
+        # Rows another process appended after ``offset``, the end of the file we last saw
+        with open(self.file_path, mode='r', newline='') as file:
+            file.seek(offset)
+            for row in csv.reader(file):
+                if row and self._load_row(row):
+                    self._sorted_insert(row[FIELDS.index("uid")])
+
+    # Cross-process cache invalidation
+    def _stat(self):
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _refresh(self):
+        """
+        Bring the in-memory copy up to date if another process changed the file.
+        Costs one stat() when nothing changed.
+        """
+        if self._stat() == self._stamp and self._file_lock.read_version() == self._version:
+            return
+        with self._file_lock:
+            stamp, version = self._stat(), self._file_lock.read_version()
+            old_stamp, (generation, _) = self._stamp, self._version
+            if stamp == old_stamp and version == self._version:
+                return
+            appended_only = (
+                version[0] > generation and version[1] <= generation
+                and stamp is not None and old_stamp is not None
+                and stamp[0] == old_stamp[0] and stamp[1] > old_stamp[1]
+            )
+            if appended_only:
+                # Other workers only appended rows since we last synced
+                self._load_appended(old_stamp[1])
+                self._stamp, self._version = stamp, version
+            else:
+                if version == self._version:
+                    # Edited outside the app: the new content still needs a new version
+                    self._file_lock.write_version(version[0] + 1, version[0] + 1)
+                self.load()
+
+    @contextmanager
+    def _writing(self):
+        # Serialise writers across threads and processes, starting from the latest data
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._dirty = None
+            yield
+            if self._dirty is not None:
+                generation = self._version[0] + 1
+                rewrite_generation = generation if self._dirty == "rewrite" else self._version[1]
+                self._version = (generation, rewrite_generation)
+                self._file_lock.write_version(*self._version)
+                self._dirty = None
+            self._stamp = self._stat()
+
+    def _index(self, item: ItemRecord):
+        for field in self.INDEXED_FIELDS:
+            self._indexes[field].setdefault(getattr(item, field), set()).add(item.uid)
+        self._aggregates.add(item)
+
+    def _unindex(self, item: ItemRecord):
+        for field in self.INDEXED_FIELDS:
+            bucket = self._indexes[field].get(getattr(item, field))
+            if bucket is not None:
+                bucket.discard(item.uid)
+                if not bucket:
+                    del self._indexes[field][getattr(item, field)]
+        self._aggregates.remove(item)
+
+    # Disk writes
+    def _append_rows(self, items: List[ItemRecord]):
+        self._dirty = self._dirty or "append"
+        write_header = not self.file_path.exists()
+        with open(self.file_path, mode='a', newline='') as file:
+            writer = csv.writer(file)
+            if write_header:
+                writer.writerow(FIELDS)
+            writer.writerows(items)
+
+    def _rewrite(self):
+        self._dirty = "rewrite"
+        with atomic_write(self.file_path) as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            writer.writerows(self._items.values())
+
+    # Queries
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._items)
+
+    def __contains__(self, uid: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return uid in self._items
+
+    def get(self, uid: str) -> Optional[ItemRecord]:
+        with self._lock:
+            self._refresh()
+            return self._items.get(uid)
+
+    def all(self) -> List[ItemRecord]:
+        with self._lock:
+            self._refresh()
+            return list(self._items.values())
+
+    def _sorted_insert(self, uid: str):
+        bisect.insort(self._sorted_uids, uid)
+
+    def _sorted_remove(self, uid: str):
+        i = bisect.bisect_left(self._sorted_uids, uid)
+        if i < len(self._sorted_uids) and self._sorted_uids[i] == uid:
+            del self._sorted_uids[i]
+
+    def iter_items(self, after_uid: Optional[str] = None, **filters: str) -> Iterator[ItemRecord]:
+        filters = {field: value for field, value in filters.items() if value is not None}
+        with self._lock:
+            self._refresh()
+        if filters:
+            # Walk the smallest matching index bucket instead of the whole inventory
+            with self._lock:
+                buckets = [self._indexes[field].get(value, set()) for field, value in filters.items()]
+                uids = sorted(min(buckets, key=len))
+        else:
+            uids = None
+        last = after_uid
+        while True:
+            with self._lock:
+                source = self._sorted_uids if uids is None else uids
+                start = bisect.bisect_right(source, last) if last is not None else 0
+                chunk = source[start:start + self.PAGE_CHUNK]
+                items = [self._items[uid] for uid in chunk if uid in self._items]
+            if not chunk:
+                return
+            last = chunk[-1]
+            for item in items:
+                if all(getattr(item, field) == value for field, value in filters.items()):
+                    yield item
+
+    def count_by(self, field: str, value: str) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._indexes[field].get(value, ()))
+
+    def version(self) -> Tuple[int, float]:
+        with self._lock:
+            self._refresh()
+            return self._version[0], self._stamp[2] / 1e9 if self._stamp else 0.0
+
+    def summary(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return self._aggregates.to_dict()
+
+    def rows_snapshot(self) -> Tuple[int, List[ItemRecord]]:
+        with self._lock:
+            self._refresh()
+            return self._version[0], list(self._items.values())
+
+    # Mutations
+    def add(self, item: Item) -> bool:
+        # Repeated tag reads are the common case: reject them without the file lock
+        if item.uid in self:
+            return False
+        with self._writing():
+            if item.uid in self._items:
+                return False
+            item = ItemRecord.from_item(item)
+            self._append_rows([item])
+            self._items[item.uid] = item
+            self._index(item)
+            self._sorted_insert(item.uid)
+            return True
+
+    def add_many(self, items: List[Item]) -> List[bool]:
+        with self._writing():
+            accepted = {}
+            results = []
+            for item in items:
+                is_new = item.uid not in self._items and item.uid not in accepted
+                if is_new:
+                    accepted[item.uid] = ItemRecord.from_item(item)
+                results.append(is_new)
+            if accepted:
+                self._append_rows(list(accepted.values()))
+                for item in accepted.values():
+                    self._items[item.uid] = item
+                    self._index(item)
+                    self._sorted_insert(item.uid)
+            return results
+
+    def update(self, uid: str, updated_item: Item) -> bool:
+        with self._writing():
+            current = self._items.get(uid)
+            if current is None:
+                return False
+            updated_item = ItemRecord.from_item(updated_item)
+            if updated_item.uid != uid and updated_item.uid in self._items:
+                raise ValueError(f"Item '{updated_item.uid}' already exists.")
+            self._unindex(current)
+            if updated_item.uid == uid:
+                self._items[uid] = updated_item
+            else:
+                # Re-key while keeping the row in the same position on disk
+                self._items = {
+                    (updated_item.uid if key == uid else key): (updated_item if key == uid else value)
+                    for key, value in self._items.items()
+                }
+                self._sorted_remove(uid)
+                self._sorted_insert(updated_item.uid)
+            self._index(updated_item)
+            self._rewrite()
+            return True
+
+    def set_status(self, uid: str, status: str) -> bool:
+        return self.set_status_many([uid], status)[0]
+
+    def set_status_many(self, uids: List[str], status: str) -> List[bool]:
+        if status not in ["0", "1"]:
+            raise ValueError("Status must be '0' or '1'.")
+        with self._writing():
+            results = []
+            changed = False
+            for uid in uids:
+                current = self._items.get(uid)
+                results.append(current is not None)
+                if current is None or current.status == status:
+                    continue
+                updated = current._replace(status=status)
+                self._unindex(current)
+                self._items[uid] = updated
+                self._index(updated)
+                changed = True
+            # One rewrite for the whole batch, none if nothing changed
+            if changed:
+                self._rewrite()
+            return results
+
+    def delete(self, uid: str) -> bool:
+        with self._writing():
+            current = self._items.pop(uid, None)
+            if current is None:
+                return False
+            self._unindex(current)
+            self._sorted_remove(uid)
+            self._rewrite()
+            return True
@@ -1,7 +1,10 @@
 # UltraSteelChallenge/app/main.py
 
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from app.api.endpoints import router as api_router
+from app.api.events import router as events_router
+from app.utils.metrics import HTTP_REQUEST_SECONDS
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(
@@ -10,6 +13,7 @@ app = FastAPI(
 )
 
 app.include_router(api_router)
+app.include_router(events_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -17,6 +21,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label with the route template (/find_item_by_uid/{uid}), not the raw path
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(method=request.method, path=path, status=status).observe(
+            time.perf_counter() - start)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
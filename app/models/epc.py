@@ -0,0 +1,197 @@
+# UltraSteelChallenge/app/models/epc.py
+
+# EPC codecs for inventory tags.
+#
+# Two layouts share the 96-bit (12-byte) EPC bank:
+#
+# * ASCII (legacy): sku, lot, uid, received_by and date as 12 printable
+#   characters, in the ``InventoryItem.LENGTHS`` layout. Only 2 characters of uid.
+# * Binary v1: bit-packed fields behind a version header byte::
+#
+#       bits  8   version (0x01)
+#            12   sku          2 chars x 6 bits
+#            12   lot          2 chars x 6 bits
+#            12   received_by  2 chars x 6 bits
+#            16   date         day of year (9 bits) + 2-digit year (7 bits)
+#            36   uid          6 chars x 6 bits
+#
+#   Text uses a 63-symbol alphabet with code 0 as end-of-text padding, so a
+#   uid of up to 6 characters gives ~6.3e10 distinct values.
+#
+# The header byte tells the layouts apart: ASCII tags start with a printable
+# character, binary ones with a byte below 0x20. Along the reader pipeline an
+# EPC travels as text: the 12 characters of an ASCII tag, or the 24 hex digits
+# of any other tag (``epc_to_text``), so no bytes are dropped.
+
+from typing import Iterable, List, Optional, Union
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+
+EPC_BYTES = 12
+VERSION_BINARY = 0x01
+FORMATS = ("ascii", "binary")
+
+# Code 0 is padding; a text field ends at the first padding symbol
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-"
+TEXT_CHARS = {"sku": 2, "lot": 2, "received_by": 2, "uid": 6}
+
+_CODES = {char: code for code, char in enumerate(ALPHABET, start=1)}
+
+
+class EPCError(ValueError):
+    """
+    The EPC cannot be decoded, or the item does not fit the layout.
+    """
+
+
+def _pair_table() -> List[Optional[str]]:
+    # Two 6-bit symbols -> text; None where a symbol follows padding (non-canonical)
+    table = []
+    for code in range(4096):
+        first, second = code >> 6, code & 0x3F
+        if first == 0:
+            table.append("" if second == 0 else None)
+        else:
+            table.append(ALPHABET[first - 1] + (ALPHABET[second - 1] if second else ""))
+    return table
+
+_PAIRS = _pair_table()
+
+
+# Text form used by the reader pipeline
+def epc_to_text(epc: bytes) -> str:
+    """
+    Printable characters of an ASCII tag (like the old reader loop), hex digits of any other tag.
+    """
+    if epc and 32 <= epc[0] <= 126:
+        return ''.join(chr(b) for b in epc if 32 <= b <= 126)
+    return epc.hex().upper()
+
+def text_to_epc(text: str) -> bytes:
+    """
+    EPC bytes to write for a text produced by ``epc_to_text`` or ``encode_epc``.
+    ASCII text is padded with zero bytes to the 12-byte bank.
+    """
+    if len(text) == 2 * EPC_BYTES:
+        try:
+            return bytes.fromhex(text)
+        except ValueError:
+            pass
+    if len(text) > EPC_BYTES:
+        raise EPCError(f"An EPC holds at most {EPC_BYTES} characters or {2 * EPC_BYTES} hex digits.")
+    return text.encode('ascii').ljust(EPC_BYTES, b"\x00")
+
+
+# Encoding
+def _pack_text(value: str, field: str) -> int:
+    chars = TEXT_CHARS[field]
+    if len(value) > chars:
+        raise EPCError(f"Field '{field}' must be at most {chars} characters long to fit the EPC.")
+    code = 0
+    for char in value:
+        symbol = _CODES.get(char)
+        if symbol is None:
+            raise EPCError(f"Field '{field}' may only contain {ALPHABET!r}.")
+        code = code << 6 | symbol
+    return code << 6 * (chars - len(value))
+
+def _pack_date(date: str) -> int:
+    if len(date) != 5 or not date.isdigit() or not 1 <= int(date[:3]) <= 366:
+        raise EPCError("Field 'date' must be a %j%y date such as 22125.")
+    return int(date[:3]) << 7 | int(date[3:])
+
+def encode_binary(item) -> bytes:
+    """
+    96-bit binary v1 EPC of an item (InventoryItem or ItemRecord).
+    """
+    if not item.uid:
+        raise EPCError("Field 'uid' must not be empty.")
+    value = VERSION_BINARY
+    value = value << 12 | _pack_text(item.sku, "sku")
+    value = value << 12 | _pack_text(item.lot, "lot")
+    value = value << 12 | _pack_text(item.received_by, "received_by")
+    value = value << 16 | _pack_date(item.date)
+    value = value << 36 | _pack_text(item.uid, "uid")
+    return value.to_bytes(EPC_BYTES, 'big')
+
+def encode_ascii(item) -> str:
+    """
+    Legacy 12-character EPC, in the ``InventoryItem.LENGTHS`` layout.
+    """
+    parts = []
+    for field, length in InventoryItem.LENGTHS.items():
+        value = getattr(item, field)
+        if len(value) != length:
+            raise EPCError(f"Field '{field}' must be {length} characters long to fit the EPC.")
+        parts.append(value)
+    return ''.join(parts)
+
+def encode_epc(item, epc_format: str = "binary") -> str:
+    """
+    Text of the EPC to write for an item: 24 hex digits (binary) or 12 characters (ascii).
+    """
+    if epc_format == "binary":
+        return encode_binary(item).hex().upper()
+    if epc_format == "ascii":
+        return encode_ascii(item)
+    raise EPCError(f"EPC format must be one of {FORMATS}.")
+
+def encode_epcs(items: Iterable, epc_format: str = "binary") -> List[str]:
+    """
+    Batch ``encode_epc``; raises on the first item that does not fit.
+    """
+    return [encode_epc(item, epc_format) for item in items]
+
+
+# Decoding
+def _decode_binary(epc: bytes) -> ItemRecord:
+    value = int.from_bytes(epc, 'big')
+    if value >> 88 != VERSION_BINARY:
+        raise EPCError(f"Unknown EPC version 0x{value >> 88:02X}.")
+    pairs = _PAIRS
+    sku = pairs[value >> 76 & 0xFFF]
+    lot = pairs[value >> 64 & 0xFFF]
+    received_by = pairs[value >> 52 & 0xFFF]
+    day, year = value >> 43 & 0x1FF, value >> 36 & 0x7F
+    uid_1, uid_2, uid_3 = pairs[value >> 24 & 0xFFF], pairs[value >> 12 & 0xFFF], pairs[value & 0xFFF]
+    if (None in (sku, lot, received_by, uid_1, uid_2, uid_3) or not uid_1
+            or (len(uid_1) < 2 and uid_2) or (len(uid_2) < 2 and uid_3)
+            or not 1 <= day <= 366 or year > 99):
+        raise EPCError("Malformed binary EPC.")
+    return ItemRecord(sku, lot, uid_1 + uid_2 + uid_3, received_by, f"{day:03d}{year:02d}")
+
+def _decode_ascii(text: str) -> ItemRecord:
+    if len(text) != EPC_BYTES:
+        raise EPCError(f"ASCII EPCs have {EPC_BYTES} characters, got {len(text)}.")
+    # sku(1) lot(2) uid(2) received_by(2) date(5)
+    return ItemRecord(text[0], text[1:3], text[3:5], text[5:7], text[7:12])
+
+def decode_epc(epc: Union[str, bytes]) -> ItemRecord:
+    """
+    Item fields stored in an EPC, given as raw bytes or as pipeline text.
+    Status and price are not stored on the tag and keep their defaults.
+    """
+    if isinstance(epc, (bytes, bytearray)):
+        if len(epc) == EPC_BYTES and epc[0] == VERSION_BINARY:
+            return _decode_binary(bytes(epc))
+        epc = epc_to_text(bytes(epc))
+    if len(epc) == 2 * EPC_BYTES:
+        try:
+            raw = bytes.fromhex(epc)
+        except ValueError:
+            raise EPCError("Malformed hex EPC.") from None
+        return _decode_binary(raw)
+    return _decode_ascii(epc)
+
+def decode_epcs(epcs: Iterable[Union[str, bytes]]) -> List[Optional[ItemRecord]]:
+    """
+    Batch ``decode_epc`` for ingestion: None for each EPC that cannot be decoded.
+    """
+    records = []
+    append = records.append
+    for epc in epcs:
+        try:
+            append(decode_epc(epc))
+        except EPCError:
+            append(None)
+    return records
@@ -28,6 +28,29 @@ class InventoryItem(BaseModel):
             idx += length
         return cls(**parts)
 
+    @classmethod
+    def from_epc(cls, epc):
+        """
+        Item stored in an EPC of either layout (see app.models.epc), as raw bytes or text.
+        Tag data comes from outside the store, so it is validated like any request body.
+        """
+        from app.models.epc import decode_epc
+        return cls.model_validate(decode_epc(epc)._asdict())
+
+    def to_epc_ascii(self) -> str:
+        """
+        Build the 12-character EPC written to the tag, in the LENGTHS layout.
+        """
+        from app.models.epc import encode_ascii
+        return encode_ascii(self)
+
+    def to_epc(self, epc_format: str = "binary") -> str:
+        """
+        EPC text to write to a tag: 24 hex digits (binary v1) or 12 characters (ascii).
+        """
+        from app.models.epc import encode_epc
+        return encode_epc(self, epc_format)
+
     def to_dict(self):
         return {
             "sku": self.sku,
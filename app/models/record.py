@@ -0,0 +1,72 @@
+import json
+import math
+from typing import Iterable, NamedTuple
+
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _encode_float(value: float) -> str:
+    # Same output as json.dumps, including its spelling of nan/inf
+    return float.__repr__(value) if math.isfinite(value) else json.dumps(value)
+
+
+class ItemRecord(NamedTuple):
+    """
+    Compact, immutable inventory row used inside the storage layer.
+
+    InventoryItem validates data coming in through the API and from tags;
+    rows read back from our own store are already valid, so they are built
+    as ItemRecord without running pydantic. Being an immutable tuple, a
+    record can be handed out by the store without copying it.
+    """
+
+    sku: str
+    lot: str
+    uid: str
+    received_by: str
+    date: str
+    status: str = "1"
+    price: float = 0.0
+
+    @classmethod
+    def from_item(cls, item) -> "ItemRecord":
+        """
+        Record for a validated InventoryItem (records are returned as they are).
+        """
+        if isinstance(item, cls):
+            return item
+        return cls(item.sku, item.lot, item.uid, item.received_by, item.date, item.status, item.price)
+
+    @classmethod
+    def from_csv(cls, sku, lot, uid, received_by, date, status, price) -> "ItemRecord":
+        """
+        Trusted construction from CSV text written by the store: only the price is converted.
+        """
+        return cls(sku, lot, uid, received_by, date, status or "1", float(price) if price else 0.0)
+
+    def to_item(self):
+        """
+        Full InventoryItem, built without re-validating the stored data.
+        """
+        from app.models.item import InventoryItem
+        return InventoryItem.model_construct(**self._asdict())
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    def to_json(self) -> str:
+        """
+        JSON object for the record, identical to ``json.dumps(record.to_dict())``.
+        """
+        return (
+            f'{{"sku": {_encode_str(self.sku)}, "lot": {_encode_str(self.lot)}, "uid": {_encode_str(self.uid)}, '
+            f'"received_by": {_encode_str(self.received_by)}, "date": {_encode_str(self.date)}, '
+            f'"status": {_encode_str(self.status)}, "price": {_encode_float(self.price)}}}'
+        )
+
+
+def records_to_json(records: Iterable[ItemRecord]) -> str:
+    """
+    JSON array of records, serialized straight from the tuples.
+    """
+    return "[" + ", ".join(record.to_json() for record in records) + "]"
@@ -0,0 +1,56 @@
+# UltraSteelChallenge/app/rfid/dedupe.py
+
+import threading
+import time
+from collections import OrderedDict
+from app.config import DEDUPE_TTL, DEDUPE_MAX_TAGS
+
+
+class TagDeduplicator:
+    """
+    Bounded LRU of recently read EPCs.
+
+    A tag sitting in the antenna field is reported on every poll. Only the first
+    sighting is passed on; later reads of the same EPC are suppressed while they
+    keep arriving less than ``ttl`` seconds apart. The cache holds at most
+    ``max_size`` EPCs and evicts the least recently seen one when full.
+    """
+
+    def __init__(self, ttl: float = DEDUPE_TTL, max_size: int = DEDUPE_MAX_TAGS, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._last_seen = OrderedDict()
+        self._lock = threading.Lock()
+        self.passed = 0
+        self.suppressed = 0
+
+    def is_new(self, epc: str) -> bool:
+        """
+        Record a sighting of ``epc`` and return True if it should be passed on.
+        """
+        now = self._clock()
+        with self._lock:
+            last = self._last_seen.get(epc)
+            self._last_seen[epc] = now
+            self._last_seen.move_to_end(epc)
+            if last is not None and now - last < self.ttl:
+                self.suppressed += 1
+                return False
+            if len(self._last_seen) > self.max_size:
+                self._last_seen.popitem(last=False)
+            self.passed += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._last_seen.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "cached_tags": len(self._last_seen),
+                "passed": self.passed,
+                "suppressed": self.suppressed,
+            }
@@ -0,0 +1,156 @@
+# UltraSteelChallenge/app/rfid/encoder.py
+
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.config import ENCODE_RETRIES, ENCODE_JOB_TTL, ENCODE_JOBS_MAX, EPC_FORMAT
+from app.models.item import InventoryItem
+from app.models.epc import encode_epc
+from app.rfid.writer import write_tag, read_tag_epc
+
+
+class EncodeJob:
+    """
+    Writes the EPC of each item to a tag, in order, and reads every tag back to
+    verify it. A tag is retried up to ``retries`` times before it is marked failed.
+    ``epc_format`` is the EPC layout written: "binary" (v1) or "ascii" (legacy).
+    """
+
+    def __init__(self, items: List[InventoryItem], retries: int = ENCODE_RETRIES,
+                 write: Callable[[str], bool] = write_tag, verify: Callable[[], str] = read_tag_epc,
+                 epc_format: str = EPC_FORMAT):
+        self.id = uuid.uuid4().hex[:12]
+        self.retries = retries
+        self.epc_format = epc_format
+        self.status = "pending"
+        self.created_at = datetime.now().isoformat()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._write = write
+        self._verify = verify
+        self.tags = []
+        for item in items:
+            # Items whose fields do not fit the EPC layout fail right away
+            try:
+                epc, error = encode_epc(item, epc_format), None
+            except ValueError as e:
+                epc, error = None, str(e)
+            self.tags.append({
+                "uid": item.uid,
+                "epc": epc,
+                "status": "failed" if error else "pending",
+                "attempts": 0,
+                "error": error,
+            })
+
+    def _encode(self, tag: dict):
+        for attempt in range(1, self.retries + 1):
+            tag["attempts"] = attempt
+            try:
+                if not self._write(tag["epc"]):
+                    tag["error"] = "Write rejected by reader"
+                    continue
+                read_back = self._verify()
+                if read_back == tag["epc"]:
+                    tag["status"] = "verified"
+                    tag["error"] = None
+                    return
+                tag["error"] = f"Verification read '{read_back}'"
+            except Exception as e:
+                tag["error"] = str(e)
+        tag["status"] = "failed"
+
+    def run(self):
+        self.status = "running"
+        self.started = time.monotonic()
+        for tag in self.tags:
+            if tag["status"] == "pending":
+                tag["status"] = "writing"
+                self._encode(tag)
+        self.finished = time.monotonic()
+        self.status = "done" if all(tag["status"] == "verified" for tag in self.tags) else "done_with_errors"
+
+    def to_dict(self) -> dict:
+        verified = sum(1 for tag in self.tags if tag["status"] == "verified")
+        failed = sum(1 for tag in self.tags if tag["status"] == "failed")
+        elapsed = None
+        if self.started is not None:
+            elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "epc_format": self.epc_format,
+            "created_at": self.created_at,
+            "total": len(self.tags),
+            "verified": verified,
+            "failed": failed,
+            "progress": (verified + failed) / len(self.tags) if self.tags else 1.0,
+            "elapsed_seconds": elapsed,
+            "tags_per_second": verified / elapsed if elapsed else None,
+            "tags": self.tags,
+        }
+
+
+class EncodeJobManager:
+    """
+    Runs encode jobs one after another on a background thread (there is one
+    antenna to write with) and keeps them around for the status endpoint.
+    Finished jobs are dropped ``ttl`` seconds after they end, and the oldest
+    ones first when more than ``max_jobs`` have finished; pending and running
+    jobs are always kept.
+    """
+
+    def __init__(self, ttl: float = ENCODE_JOB_TTL, max_jobs: int = ENCODE_JOBS_MAX, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._clock = clock
+        self._jobs: Dict[str, EncodeJob] = {}  # in submission order
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        # Holds the lock
+        now = self._clock()
+        finished = [job for job in self._jobs.values() if job.finished is not None]
+        excess = len(finished) - self.max_jobs
+        for job in finished:
+            if excess > 0 or now - job.finished >= self.ttl:
+                del self._jobs[job.id]
+                excess -= 1
+
+    def submit(self, job: EncodeJob) -> EncodeJob:
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="encode-jobs", daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[EncodeJob]:
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def all(self) -> List[EncodeJob]:
+        with self._lock:
+            self._evict()
+            return list(self._jobs.values())
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.run()
+            except Exception as e:
+                print("⚠ Encode job failed:", e)
+                job.status = "failed"
+                job.finished = self._clock()
+
+
+encode_jobs = EncodeJobManager()
@@ -0,0 +1,151 @@
+# UltraSteelChallenge/app/rfid/ingest_queue.py
+
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+from app.config import INGEST_QUEUE_SIZE, INGEST_BATCH_SIZE, INGEST_MAX_DELAY, INGEST_BACKPRESSURE
+from app.utils.metrics import INGEST_BATCH_ITEMS
+
+POLICIES = ("block", "drop")
+
+
+class IngestQueue:
+    """
+    Bounded queue between the reader threads and the database.
+
+    ``put`` only enqueues, so the serial thread never waits on a disk write.
+    A worker thread drains the queue in micro-batches of up to ``batch_size``
+    events, or whatever arrived within ``max_delay`` seconds of the first one,
+    and hands each batch to ``apply_batch`` in one call.
+
+    When the queue is full, ``policy`` decides: "drop" discards the new event
+    (counted in ``dropped``), "block" makes the caller wait for room.
+    """
+
+    def __init__(self, apply_batch: Callable[[List[Any]], None], max_size: int = INGEST_QUEUE_SIZE,
+                 batch_size: int = INGEST_BATCH_SIZE, max_delay: float = INGEST_MAX_DELAY,
+                 policy: str = INGEST_BACKPRESSURE, name: str = "ingest"):
+        if policy not in POLICIES:
+            raise ValueError(f"Backpressure policy must be one of {POLICIES}.")
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1.")
+        self._apply_batch = apply_batch
+        self._queue = queue.Queue(maxsize=max_size)
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.policy = policy
+        self.name = name
+        self._worker = None
+        self._lock = threading.Lock()
+        self._counter_lock = threading.Lock()  # several reader threads put concurrently
+        self._batch_items = INGEST_BATCH_ITEMS.labels(queue=name)
+        self.enqueued = 0
+        self.dropped = 0
+        self.batches = 0
+        self.applied = 0
+        self.errors = 0
+        self.last_batch_size = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-worker", daemon=True)
+                self._worker.start()
+
+    def put(self, event: Any) -> bool:
+        """
+        Enqueue one event. Returns False if it was dropped because the queue is full.
+        """
+        if self._worker is None:
+            self._ensure_worker()
+        if self.policy == "block":
+            self._queue.put(event)
+        else:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                with self._counter_lock:
+                    self.dropped += 1
+                return False
+        with self._counter_lock:
+            self.enqueued += 1
+        return True
+
+    def _next_batch(self) -> List[Any]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            # Take whatever is already queued, then wait out the rest of the window
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._apply_batch(batch)
+                self.applied += len(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠ Error applying a batch of {len(batch)} tags:", e)
+            finally:
+                self.batches += 1
+                self.last_batch_size = len(batch)
+                self._batch_items.observe(len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been applied. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "batch_size": self.batch_size,
+            "max_delay": self.max_delay,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "applied": self.applied,
+            "errors": self.errors,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": self.applied / self.batches if self.batches else 0.0,
+        }
+
+    def metric_families(self) -> List[tuple]:
+        labels = {"queue": self.name}
+        return [
+            ("ingest_queue_depth", "gauge", "Tag events waiting to be written.", [(labels, self.depth)]),
+            ("ingest_queue_enqueued_total", "counter", "Tag events accepted by the queue.", [(labels, self.enqueued)]),
+            ("ingest_queue_dropped_total", "counter", "Tag events dropped because the queue was full.", [(labels, self.dropped)]),
+            ("ingest_queue_batch_errors_total", "counter", "Batches that failed to apply.", [(labels, self.errors)]),
+        ]
@@ -1,43 +1,28 @@
 import serial
 import time
-import re
 from app.config import SERIAL_PORT, BAUDRATE
+from app.rfid.protocol import FrameParser, build_frame, CMD_SINGLE_POLL
 
 SERIAL_PORT = 'COM6'
 BAUDRATE = 115200
 
-def split_tags(data_string):
-    data_string = data_string.strip()
-    return re.findall(r'AA(?: [0-9A-F]{2})*? DD', data_string)
-
 def read_tags_loop(port=SERIAL_PORT, baudrate=BAUDRATE, interval=1):
-    read_cmd = bytes([
-        0xAA, 0x00, 0x22, 0x00, 0x00,
-        0x22, 0xDD
-    ])
+    read_cmd = build_frame(CMD_SINGLE_POLL)
+    parser = FrameParser()
 
     try:
         ser = serial.Serial(port, baudrate, timeout=1)
         print("📡 Escaneando etiquetas RFID. Presiona Ctrl+C para detener.\n")
         while True:
             ser.write(read_cmd)
-            response = ser.read(64)
+            response = ser.read(max(64, ser.in_waiting))
 
             if response:
-                response_str = ' '.join(f'{b:02X}' for b in response)
-                tags = split_tags(response_str)
+                tags = parser.feed_tags(response)
                 print(f"\n🔍 Etiquetas encontradas: {len(tags)}")
 
                 for tag in tags:
-                    tag_parts = tag.split(" ")
-                    try:
-                        header_index = tag_parts.index('AA')
-                        epc_len = int(tag_parts[header_index + 2], 16) // 2
-                        epc_data = tag_parts[header_index + 8:header_index + 3 + epc_len]
-                        epc_ascii = ''.join(chr(int(b, 16)) for b in epc_data if 32 <= int(b, 16) <= 126)
-                        print("✅ EPC (HEX):", ' '.join(epc_data), "\nEPC (ASCII):", epc_ascii)
-                    except Exception as e:
-                        print("⚠ No se pudo extraer el EPC:", e)
+                    print("✅ EPC (HEX):", tag.epc.hex(' ').upper(), "\nEPC (ASCII):", tag.epc_ascii)
             else:
                 print("\n❌ No se detectó respuesta del lector.")
 
@@ -0,0 +1,191 @@
+# UltraSteelChallenge/app/rfid/manager.py
+
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+from app.config import (
+    READERS, SERIAL_PORT, BAUDRATE, DEDUPE_TTL, READ_MODE, MULTI_POLL_COUNT, POLL_INTERVAL
+)
+from app.rfid.reader import RFIDReader
+from app.rfid.portal import ZONES
+
+ROLES = ("entry", "exit", "portal")
+
+
+@dataclass
+class ReaderConfig:
+    name: str
+    port: str = SERIAL_PORT
+    baudrate: int = BAUDRATE
+    role: str = "entry"  # what a read means for the inventory: "entry", "exit" or "portal"
+    mode: str = READ_MODE
+    poll_count: int = MULTI_POLL_COUNT
+    interval: float = POLL_INTERVAL
+    dedupe_ttl: float = DEDUPE_TTL
+    zone: Optional[str] = None  # portal readers: side of the door, "outside" or "inside"
+
+
+def load_reader_configs() -> List[ReaderConfig]:
+    """
+    Reader configurations from READERS in app/config.py.
+    """
+    return [ReaderConfig(**reader) for reader in READERS]
+
+
+class ReaderManager:
+    """
+    Runs any number of readers side by side, each with its own worker and
+    serial port, and sends every tag they read to one shared ingestion
+    function ``ingest(epc_ascii, role, reader_name)``.
+
+    Readers with the "portal" role report every read to
+    ``portal(epc_ascii, zone, reader_name)`` instead (see app.rfid.portal);
+    their dedupe cache is off, since the portal merges repeated reads itself.
+    """
+
+    def __init__(self, configs: Optional[List[ReaderConfig]] = None,
+                 ingest: Optional[Callable[[str, str, str], None]] = None,
+                 portal: Optional[Callable[[str, str, str], None]] = None):
+        self._ingest = ingest
+        self._portal = portal
+        self._configs: Dict[str, ReaderConfig] = {}
+        self._readers: Dict[str, RFIDReader] = {}
+        self._roles: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for config in configs or []:
+            self.add(config)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._configs)
+
+    @property
+    def default(self) -> str:
+        """
+        Name of the first configured reader.
+        """
+        if not self._configs:
+            raise KeyError("No readers configured.")
+        return next(iter(self._configs))
+
+    @property
+    def any_reading(self) -> bool:
+        return any(reader.reading for reader in self._readers.values())
+
+    @property
+    def portal_names(self) -> List[str]:
+        return [name for name, config in self._configs.items() if config.role == "portal"]
+
+    def add(self, config: ReaderConfig):
+        if config.role not in ROLES:
+            raise ValueError(f"Reader role must be one of {ROLES}.")
+        if config.role == "portal" and config.zone not in ZONES:
+            raise ValueError(f"Portal readers need a zone, one of {ZONES}.")
+        with self._lock:
+            if config.name in self._configs:
+                raise ValueError(f"Reader '{config.name}' already exists.")
+            for other in self._configs.values():
+                if other.port == config.port:
+                    raise ValueError(f"Port {config.port} is already used by reader '{other.name}'.")
+            self._configs[config.name] = config
+            self._roles[config.name] = config.role
+
+    def _get_config(self, name: str) -> ReaderConfig:
+        config = self._configs.get(name)
+        if config is None:
+            raise KeyError(f"Reader '{name}' not found.")
+        return config
+
+    def start(self, name: str, role: Optional[str] = None):
+        """
+        Start one reader. ``role`` overrides the configured role for this run.
+        """
+        config = self._get_config(name)
+        role = role or config.role
+        if role not in ROLES:
+            raise ValueError(f"Reader role must be one of {ROLES}.")
+        if role == "portal" and config.zone not in ZONES:
+            raise ValueError(f"Reader '{name}' has no portal zone.")
+        with self._lock:
+            reader = self._readers.get(name)
+            if reader is not None and reader.reading:
+                print(f"⚠ Reader {name} is already active.")
+                return
+            dedupe_ttl = 0 if role == "portal" else config.dedupe_ttl
+            reader = RFIDReader(config.port, config.baudrate, config.interval, dedupe_ttl,
+                                config.mode, config.poll_count, name=name)
+            self._readers[name] = reader
+            self._roles[name] = role
+
+        if role == "portal":
+            def on_tag_detected(epc_ascii):
+                if self._portal:
+                    self._portal(epc_ascii, config.zone, name)
+        else:
+            def on_tag_detected(epc_ascii):
+                if self._ingest:
+                    self._ingest(epc_ascii, role, name)
+
+        reader.start(on_tag_detected)
+
+    def stop(self, name: str):
+        self._get_config(name)
+        reader = self._readers.get(name)
+        if reader is not None:
+            reader.stop()
+
+    def start_all(self):
+        for name in self.names:
+            self.start(name)
+
+    def stop_all(self):
+        for name in self.names:
+            self.stop(name)
+
+    def status(self, name: str) -> dict:
+        config = self._get_config(name)
+        reader = self._readers.get(name)
+        status = asdict(config)
+        status["role"] = self._roles[name]
+        if reader is None:
+            status.update({"reading": False, "tags_read": 0, "error": None})
+        else:
+            status.update(reader.stats())
+        return status
+
+    def statuses(self) -> List[dict]:
+        return [self.status(name) for name in self.names]
+
+    def dedupe_stats(self) -> Dict[str, dict]:
+        return {name: reader.dedupe_stats() for name, reader in self._readers.items()}
+
+    def metric_families(self) -> List[tuple]:
+        """
+        Reader counters for the /metrics endpoint, read from the readers,
+        dedupe caches and serial transports at scrape time.
+        """
+        families = {
+            "rfid_reading": ("gauge", "1 while the reader is running.", "reading"),
+            "rfid_tags_read_total": ("counter", "Tags passed to ingestion (after dedupe).", "tags_read"),
+            "rfid_tags_per_second": ("gauge", "Recent tag ingestion rate.", "tags_per_second"),
+            "rfid_dedupe_hits_total": ("counter", "Repeated reads suppressed by the dedupe cache.", "suppressed"),
+            "rfid_frames_parsed_total": ("counter", "Valid frames parsed on the reader's port.", "frames"),
+            "rfid_parse_errors_total": ("counter", "Frames dropped because of a bad checksum.", "checksum_errors"),
+            "rfid_discarded_bytes_total": ("counter", "Bytes skipped while resynchronising.", "discarded_bytes"),
+            "rfid_command_timeouts_total": ("counter", "Commands the reader did not answer in time.", "timeouts"),
+        }
+        samples = {name: [] for name in families}
+        for status in self.statuses():
+            transport = status.get("transport") or {}
+            values = {
+                "reading": float(status["reading"]),
+                "tags_read": status["tags_read"],
+                "tags_per_second": status.get("tags_per_second", 0.0),
+                "suppressed": status.get("dedupe", {}).get("suppressed", 0),
+                **{key: transport.get(key, 0) for key in ("frames", "checksum_errors", "discarded_bytes", "timeouts")},
+            }
+            labels = {"reader": status["name"], "port": status["port"], "role": status["role"]}
+            for name, (_, _, key) in families.items():
+                samples[name].append((labels, values[key]))
+        return [(name, kind, documentation, samples[name])
+                for name, (kind, documentation, _) in families.items()]
@@ -0,0 +1,190 @@
+# UltraSteelChallenge/app/rfid/portal.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from app.config import PORTAL_IDLE_TIMEOUT, PORTAL_MAX_TAGS
+
+# A portal has an antenna (or reader) on each side of the door
+ZONES = ("outside", "inside")
+
+
+def infer_direction(zones: List[str]) -> Optional[str]:
+    """
+    "entry" for a tag that went from outside to inside, "exit" for the
+    opposite, None when it ended on the side it came from (it lingered in
+    front of one antenna or turned back).
+    """
+    if len(zones) < 2 or zones[0] == zones[-1]:
+        return None
+    return "entry" if zones[-1] == "inside" else "exit"
+
+
+class Presence:
+    """
+    One tag passing through the portal: when it was first and last seen and
+    the sequence of zones it was seen in (repeated reads in a zone collapse).
+    """
+
+    __slots__ = ("first_seen", "last_seen", "zones", "reads", "reader")
+
+    def __init__(self, zone: str, now: float, reader: Optional[str]):
+        self.first_seen = now
+        self.last_seen = now
+        self.zones = [zone]
+        self.reads = 1
+        self.reader = reader
+
+    def to_dict(self) -> dict:
+        return {"first_seen": self.first_seen, "last_seen": self.last_seen, "zones": list(self.zones),
+                "reads": self.reads, "reader": self.reader}
+
+
+class PortalTracker:
+    """
+    Presence state machine for entry/exit portals.
+
+    Readers on both sides of a portal run at the same time and report every
+    read with its zone. Reads of a tag are merged into one passage until the
+    tag has not been seen for ``idle_timeout`` seconds; the passage is then
+    closed and its direction inferred from the order of the zones, so
+    ``on_passage(epc, direction, reader_name)`` is called once per pallet
+    movement instead of once per read (``direction`` is None when the tag did
+    not cross). A background thread closes idle passages; at most ``max_tags``
+    are tracked, the stalest one is closed first when the limit is reached.
+    """
+
+    MAX_ZONE_CHANGES = 16  # zone sequence kept per passage (a tag bouncing between antennas); the last one is always current
+
+    def __init__(self, on_passage: Callable[[str, Optional[str], Optional[str]], None],
+                 idle_timeout: float = PORTAL_IDLE_TIMEOUT, max_tags: int = PORTAL_MAX_TAGS,
+                 clock=time.monotonic):
+        self._on_passage = on_passage
+        self.idle_timeout = idle_timeout
+        self.max_tags = max_tags
+        self._clock = clock
+        # Ordered by last sighting, so idle passages are always at the front
+        self._present: "OrderedDict[str, Presence]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        self.reads = 0
+        self.entries = 0
+        self.exits = 0
+        self.no_movement = 0
+
+    def _ensure_sweeper(self):
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._stop.clear()
+                self._sweeper = threading.Thread(target=self._run, name="portal-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _run(self):
+        interval = max(self.idle_timeout / 4, 0.05)
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print("⚠ Error closing portal passages:", e)
+
+    def observe(self, epc: str, zone: str, reader_name: Optional[str] = None):
+        """
+        Record one read of ``epc`` by the antenna in ``zone``.
+        """
+        if zone not in ZONES:
+            raise ValueError(f"Portal zone must be one of {ZONES}.")
+        if self._sweeper is None:
+            self._ensure_sweeper()
+        now = self._clock()
+        evicted = []
+        with self._lock:
+            self.reads += 1
+            presence = self._present.get(epc)
+            if presence is None:
+                self._present[epc] = Presence(zone, now, reader_name)
+                while len(self._present) > self.max_tags:
+                    evicted.append(self._present.popitem(last=False))
+            else:
+                presence.last_seen = now
+                presence.reads += 1
+                presence.reader = reader_name
+                if presence.zones[-1] != zone:
+                    if len(presence.zones) < self.MAX_ZONE_CHANGES:
+                        presence.zones.append(zone)
+                    else:
+                        # Past the cap only the latest zone moves, the direction depends on it
+                        presence.zones[-1] = zone
+                self._present.move_to_end(epc)
+        for item in evicted:
+            self._close(*item)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Close the passages of tags not seen for ``idle_timeout`` seconds.
+        Returns how many were closed.
+        """
+        now = self._clock() if now is None else now
+        closed = []
+        with self._lock:
+            while self._present:
+                epc, presence = next(iter(self._present.items()))
+                if now - presence.last_seen < self.idle_timeout:
+                    break
+                closed.append(self._present.popitem(last=False))
+        for item in closed:
+            self._close(*item)
+        return len(closed)
+
+    def flush(self) -> int:
+        """
+        Close every open passage now (used when reading stops).
+        """
+        with self._lock:
+            closed = list(self._present.items())
+            self._present.clear()
+        for item in closed:
+            self._close(*item)
+        return len(closed)
+
+    def _close(self, epc: str, presence: Presence):
+        direction = infer_direction(presence.zones)
+        if direction == "entry":
+            self.entries += 1
+        elif direction == "exit":
+            self.exits += 1
+        else:
+            self.no_movement += 1
+        self._on_passage(epc, direction, presence.reader)
+
+    def stop(self):
+        self._stop.set()
+
+    def active(self) -> dict:
+        """
+        Tags currently inside the portal and their presence state.
+        """
+        with self._lock:
+            return {epc: presence.to_dict() for epc, presence in self._present.items()}
+
+    def stats(self) -> dict:
+        return {
+            "present": len(self._present),
+            "idle_timeout": self.idle_timeout,
+            "reads": self.reads,
+            "entries": self.entries,
+            "exits": self.exits,
+            "no_movement": self.no_movement,
+        }
+
+    def metric_families(self) -> List[tuple]:
+        return [
+            ("portal_tags_present", "gauge", "Tags with an open passage through the portal.", [({}, len(self._present))]),
+            ("portal_reads_total", "counter", "Reads reported by portal antennas.", [({}, self.reads)]),
+            ("portal_passages_total", "counter", "Closed portal passages by inferred direction.", [
+                ({"direction": "entry"}, self.entries),
+                ({"direction": "exit"}, self.exits),
+                ({"direction": "none"}, self.no_movement),
+            ]),
+        ]
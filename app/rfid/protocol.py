@@ -0,0 +1,196 @@
+# UltraSteelChallenge/app/rfid/protocol.py
+
+# Frame layout of the R200 reader protocol:
+#   AA | type | command | PL (2 bytes, MSB first) | params (PL bytes) | checksum | DD
+# The checksum is the low byte of the sum of type, command, PL and params.
+
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+HEADER = 0xAA
+END = 0xDD
+
+# Frame types
+TYPE_COMMAND = 0x00
+TYPE_RESPONSE = 0x01
+TYPE_NOTIFICATION = 0x02
+
+# Commands
+CMD_SINGLE_POLL = 0x22
+CMD_MULTI_POLL = 0x27
+CMD_STOP_MULTI_POLL = 0x28
+CMD_READ_DATA = 0x39
+CMD_WRITE_DATA = 0x49
+CMD_ERROR = 0xFF
+
+# Error codes (params[0] of an error frame)
+ERR_NO_TAG = 0x15
+
+MAX_POLL_COUNT = 0xFFFF
+
+# Header + type + command + PL, and checksum + end byte
+_PREFIX_LEN = 5
+_FRAME_OVERHEAD = 7
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class Frame:
+    frame_type: int
+    command: int
+    params: bytes
+
+    @property
+    def is_error(self) -> bool:
+        return self.command == CMD_ERROR
+
+    @property
+    def error_code(self) -> Optional[int]:
+        return self.params[0] if self.is_error and self.params else None
+
+
+@dataclass(frozen=True)
+class TagNotification:
+    """
+    One tag reported by an inventory (poll) command.
+    """
+    rssi: int   # dBm, signed
+    pc: int     # Protocol Control word
+    epc: bytes
+    crc: int
+
+    @property
+    def epc_hex(self) -> str:
+        return self.epc.hex().upper()
+
+    @property
+    def epc_ascii(self) -> str:
+        # Only printable characters, like the tags written by writer.py
+        return ''.join(chr(b) for b in self.epc if 32 <= b <= 126)
+
+    @classmethod
+    def from_frame(cls, frame: Frame) -> Optional["TagNotification"]:
+        """
+        Decode an inventory notification frame. Returns None for any other frame.
+        """
+        params = frame.params
+        if frame.frame_type != TYPE_NOTIFICATION or frame.command != CMD_SINGLE_POLL or len(params) < 5:
+            return None
+        rssi = params[0] - 256 if params[0] > 127 else params[0]
+        return cls(
+            rssi=rssi,
+            pc=(params[1] << 8) | params[2],
+            epc=bytes(params[3:-2]),
+            crc=(params[-2] << 8) | params[-1],
+        )
+
+
+def checksum(body: BytesLike) -> int:
+    return sum(body) & 0xFF
+
+
+def build_frame(command: int, params: BytesLike = b"", frame_type: int = TYPE_COMMAND) -> bytes:
+    """
+    Build a complete frame ready to be written to the serial port.
+    """
+    body = bytes([frame_type, command, len(params) >> 8, len(params) & 0xFF]) + bytes(params)
+    return bytes([HEADER]) + body + bytes([checksum(body), END])
+
+
+def build_multi_poll(count: int) -> bytes:
+    """
+    Multi-poll (continuous inventory) command running ``count`` rounds, 1..65535.
+    """
+    if not 1 <= count <= MAX_POLL_COUNT:
+        raise ValueError(f"Poll count must be between 1 and {MAX_POLL_COUNT}.")
+    return build_frame(CMD_MULTI_POLL, bytes([0x22, count >> 8, count & 0xFF]))
+
+
+def build_notification(epc: bytes, rssi: int = 0xC9, pc: int = 0x3000, crc: int = 0x0000) -> bytes:
+    """
+    Build the notification frame a reader sends for one tag (used by tests and benchmarks).
+    """
+    params = bytes([rssi & 0xFF, pc >> 8, pc & 0xFF]) + bytes(epc) + bytes([crc >> 8, crc & 0xFF])
+    return build_frame(CMD_SINGLE_POLL, params, frame_type=TYPE_NOTIFICATION)
+
+
+class FrameParser:
+    """
+    Incremental frame parser working directly on bytes.
+
+    Data is fed as it arrives from the serial port; a rolling buffer keeps
+    partial frames until the rest shows up. Frames are delimited by the header
+    byte and the length field, and are only accepted when the end byte and the
+    checksum match. On a bad frame the parser drops the header byte and
+    resynchronizes on the next 0xAA.
+    """
+
+    def __init__(self, max_params: int = 512):
+        self.max_params = max_params
+        self._buffer = bytearray()
+        self.frames = 0
+        self.checksum_errors = 0
+        self.discarded_bytes = 0
+
+    def feed(self, data: BytesLike) -> List[Frame]:
+        """
+        Add received bytes and return every complete frame now available.
+        """
+        buf = self._buffer
+        buf += data
+        frames = []
+        pos = 0
+        size = len(buf)
+        while True:
+            start = buf.find(HEADER, pos)
+            if start < 0:
+                self.discarded_bytes += size - pos
+                pos = size
+                break
+            self.discarded_bytes += start - pos
+            pos = start
+            if size - pos < _PREFIX_LEN:
+                break
+            param_len = (buf[pos + 3] << 8) | buf[pos + 4]
+            if param_len > self.max_params:
+                # Not a real header, resync on the next one
+                self.discarded_bytes += 1
+                pos += 1
+                continue
+            end = pos + _FRAME_OVERHEAD + param_len
+            if end > size:
+                break
+            if buf[end - 1] != END or checksum(buf[pos + 1:end - 2]) != buf[end - 2]:
+                self.checksum_errors += 1
+                self.discarded_bytes += 1
+                pos += 1
+                continue
+            frames.append(Frame(buf[pos + 1], buf[pos + 2], bytes(buf[pos + _PREFIX_LEN:end - 2])))
+            pos = end
+        if pos:
+            del buf[:pos]
+        self.frames += len(frames)
+        return frames
+
+    def feed_tags(self, data: BytesLike) -> List[TagNotification]:
+        """
+        Like ``feed`` but only returns the decoded tag notifications.
+        """
+        tags = []
+        for frame in self.feed(data):
+            tag = TagNotification.from_frame(frame)
+            if tag is not None:
+                tags.append(tag)
+        return tags
+
+    def reset(self):
+        self._buffer.clear()
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "checksum_errors": self.checksum_errors,
+            "discarded_bytes": self.discarded_bytes,
+            "buffered_bytes": len(self._buffer),
+        }
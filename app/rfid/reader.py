@@ -2,97 +2,228 @@
 
 # Libraries
 import time
-import serial
-import re
 import threading
-from app.config import SERIAL_PORT, BAUDRATE
+from collections import deque
+from app.config import (
+    SERIAL_PORT, BAUDRATE, TIMEOUT, DEDUPE_TTL, READ_MODE, MULTI_POLL_COUNT, POLL_INTERVAL
+)
+from app.rfid.dedupe import TagDeduplicator
+from app.rfid.protocol import TagNotification, build_frame, build_multi_poll, CMD_SINGLE_POLL
+from app.rfid.transport import get_transport
+from app.models.epc import epc_to_text
+from app.utils.metrics import RFID_POLL_CYCLE_SECONDS, RFID_CALLBACK_SECONDS
 
-# Module variables
-_reading = False
-_reader_thread = None
-_ser = None
+# Window over which tags_per_second is averaged
+RATE_WINDOW = 10.0
 
 
-# FUNCTIONS
-# Split the data string into individual RFID tags
-def split_tags(data_string: str) -> list:
+# CLASSES
+class RFIDReader:
     """
-    Divide la cadena de datos en etiquetas RFID individuales.
+    One physical reader: its serial port, poll settings, dedupe cache and worker thread.
+    Several readers can run at the same time, each on its own port.
     """
-    data_string = data_string.strip()
-    return re.findall(r'AA(?: [0-9A-F]{2})*? DD', data_string)
-
-# Read loop function that continuously reads RFID tags
-def _read_loop(callback, port, baudrate, interval):
-    global _reading, _ser
-    read_cmd = bytes([0xAA, 0x00, 0x22, 0x00, 0x00, 0x22, 0xDD])
-
-    try:
-        _ser = serial.Serial(port, baudrate, timeout=1)
-        print("📡 Starting continuous reading of RFID tags...")
-
-        while _reading:
-            _ser.write(read_cmd)
-            time.sleep(1)
-            response = _ser.read(64)
-
-            if response:
-                response_str = ' '.join(f'{b:02X}' for b in response)
-                tags = split_tags(response_str)
-                for tag in tags:
-                    tag_parts = tag.split(" ")
-                    try:
-                        header_index = tag_parts.index('AA')
-                        epc_len = int(tag_parts[header_index + 2], 16) // 2
-                        epc_data = tag_parts[header_index + 8:header_index + 3 + epc_len]
-                        epc_ascii = ''.join(chr(int(b, 16)) for b in epc_data if 32 <= int(b, 16) <= 126)
-                        if callback:
-                            callback(epc_ascii)
-                    except Exception as e:
-                        print("⚠ EPC could not been extracted:", e)
-            else:
-                print("❌ No answer detected from reader.")
-
-            time.sleep(interval)
-
-    except Exception as err:
-        print("⚠ Error reading the RFID:", err)
-    finally:
-        if _ser and _ser.is_open:
-            _ser.close()
-        print("🛑 Reading tags stopped.")
 
+    def __init__(self, port=SERIAL_PORT, baudrate=BAUDRATE, interval=POLL_INTERVAL,
+                 dedupe_ttl=DEDUPE_TTL, mode=READ_MODE, poll_count=MULTI_POLL_COUNT, name=None):
+        """
+        Parameters:
+            port (str): Serial port to use for reading.
+            baudrate (int): Baud rate for the serial connection.
+            interval (float): Extra pause between single-poll cycles in seconds.
+            dedupe_ttl (float): Seconds during which repeated reads of a tag are
+                not passed to the callback. 0 disables deduplication.
+            mode (str): 'single' sends one poll command per cycle, 'multi' runs the
+                reader's continuous inventory and drains tags as they arrive.
+            poll_count (int): Inventory rounds per multi-poll command (1..65535).
+            name (str): Name used in logs and status reports.
+        """
+        if mode not in ("single", "multi"):
+            raise ValueError("Read mode must be 'single' or 'multi'.")
+        build_multi_poll(poll_count)  # validates the count before any thread starts
+        self.port = port
+        self.baudrate = baudrate
+        self.interval = interval
+        self.dedupe_ttl = dedupe_ttl
+        self.mode = mode
+        self.poll_count = poll_count
+        self.name = name or port
+        self.reading = False
+        self.tags_read = 0
+        self.error = None
+        self._callback = None
+        self._thread = None
+        self._transport = None
+        self._dedupe = None
+        self._stop_event = threading.Event()
+        self._rate_samples = deque()
+        # Metric children bound once; the hot loop only calls observe()
+        self._poll_timer = RFID_POLL_CYCLE_SECONDS.labels(reader=self.name)
+        self._callback_timer = RFID_CALLBACK_SECONDS.labels(reader=self.name)
+
+    # Pass a tag found in a frame to the callback
+    def _handle_frame(self, frame):
+        tag = TagNotification.from_frame(frame)
+        if tag is None:
+            return
+        # ASCII tags as text, binary ones as hex: non-printable bytes are kept
+        epc = epc_to_text(tag.epc)
+        if self._dedupe is not None and not self._dedupe.is_new(epc):
+            return
+        self.tags_read += 1
+        if self._callback:
+            start = time.perf_counter()
+            try:
+                self._callback(epc)
+            except Exception as e:
+                print("⚠ Error handling tag", epc, ":", e)
+            self._callback_timer.observe(time.perf_counter() - start)
+
+    # Read loop using one single-poll command (0x22) per cycle
+    def _single_poll_loop(self):
+        read_cmd = build_frame(CMD_SINGLE_POLL)
+        while self.reading:
+            # Returns as soon as the reader answers; the remaining tags of the
+            # round reach the listener while the next poll is queued
+            start = time.perf_counter()
+            try:
+                self._transport.request(read_cmd, CMD_SINGLE_POLL, timeout=TIMEOUT)
+            except TimeoutError:
+                print(f"❌ No answer detected from reader {self.name}.")
+            self._poll_timer.observe(time.perf_counter() - start)
+            if self.interval:
+                self._stop_event.wait(self.interval)
+
+    # Read loop using the continuous multi-poll command (0x27)
+    def _multi_poll_loop(self):
+        self._transport.start_inventory(build_multi_poll(self.poll_count))
+        try:
+            while not self._stop_event.wait(TIMEOUT):
+                if not self._transport.is_open:
+                    print(f"⚠ Serial transport of reader {self.name} closed unexpectedly.")
+                    break
+        finally:
+            self._transport.stop_inventory()
+
+    # Read loop function that continuously reads RFID tags
+    def _read_loop(self):
+        try:
+            # The port stays open after reading stops so the writer can reuse it
+            self._transport = get_transport(self.port, self.baudrate)
+            self._transport.add_listener(self._handle_frame)
+            print(f"📡 Starting continuous reading of RFID tags on {self.name} ({self.mode}-poll)...")
+            try:
+                if self.mode == "multi":
+                    self._multi_poll_loop()
+                else:
+                    self._single_poll_loop()
+            finally:
+                self._transport.remove_listener(self._handle_frame)
+
+        except Exception as err:
+            self.error = str(err)
+            print("⚠ Error reading the RFID:", err)
+        finally:
+            self.reading = False
+            print(f"🛑 Reading tags stopped on {self.name}.")
+
+    def start(self, callback=None):
+        """
+        Start reading RFID tags continuously in a separate thread.
+        Parameters:
+            callback (function): Function to call when a tag is detected.
+        """
+        if self.reading:
+            print("⚠ La lectura ya está en curso.")
+            return
+        self._callback = callback
+        self._dedupe = TagDeduplicator(ttl=self.dedupe_ttl) if self.dedupe_ttl > 0 else None
+        self._stop_event.clear()
+        self.error = None
+        self._rate_samples = deque([(time.monotonic(), self.tags_read)])
+        self.reading = True
+        self._thread = threading.Thread(target=self._read_loop, name=f"reader-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop reading (the serial transport stays open for the writer).
+        """
+        self.reading = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def dedupe_stats(self) -> dict:
+        if self._dedupe is None:
+            return {"ttl": 0, "cached_tags": 0, "passed": 0, "suppressed": 0}
+        return self._dedupe.stats()
+
+    def tags_per_second(self) -> float:
+        """
+        Tags passed to the callback per second over roughly the last RATE_WINDOW seconds.
+        """
+        now, tags_read = time.monotonic(), self.tags_read
+        samples = self._rate_samples
+        if not samples:
+            return 0.0
+        samples.append((now, tags_read))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW:
+            samples.popleft()
+        since, count = samples[0]
+        return (tags_read - count) / (now - since) if now > since else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "port": self.port,
+            "mode": self.mode,
+            "reading": self.reading,
+            "tags_read": self.tags_read,
+            "tags_per_second": self.tags_per_second() if self.reading else 0.0,
+            "error": self.error,
+            "dedupe": self.dedupe_stats(),
+            "transport": self._transport.stats() if self._transport else None,
+        }
+
+
+# Module variables
+_default_reader = None
+
+
+# FUNCTIONS
 # Start reading RFID tags in a separate thread
-def start_reading(callback=None, port=SERIAL_PORT, baudrate=BAUDRATE, interval=1):
+def start_reading(callback=None, port=SERIAL_PORT, baudrate=BAUDRATE, interval=POLL_INTERVAL,
+                  dedupe_ttl=DEDUPE_TTL, mode=READ_MODE, poll_count=MULTI_POLL_COUNT):
     """
-    Start reading RFID tags continuously in a separate thread.
-    Parameters:
-        callback (function): Function to call when a tag is detected.
-        port (str): Serial port to use for reading.
-        baudrate (int): Baud rate for the serial connection.
-        interval (int): Time interval between reads in seconds.
+    Start reading RFID tags continuously with the default reader.
+    See RFIDReader for the parameters.
     Returns:
         None
     """
-    global _reading, _reader_thread
+    global _default_reader
 
-    if _reading:
+    if _default_reader is not None and _default_reader.reading:
         print("⚠ La lectura ya está en curso.")
         return
 
-    _reading = True
-    _reader_thread = threading.Thread(target=_read_loop, args=(callback, port, baudrate, interval), daemon=True)
-    _reader_thread.start()
+    _default_reader = RFIDReader(port, baudrate, interval, dedupe_ttl, mode, poll_count)
+    _default_reader.start(callback)
+
+# Read deduplication statistics
+def get_dedupe_stats() -> dict:
+    """
+    Devuelve cuántas lecturas repetidas se han filtrado en la sesión actual.
+    """
+    if _default_reader is None:
+        return {"ttl": 0, "cached_tags": 0, "passed": 0, "suppressed": 0}
+    return _default_reader.dedupe_stats()
 
-# Stop reading RFID tags and close the serial connection
+# Stop reading RFID tags (the serial transport stays open for the writer)
 def stop_reading():
     """
     Detiene la lectura continua de RFID.
     """
-    global _reading, _ser
-    _reading = False
-    if _reader_thread:
-        _reader_thread.join()
-    if _ser and _ser.is_open:
-        _ser.close()
+    if _default_reader is not None:
+        _default_reader.stop()
     print("🔴 Lectura RFID detenida manualmente.")
@@ -1,75 +1,156 @@
 # UltraSteelChallenge/app/rfid/rfid_module.py
 
 from app.rfid.reader import *
+from app.rfid.manager import ReaderManager, load_reader_configs
 from app.rfid.writer import write_tag
-from app.database.client import exit_item, init_db, add_item
-from app.models.item import InventoryItem as item
+from app.rfid.ingest_queue import IngestQueue
+from app.rfid.portal import PortalTracker
+from app.database.client import add_items_bulk, exit_items_bulk, init_db
+from app.models.epc import decode_epcs
+from app.utils.event_bus import tag_events
+from app.utils.metrics import registry
+from datetime import datetime
+from itertools import groupby
+from typing import List, Optional, Tuple
+
+
+def publish_tag_event(epc_ascii: str, action: str, result: str):
+    """
+    Publish a tag read and its database outcome to live clients
+    """
+    tag_events.publish({
+        "epc": epc_ascii,
+        "timestamp": datetime.now().isoformat(),
+        "action": action,
+        "result": result,
+    })
+
+
+def ingest_batch(events: List[Tuple[str, str, Optional[str]]]):
+    """
+    Shared ingestion path for every reader: add the items read on entry, mark
+    the ones read on exit as exited, and publish each outcome.
+    Consecutive reads with the same role go to the store in one operation;
+    the order is kept, so an entry followed by an exit of a tag ends as exited.
+    """
+    for role, run in groupby(events, key=lambda event: event[1]):
+        run = [epc for epc, _, _ in run]
+        # ASCII and binary EPCs alike, decoded in one pass
+        epcs, records = [], []
+        for epc, record in zip(run, decode_epcs(run)):
+            if record is None:
+                publish_tag_event(epc, role, "invalid")
+            else:
+                epcs.append(epc)
+                records.append(record)
+        if not epcs:
+            continue
+        if role == "exit":
+            results = exit_items_bulk([record.uid for record in records])
+            outcomes = ["exited" if result else "not_found" for result in results]
+        else:
+            results = add_items_bulk(records)
+            outcomes = ["added" if result == 1 else "duplicate" for result in results]
+        done = sum(results)
+        print(f"✅ {len(epcs)} tags read ({role}): {done} {'exited' if role == 'exit' else 'added'}, "
+              f"{len(epcs) - done} {'not found' if role == 'exit' else 'already in the database'}.")
+        for epc_ascii, outcome in zip(epcs, outcomes):
+            publish_tag_event(epc_ascii, role, outcome)
+
+
+def ingest_tag(epc_ascii: str, role: str = "entry", reader_name: str = None):
+    """
+    Ingest a single tag read right away (readers go through the ingestion queue)
+    """
+    ingest_batch([(epc_ascii, role, reader_name)])
+
 
 class RFIDModule:
     def __init__(self):
         """
-        Initialize the RFID module
+        Initialize the RFID module with the readers configured in app/config.py
         """
-        self.reading = False
+        # Readers only enqueue; a worker writes the reads to the database in batches
+        self.ingest_queue = IngestQueue(ingest_batch)
+        # Portal readers feed the presence tracker, which enqueues one event per passage
+        self.portal = PortalTracker(self._enqueue_passage)
+        self.readers = ReaderManager(load_reader_configs(), ingest=self._enqueue_tag, portal=self.portal.observe)
+        registry.register_collector(self.readers.metric_families)
+        registry.register_collector(self.ingest_queue.metric_families)
+        registry.register_collector(self.portal.metric_families)
+
+    def _enqueue_tag(self, epc_ascii: str, role: str, reader_name: str):
+        self.ingest_queue.put((epc_ascii, role, reader_name))
+
+    def _enqueue_passage(self, epc_ascii: str, direction: Optional[str], reader_name: Optional[str]):
+        if direction is None:
+            # Seen on one side only, or turned back: nothing to write
+            publish_tag_event(epc_ascii, "portal", "no_movement")
+        else:
+            self.ingest_queue.put((epc_ascii, direction, reader_name))
 
-    def write(self, text: str): 
+    @property
+    def reading(self) -> bool:
+        return self.readers.any_reading
+
+    def write(self, text: str) -> bool:
         """
         Write text to an RFID tag
         :param text: Text to write to the tag
+        :return: True if the reader confirmed the write
         """
-        write_tag(text)
+        return write_tag(text)
     
     def start_reading(self):
         """
-        Start reading RFID tags continuously
+        Start reading RFID tags continuously on the default reader (entries)
         """
         if self.reading:
             print("⚠ Reading is already active.")
             return
-        
-        def on_tag_detected(epc_ascii):
-            if epc_ascii:
-                print(f"✅ Tag read: {epc_ascii}, length: {len(epc_ascii)}")
-            if len(epc_ascii) == 12:
-                new_tag = item.from_epc_ascii(epc_ascii)
-                result = add_item(new_tag)
-                if result == 1:
-                    print("✅ Tag added to the database.")
-                else:
-                    print("❌ Tag already exists in the database.")
-
-        start_reading(callback=on_tag_detected)
-        self.reading = True
+        self.readers.start(self.readers.default, role="entry")
 
     def start_reading_exits(self):
         """
-        Start reading RFID tags continuously
+        Start reading RFID tags continuously on the default reader (exits)
         """
         if self.reading:
             print("⚠ Reading is already active.")
             return
-        
-        def on_tag_detected(epc_ascii):
-            if epc_ascii:
-                print(f"✅ Tag read: {epc_ascii}, length: {len(epc_ascii)}")
-            if len(epc_ascii) == 12:
-                new_tag = item.from_epc_ascii(epc_ascii)
-                result = exit_item(new_tag.uid)
-                if result == True:
-                    print("✅ Tag status updated to exited.")
-                else:
-                    print("❌ Tag failed to update status or does not exist in the database.")
-
-        start_reading(callback=on_tag_detected)
-        self.reading = True
+        self.readers.start(self.readers.default, role="exit")
+
+    def start_portal(self):
+        """
+        Start every portal reader at once: entries and exits are told apart by
+        the order in which each tag passes the outside and inside antennas
+        """
+        names = self.readers.portal_names
+        if not names:
+            raise ValueError("No portal readers configured (role 'portal' in READERS).")
+        for name in names:
+            self.readers.start(name)
+
+    def stats(self) -> dict:
+        """
+        Reading statistics, including reads suppressed by the dedupe cache
+        """
+        return {
+            "reading": self.reading,
+            "dedupe": self.readers.dedupe_stats(),
+            "ingest_queue": self.ingest_queue.stats(),
+            "portal": self.portal.stats(),
+        }
 
     def stop_reading(self):
         """
-        Stop reading RFID tags
+        Stop reading RFID tags on every reader
         """
         if self.reading:
-            stop_reading()
-            self.reading = False
+            self.readers.stop_all()
+            # Close open portal passages and write what is still queued
+            # before reporting the reading as stopped
+            self.portal.flush()
+            self.ingest_queue.flush(timeout=5)
         else:
             print("⚠ Reading is not active.")
         
@@ -0,0 +1,280 @@
+# UltraSteelChallenge/app/rfid/simulator.py
+#
+# Software RFID reader speaking the same 0xAA ... 0xDD protocol as the R200.
+# It behaves like a serial.Serial object, so the transport, reader loop and
+# writer can run without hardware. Select it through the port setting:
+#
+#   sim://dock1?tags=50&arrival_rate=5&departure_rate=0.2&miss=0.1&corrupt=0.01&rounds=50&seed=1&epc=binary
+#
+# or register an instance with register_simulator() and use its port name.
+
+import math
+import random
+import string
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+from app.models.epc import ALPHABET, encode_binary
+from app.models.record import ItemRecord
+from app.rfid.protocol import (
+    FrameParser, build_frame, build_notification, CMD_SINGLE_POLL, CMD_MULTI_POLL,
+    CMD_STOP_MULTI_POLL, CMD_READ_DATA, CMD_WRITE_DATA, CMD_ERROR, ERR_NO_TAG, TYPE_RESPONSE
+)
+
+SIM_SCHEME = "sim://"
+ERR_ACCESS_FAILED = 0x10
+
+_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def random_epc(rng: random.Random, epc_format: str = "ascii") -> bytes:
+    """
+    Random EPC: 12 characters in the InventoryItem.LENGTHS layout, or a binary
+    v1 EPC with a 6-character uid when ``epc_format`` is "binary".
+    """
+    sku = rng.choice(string.digits)
+    lot = rng.choice(string.ascii_uppercase) + rng.choice(string.digits)
+    received_by = ''.join(rng.choice(string.ascii_uppercase) for _ in range(2))
+    date = f"{rng.randint(1, 365):03d}{rng.randint(20, 29)}"
+    if epc_format == "binary":
+        uid = ''.join(rng.choice(ALPHABET) for _ in range(6))
+        return encode_binary(ItemRecord(sku, lot, uid, received_by, date))
+    uid = ''.join(rng.choice(_ALPHABET) for _ in range(2))
+    return (sku + lot + uid + received_by + date).encode('ascii')
+
+
+class TagPopulation:
+    """
+    Tags in front of the antenna.
+
+    New tags arrive as a Poisson process (``arrival_rate`` tags per second) and
+    each tag leaves with ``departure_rate`` per second. On every inventory round
+    a tag in the field is missed with probability ``miss_probability``.
+    Arriving tags carry ``epc_format`` EPCs ("ascii" or "binary").
+    """
+
+    def __init__(self, epcs: Optional[List[bytes]] = None, arrival_rate: float = 0.0,
+                 departure_rate: float = 0.0, miss_probability: float = 0.0,
+                 seed: Optional[int] = None, clock=time.monotonic, epc_format: str = "ascii"):
+        self.rng = random.Random(seed)
+        self.epc_format = epc_format
+        self.arrival_rate = arrival_rate
+        self.departure_rate = departure_rate
+        self.miss_probability = miss_probability
+        self._clock = clock
+        self._last_step = clock()
+        self.tags: Dict[bytes, float] = {}  # EPC -> arrival time
+        self.arrived = 0
+        self.departed = 0
+        for epc in epcs or []:
+            self.add(bytes(epc))
+
+    def add(self, epc: bytes):
+        if epc not in self.tags:
+            self.tags[epc] = self._clock()
+            self.arrived += 1
+
+    def remove(self, epc: bytes):
+        if self.tags.pop(epc, None) is not None:
+            self.departed += 1
+
+    def _poisson(self, mean: float) -> int:
+        if mean > 30:
+            return max(0, round(self.rng.gauss(mean, math.sqrt(mean))))
+        # Knuth's method for small means
+        limit, count, product = math.exp(-mean), 0, self.rng.random()
+        while product > limit:
+            count += 1
+            product *= self.rng.random()
+        return count
+
+    def step(self):
+        """
+        Advance arrivals and departures to the current time.
+        """
+        now = self._clock()
+        elapsed, self._last_step = now - self._last_step, now
+        if elapsed <= 0:
+            return
+        if self.departure_rate:
+            leave = 1 - math.exp(-self.departure_rate * elapsed)
+            for epc in [epc for epc in self.tags if self.rng.random() < leave]:
+                self.remove(epc)
+        if self.arrival_rate:
+            for _ in range(self._poisson(self.arrival_rate * elapsed)):
+                self.add(random_epc(self.rng, self.epc_format))
+
+    def visible(self) -> List[bytes]:
+        """
+        Tags answering one inventory round (read misses already applied).
+        """
+        self.step()
+        if not self.miss_probability:
+            return list(self.tags)
+        return [epc for epc in self.tags if self.rng.random() >= self.miss_probability]
+
+
+class SimulatedSerial:
+    """
+    Drop-in replacement for serial.Serial backed by a TagPopulation.
+
+    Answers single-poll (0x22), multi-poll (0x27) and its stop (0x28), read
+    (0x39) and write (0x49) commands. A multi-poll runs ``rounds_per_second``
+    inventory rounds in real time. Outgoing frames are corrupted with
+    probability ``corrupt_probability`` to exercise the parser.
+    """
+
+    def __init__(self, population: Optional[TagPopulation] = None, timeout: float = 0.05,
+                 rounds_per_second: float = 50.0, corrupt_probability: float = 0.0,
+                 seed: Optional[int] = None, port: str = "sim://"):
+        self.population = population or TagPopulation(seed=seed)
+        self.timeout = timeout
+        self.rounds_per_second = rounds_per_second
+        self.corrupt_probability = corrupt_probability
+        self.port = port
+        self.is_open = True
+        self._rng = random.Random(seed)
+        self._parser = FrameParser()
+        self._out = bytearray()
+        self._lock = threading.Lock()
+        self._rounds_left = 0
+        self._next_round = 0.0
+        self.commands = deque(maxlen=1000)  # last command codes received
+        self.frames_sent = 0
+        self.frames_corrupted = 0
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 0.05) -> "SimulatedSerial":
+        query = {key: values[-1] for key, values in parse_qs(urlparse(url).query).items()}
+        seed = int(query["seed"]) if "seed" in query else None
+        population = TagPopulation(
+            arrival_rate=float(query.get("arrival_rate", 0)),
+            departure_rate=float(query.get("departure_rate", 0)),
+            miss_probability=float(query.get("miss", 0)),
+            seed=seed,
+            epc_format=query.get("epc", "ascii"),
+        )
+        for _ in range(int(query.get("tags", 0))):
+            population.add(random_epc(population.rng, population.epc_format))
+        return cls(population, timeout, float(query.get("rounds", 50)),
+                   float(query.get("corrupt", 0)), seed, port=url)
+
+    # Frames sent back to the host
+    def _emit(self, frame: bytes):
+        if self.corrupt_probability and self._rng.random() < self.corrupt_probability:
+            frame = bytearray(frame)
+            frame[self._rng.randrange(1, len(frame) - 1)] ^= 0xFF
+            self.frames_corrupted += 1
+        self._out += frame
+        self.frames_sent += 1
+
+    def _inventory_round(self) -> bool:
+        tags = self.population.visible()
+        for epc in tags:
+            self._emit(build_notification(epc, rssi=self._rng.randint(-70, -40), crc=self._rng.getrandbits(16)))
+        return bool(tags)
+
+    def _error(self, code: int):
+        self._emit(build_frame(CMD_ERROR, bytes([code]), frame_type=TYPE_RESPONSE))
+
+    def _run_due_rounds(self):
+        if not self._rounds_left:
+            return
+        now = time.monotonic()
+        if now - self._next_round > 1:
+            # Nobody read the port for a while; do not replay the missed rounds
+            self._next_round = now
+        while self._rounds_left and self._next_round <= now:
+            self._inventory_round()
+            self._rounds_left -= 1
+            self._next_round += 1 / self.rounds_per_second
+
+    def _handle(self, command: int, params: bytes):
+        self.commands.append(command)
+        if command == CMD_SINGLE_POLL:
+            if not self._inventory_round():
+                self._error(ERR_NO_TAG)
+        elif command == CMD_MULTI_POLL:
+            self._rounds_left = (params[1] << 8) | params[2] if len(params) >= 3 else 1
+            self._next_round = time.monotonic()
+        elif command == CMD_STOP_MULTI_POLL:
+            self._rounds_left = 0
+            self._emit(build_frame(CMD_STOP_MULTI_POLL, b"\x00", frame_type=TYPE_RESPONSE))
+        elif command in (CMD_WRITE_DATA, CMD_READ_DATA):
+            tags = self.population.visible()
+            if not tags:
+                self._error(ERR_ACCESS_FAILED)
+                return
+            epc = tags[0]
+            pc_epc = b"\x30\x00" + epc
+            if command == CMD_WRITE_DATA:
+                # The tag now answers with the new EPC
+                self.population.remove(epc)
+                self.population.add(bytes(params[9:21]))
+                self._emit(build_frame(CMD_WRITE_DATA, bytes([len(pc_epc)]) + pc_epc + b"\x00", frame_type=TYPE_RESPONSE))
+            else:
+                self._emit(build_frame(CMD_READ_DATA, bytes([len(pc_epc)]) + pc_epc + epc, frame_type=TYPE_RESPONSE))
+
+    # serial.Serial interface
+    @property
+    def in_waiting(self) -> int:
+        with self._lock:
+            self._run_due_rounds()
+            return len(self._out)
+
+    def write(self, data: bytes) -> int:
+        with self._lock:
+            for frame in self._parser.feed(data):
+                self._handle(frame.command, frame.params)
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        deadline = time.monotonic() + (self.timeout or 0)
+        while True:
+            with self._lock:
+                self._run_due_rounds()
+                if self._out:
+                    data = bytes(self._out[:size])
+                    del self._out[:size]
+                    return data
+                wait = deadline - time.monotonic()
+                if self._rounds_left:
+                    wait = min(wait, self._next_round - time.monotonic())
+            if deadline - time.monotonic() <= 0:
+                return b""
+            time.sleep(max(wait, 0.0005))
+
+    def reset_input_buffer(self):
+        with self._lock:
+            self._out.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+# Simulators registered by name, so tests can inject a configured instance
+_simulators: Dict[str, SimulatedSerial] = {}
+
+
+def register_simulator(port: str, simulator: SimulatedSerial):
+    _simulators[port] = simulator
+
+
+def unregister_simulator(port: str):
+    _simulators.pop(port, None)
+
+
+def open_simulator(port: str, timeout: float) -> Optional[SimulatedSerial]:
+    """
+    Return the simulator for ``port`` if it is registered or uses the sim:// scheme.
+    """
+    simulator = _simulators.get(port)
+    if simulator is not None:
+        simulator.timeout = timeout
+        simulator.is_open = True
+        return simulator
+    if port.startswith(SIM_SCHEME):
+        return SimulatedSerial.from_url(port, timeout)
+    return None
@@ -0,0 +1,267 @@
+# UltraSteelChallenge/app/rfid/transport.py
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+import serial
+from app.config import SERIAL_PORT, BAUDRATE, TIMEOUT, READ_TIMEOUT, MULTI_POLL_REARM
+from app.rfid.simulator import open_simulator
+from app.rfid.protocol import (
+    Frame, FrameParser, build_frame, CMD_SINGLE_POLL, CMD_MULTI_POLL, CMD_STOP_MULTI_POLL,
+    ERR_NO_TAG, TYPE_RESPONSE
+)
+
+# Inventory commands may legitimately end with a "no tag" error
+_POLL_COMMANDS = (CMD_SINGLE_POLL, CMD_MULTI_POLL)
+
+
+def open_serial(port: str, baudrate: int, timeout: float):
+    """
+    Open the serial connection used by a transport.
+    Ports using the sim:// scheme, or registered with register_simulator(),
+    get a software reader instead of a real serial port.
+    """
+    simulator = open_simulator(port, timeout)
+    if simulator is not None:
+        return simulator
+    return serial.Serial(port, baudrate, timeout=timeout)
+
+
+class _Command:
+    def __init__(self, frame: bytes, response_command: Optional[int], timeout: float):
+        self.frame = frame
+        self.response_command = response_command
+        self.timeout = timeout
+        self.done = threading.Event()
+        self.response: Optional[Frame] = None
+        self.error: Optional[Exception] = None
+
+
+class SerialTransport:
+    """
+    Long-lived owner of one reader's serial port.
+
+    A single I/O thread reads the port continuously, parses frames and hands
+    every frame to the registered listeners (the reader loop). Commands from
+    any thread go through a queue and are written one at a time; a request
+    waits for the response frame with the same command code. While a
+    continuous inventory is running, the transport stops it, runs the queued
+    request and restarts it, so writes slot in between inventory rounds
+    without reopening the port.
+    """
+
+    def __init__(self, port: str = SERIAL_PORT, baudrate: int = BAUDRATE, read_timeout: float = READ_TIMEOUT):
+        self.port = port
+        self.baudrate = baudrate
+        self.read_timeout = read_timeout
+        self._ser = None
+        self._parser = FrameParser()
+        self._commands = queue.Queue()
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._inventory_cmd: Optional[bytes] = None
+        self._last_rx = 0.0
+        self._thread = None
+        self._running = False
+        self.commands_sent = 0
+        self.timeouts = 0
+
+    # Lifecycle
+    @property
+    def is_open(self) -> bool:
+        return self._running
+
+    def open(self):
+        if self._running:
+            return
+        self._ser = open_serial(self.port, self.baudrate, self.read_timeout)
+        self._running = True
+        self._thread = threading.Thread(target=self._io_loop, name=f"serial-{self.port}", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if not self._running:
+            return
+        self.stop_inventory()
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._ser and self._ser.is_open:
+            self._ser.close()
+
+    # Listeners
+    def add_listener(self, listener: Callable[[Frame], None]):
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Frame], None]):
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    # Commands
+    def send(self, frame: bytes):
+        """
+        Queue a command without waiting for an answer.
+        """
+        self._commands.put(_Command(frame, None, 0))
+
+    def request(self, frame: bytes, response_command: int, timeout: float = TIMEOUT) -> Frame:
+        """
+        Queue a command and wait for its response frame (or the reader's error frame).
+        Must not be called from a listener, which runs on the I/O thread.
+        Raises TimeoutError if the reader does not answer in time.
+        """
+        command = _Command(frame, response_command, timeout)
+        self._commands.put(command)
+        # Generous bound: the command may wait behind a stop/restart of the inventory
+        if not command.done.wait(3 * timeout + 1):
+            raise TimeoutError(f"No response from reader on {self.port}.")
+        if command.error is not None:
+            raise command.error
+        return command.response
+
+    def start_inventory(self, inventory_cmd: bytes):
+        """
+        Run a continuous (multi-poll) inventory, re-armed whenever the line goes quiet.
+        """
+        self._inventory_cmd = inventory_cmd
+        self.send(inventory_cmd)
+
+    def stop_inventory(self):
+        if self._inventory_cmd is not None:
+            self._inventory_cmd = None
+            self.send(build_frame(CMD_STOP_MULTI_POLL))
+
+    # I/O thread
+    def _io_loop(self):
+        try:
+            while self._running:
+                self._process_commands()
+                self._read_once()
+                inventory_cmd = self._inventory_cmd
+                if inventory_cmd is not None and time.monotonic() - self._last_rx > MULTI_POLL_REARM:
+                    # The reader finished its rounds (or dropped the command): start again
+                    self._write(inventory_cmd)
+                    self._last_rx = time.monotonic()
+        except Exception as err:
+            print("⚠ Serial transport error on", self.port, ":", err)
+        finally:
+            self._running = False
+            self._drain_commands(ConnectionError(f"Serial transport on {self.port} closed."))
+
+    def _write(self, frame: bytes):
+        self._ser.write(frame)
+        self.commands_sent += 1
+
+    def _read_once(self) -> Tuple[Frame, ...]:
+        data = self._ser.read(self._ser.in_waiting or 1)
+        if not data:
+            return ()
+        self._last_rx = time.monotonic()
+        frames = tuple(self._parser.feed(data))
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for frame in frames:
+            for listener in listeners:
+                try:
+                    listener(frame)
+                except Exception as e:
+                    print("⚠ Error in serial listener:", e)
+        return frames
+
+    def _process_commands(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if command.response_command is None:
+                self._write(command.frame)
+                continue
+            paused = self._inventory_cmd
+            if paused is not None:
+                try:
+                    self._exchange(build_frame(CMD_STOP_MULTI_POLL), CMD_STOP_MULTI_POLL, TIMEOUT)
+                except TimeoutError:
+                    pass
+            try:
+                command.response = self._exchange(command.frame, command.response_command, command.timeout)
+            except Exception as e:
+                command.error = e
+            finally:
+                command.done.set()
+            if paused is not None and self._inventory_cmd is paused:
+                self._write(paused)
+                self._last_rx = time.monotonic()
+
+    def _exchange(self, frame: bytes, response_command: int, timeout: float) -> Frame:
+        self._write(frame)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for received in self._read_once():
+                if self._matches(received, response_command):
+                    return received
+        self.timeouts += 1
+        raise TimeoutError(f"No response to command 0x{response_command:02X} on {self.port}.")
+
+    @staticmethod
+    def _matches(frame: Frame, response_command: int) -> bool:
+        if frame.command == response_command:
+            return True
+        if frame.is_error and frame.frame_type == TYPE_RESPONSE:
+            # A late "no tag" from an inventory round must not answer a write
+            return response_command in _POLL_COMMANDS or frame.error_code != ERR_NO_TAG
+        return False
+
+    def _drain_commands(self, error: Exception):
+        # Flush fire-and-forget commands (e.g. the final stop) and fail waiting requests
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if command.response_command is None:
+                try:
+                    self._write(command.frame)
+                except Exception:
+                    pass
+                continue
+            command.error = error
+            command.done.set()
+
+    def stats(self) -> dict:
+        return {
+            "port": self.port,
+            "open": self._running,
+            "inventory_active": self._inventory_cmd is not None,
+            "commands_sent": self.commands_sent,
+            "timeouts": self.timeouts,
+            **self._parser.stats(),
+        }
+
+
+# One transport per serial port, shared by the reader loop and the tag writer
+_transports: Dict[str, SerialTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(port: str = SERIAL_PORT, baudrate: int = BAUDRATE) -> SerialTransport:
+    """
+    Return the open transport for ``port``, opening the port on first use.
+    """
+    with _transports_lock:
+        transport = _transports.get(port)
+        if transport is None or not transport.is_open:
+            transport = SerialTransport(port, baudrate)
+            transport.open()
+            _transports[port] = transport
+        return transport
+
+
+def close_transport(port: str = SERIAL_PORT):
+    with _transports_lock:
+        transport = _transports.pop(port, None)
+    if transport is not None:
+        transport.close()
@@ -1,74 +1,100 @@
 # UltraSteelChallenge/app/rfid/writer.py
 
 # Librearies
-import serial
-import time
-from app.config import SERIAL_PORT, BAUDRATE
+from app.config import SERIAL_PORT, BAUDRATE, TIMEOUT
+from app.rfid.protocol import build_frame, CMD_READ_DATA, CMD_WRITE_DATA
+from app.rfid.transport import get_transport
+from app.models.epc import epc_to_text, text_to_epc
+
+
+# Build the write command frame for the EPC memory bank
+def build_write_frame(data_str: str) -> bytes:
+    """
+    Encode up to 12 ASCII characters, or the 24 hex digits of a binary EPC,
+    into a write command for the EPC bank.
+    """
+    if len(data_str) > 12 and len(data_str) != 24:
+        raise ValueError("❌ Máximo 12 caracteres (12 bytes / 6 palabras) permitido.")
+
+    data_bytes = list(text_to_epc(data_str))
+
+    access_password = [0x00, 0x00, 0x00, 0x00]
+    membank = [0x01]  # EPC memory
+    word_pointer = [0x00, 0x02]
+    word_count = [0x00, 0x06]
+    parameters = access_password + membank + word_pointer + word_count + data_bytes
+    return build_frame(CMD_WRITE_DATA, bytes(parameters))
+
+
+# Build the read command frame for the 6 EPC words written by write_tag
+def build_read_frame() -> bytes:
+    access_password = [0x00, 0x00, 0x00, 0x00]
+    membank = [0x01]  # EPC memory
+    word_pointer = [0x00, 0x02]
+    word_count = [0x00, 0x06]
+    return build_frame(CMD_READ_DATA, bytes(access_password + membank + word_pointer + word_count))
+
+
+# Function to read back the EPC of the tag in the field
+def read_tag_epc(port: str = SERIAL_PORT, baudrate: int = BAUDRATE) -> str:
+    """
+    Read the 12 EPC bytes of the tag in front of the antenna.
+    Returns the printable characters of an ASCII tag or the hex digits of a
+    binary one (like the reader loop), or an empty string if the read failed.
+    """
+    response = get_transport(port, baudrate).request(build_read_frame(), CMD_READ_DATA, timeout=TIMEOUT)
+    if response.command != CMD_READ_DATA:
+        return ""
+    # params: UL + PC + EPC of the singulated tag, followed by the 12 bytes read
+    return epc_to_text(bytes(response.params[-12:]))
 
 
 # Function to write data to RFID tag
-def write_tag(data_str: str) -> None:
+def write_tag(data_str: str, port: str = SERIAL_PORT, baudrate: int = BAUDRATE) -> bool:
     """
     Write a string to an RFID tag.
 
     This function encodes a text string into ASCII, formats it into a write 
-    command frame according to the RFID protocol, and sends it to the RFID writer 
-    via the configured serial port.
+    command frame according to the RFID protocol, and sends it through the
+    shared serial transport of the reader. The port is opened once and reused,
+    so writes can run between inventory rounds while tags are being read.
 
     Parameters
     ----------
     data_str : str
-        The text to write to the RFID tag (maximum of 12 characters).
+        The text to write to the RFID tag (maximum of 12 characters), or the
+        24 hex digits of a binary EPC (see app.models.epc).
+
+    Returns
+    -------
+    bool
+        True if the reader confirmed the write.
 
     Raises
     ------
     ValueError
-        If the input string exceeds 12 characters.
+        If the input string exceeds 12 characters and is not a binary EPC.
+    TimeoutError
+        If the reader does not answer.
     """
 
-    if len(data_str) > 12:
-        raise ValueError("❌ Máximo 12 caracteres (12 bytes / 6 palabras) permitido.")
-
-    data_bytes = list(data_str.encode('ascii'))
-    data_bytes += [0x00] * (12 - len(data_bytes))
-
-    header = [0xAA]
-    frame_type = [0x00]
-    command = [0x49]
-    access_password = [0x00, 0x00, 0x00, 0x00]
-    membank = [0x01]  # EPC memory
-    word_pointer = [0x00, 0x02]
-    word_count = [0x00, 0x06]
-    parameters = access_password + membank + word_pointer + word_count + data_bytes
-    param_len = [len(parameters) >> 8, len(parameters) & 0xFF]
-
-    body = frame_type + command + param_len + parameters
-    checksum = [sum(body) & 0xFF]
-    end_byte = [0xDD]
-    frame = header + body + checksum + end_byte
-    
-    ser = serial.Serial(SERIAL_PORT, BAUDRATE, timeout=1)
-    time.sleep(1)
-    ser.write(bytes(frame))
-    time.sleep(1)
-    response = ser.read(64)
-    ser.close()
-
+    frame = build_write_frame(data_str)
     print("\n📤 Enviado:")
     print(' '.join(f'{b:02X}' for b in frame))
 
-    if response:
-        print("📥 Respuesta recibida:")
-        response2 = [f'{b:02X}' for b in response]
-        print(' '.join(response2))
-        if response2[2] == '49':
-            print("✅ Escritura exitosa.")
-        elif response2[2] == 'FF':
-            print(f"❌ Error del lector. Código: {response[5]:02X}")
-        else:
-            print("⚠ Respuesta inesperada.")
+    response = get_transport(port, baudrate).request(frame, CMD_WRITE_DATA, timeout=TIMEOUT)
+
+    print("📥 Respuesta recibida:")
+    print(f"{response.frame_type:02X} {response.command:02X} {response.params.hex(' ').upper()}")
+    if response.command == CMD_WRITE_DATA:
+        print("✅ Escritura exitosa.")
+        return True
+    if response.is_error:
+        code = f"{response.error_code:02X}" if response.error_code is not None else "?"
+        print(f"❌ Error del lector. Código: {code}")
     else:
-        print("❌ No hubo respuesta del lector.")
+        print("⚠ Respuesta inesperada.")
+    return False
 
 
 # Main function to run the writer
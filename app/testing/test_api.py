@@ -0,0 +1,331 @@
+import asyncio
+import json
+import os
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi.testclient import TestClient
+from app.database import client as db
+from app.database.changelog import changelog_path
+from app.database.ledger import ledger_path
+from app.api.endpoints import response_cache, rfid_module
+from app.api.events import tag_events_stream
+from app.main import app
+from app.models.item import InventoryItem
+from app.models.epc import encode_epc
+from app.rfid.manager import ReaderConfig, ReaderManager
+from app.rfid.simulator import SimulatedSerial, TagPopulation, register_simulator, unregister_simulator
+from app.rfid.transport import close_transport
+from app.utils.event_bus import tag_events
+
+
+class TestConditionalGet(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_api_inventory.csv")
+
+    def setUp(self):
+        # The endpoints use the default inventory; point it at a scratch file
+        self.patch = patch.object(db, "CSV_FILE", self.TEST_FILE)
+        self.patch.start()
+        db.init_db()
+        response_cache.clear()
+        db.add_item(InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111", price=2.5))
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        db.reset_store()
+        self.patch.stop()
+        for path in (self.TEST_FILE, ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)):
+            path.unlink(missing_ok=True)
+            Path(f"{path}.lock").unlink(missing_ok=True)
+
+    def test_etag_and_not_modified(self):
+        first = self.client.get("/get_all_items")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Last-Modified", first.headers)
+        etag = first.headers["ETag"]
+
+        again = self.client.get("/get_all_items", headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+        # Another page of the same version has its own cached body but the same ETag
+        page = self.client.get("/get_all_items", params={"limit": 1}, headers={"If-None-Match": '"0"'})
+        self.assertEqual(page.status_code, 200)
+        self.assertEqual(page.json()["items"][0]["uid"], "U1")
+
+    def test_changes_invalidate(self):
+        etag = self.client.get("/find_item_by_uid/U1").headers["ETag"]
+        db.exit_item("U1")
+
+        changed = self.client.get("/find_item_by_uid/U1", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["item"]["status"], "0")
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        summary = self.client.get("/summary", headers={"If-None-Match": etag})
+        self.assertEqual(summary.status_code, 200)
+        self.assertEqual(summary.json()["in_stock"], 0)
+
+    def test_cached_body_is_reused(self):
+        self.client.get("/get_all_items")
+        hits = response_cache.hits
+        with patch.object(db, "get_all_items", side_effect=AssertionError("store read again")):
+            body = self.client.get("/get_all_items").json()
+        self.assertEqual(response_cache.hits, hits + 1)
+        self.assertEqual([item["uid"] for item in body["items"]], ["U1"])
+
+    def test_group_by(self):
+        db.add_item(InventoryItem(sku="B", lot="L1", uid="U2", received_by="AA", date="11111", price=1.0))
+        body = self.client.get("/analytics/group_by", params={"by": "sku", "lot": "L1"}).json()
+        self.assertEqual(body, {"A": {"count": 1, "value": 2.5}, "B": {"count": 1, "value": 1.0}})
+        self.assertEqual(self.client.get("/analytics/group_by", params={"by": "uid"}).status_code, 422)
+
+    def test_movements(self):
+        db.exit_item("U1")
+        days = self.client.get("/movements/daily", params={"days": 7, "lot": "L1"}).json()["days"]
+        self.assertEqual(len(days), 7)
+        self.assertEqual((days[-1]["in"], days[-1]["out"]), (1, 1))
+        stock = self.client.get("/movements/stock", params={"date": days[-2]["date"]}).json()
+        self.assertEqual(stock["stock"], 0)
+        self.assertEqual(self.client.get("/movements/stock", params={"date": "2025-01-01"}).status_code, 400)
+
+    def test_if_modified_since(self):
+        os.utime(self.TEST_FILE, (1_700_000_000, 1_700_000_000))
+        first = self.client.get("/summary")
+        self.assertEqual(first.headers["Last-Modified"], "Tue, 14 Nov 2023 22:13:20 GMT")
+        since = first.headers["Last-Modified"]
+        self.assertEqual(self.client.get("/summary", headers={"If-Modified-Since": since}).status_code, 304)
+
+    def test_last_modified_round_trip(self):
+        # A write in the middle of a second: the Last-Modified sent back must still give 304
+        db.add_item(InventoryItem(sku="A", lot="L1", uid="U2", received_by="AA", date="11111"))
+        since = self.client.get("/summary").headers["Last-Modified"]
+        self.assertEqual(self.client.get("/summary", headers={"If-Modified-Since": since}).status_code, 304)
+
+
+class TestRequestMetrics(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_metrics.csv")
+
+    def setUp(self):
+        self.patch = patch.object(db, "CSV_FILE", self.TEST_FILE)
+        self.patch.start()
+        db.init_db()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        db.reset_store()
+        self.patch.stop()
+        for path in (self.TEST_FILE, ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)):
+            path.unlink(missing_ok=True)
+            Path(f"{path}.lock").unlink(missing_ok=True)
+
+    def test_requests_are_labelled_by_route_template(self):
+        epc = encode_epc(InventoryItem(sku="A", lot="L1", uid="M1", received_by="AA", date="11111"))
+        self.assertEqual(self.client.post(f"/add_from_tag/{epc}").status_code, 200)
+        self.client.get("/find_item_by_uid/M1")
+        self.assertEqual(self.client.get("/no/such/path/M1").status_code, 404)
+
+        text = self.client.get("/metrics").text
+        samples = [line for line in text.splitlines() if line.startswith("http_request_duration_seconds_count")]
+        self.assertIn('http_request_duration_seconds_count{method="POST",path="/add_from_tag/{epc_ascii}",status="200"}',
+                      " ".join(samples))
+        self.assertIn('path="/find_item_by_uid/{uid}"', " ".join(samples))
+        self.assertIn('{method="GET",path="unmatched",status="404"}', " ".join(samples))
+        # Raw ids never become label values
+        self.assertFalse([line for line in samples if "M1" in line or epc in line])
+
+
+class TestReaderEndpoints(unittest.TestCase):
+    PORT = "sim-api"
+
+    def setUp(self):
+        register_simulator(self.PORT, SimulatedSerial(TagPopulation([b"1A1U1DC22425"], seed=1),
+                                                      rounds_per_second=200, seed=1))
+        self.reads = []
+        # A manager of its own, so the test neither touches the configured readers nor the inventory
+        readers = ReaderManager(ingest=lambda epc, role, name: self.reads.append((epc, role, name)))
+        readers.add(ReaderConfig("dock", port=self.PORT, mode="multi", dedupe_ttl=5))
+        self.patch = patch.object(rfid_module, "readers", readers)
+        self.patch.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        rfid_module.readers.stop_all()
+        self.patch.stop()
+        close_transport(self.PORT)
+        unregister_simulator(self.PORT)
+
+    def test_list_start_and_stop(self):
+        readers = self.client.get("/readers").json()["readers"]
+        self.assertEqual([(r["name"], r["role"], r["reading"]) for r in readers], [("dock", "entry", False)])
+
+        self.assertEqual(self.client.post("/readers/dock/start", params={"role": "exit"}).status_code, 200)
+        deadline = time.monotonic() + 2
+        while not self.reads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status = self.client.get("/readers/dock").json()
+        self.assertEqual((status["reading"], status["role"]), (True, "exit"))
+        self.assertEqual(self.reads[0], ("1A1U1DC22425", "exit", "dock"))
+
+        self.assertEqual(self.client.post("/readers/dock/stop").status_code, 200)
+        self.assertFalse(self.client.get("/readers/dock").json()["reading"])
+        self.assertEqual(self.client.get("/readers/dock").json()["tags_read"], 1)
+
+    def test_unknown_reader_and_bad_role(self):
+        self.assertEqual(self.client.get("/readers/nope").status_code, 404)
+        self.assertEqual(self.client.post("/readers/nope/start").status_code, 404)
+        self.assertEqual(self.client.post("/readers/nope/stop").status_code, 404)
+        self.assertEqual(self.client.post("/readers/dock/start", params={"role": "portal"}).status_code, 400)
+
+
+class TestTagEvents(unittest.IsolatedAsyncioTestCase):
+    EVENT = {"epc": "1A1U1DC22425", "timestamp": "2025-01-01T00:00:00", "action": "entry", "result": "added"}
+
+    def wait_for_subscribers(self, count):
+        deadline = time.monotonic() + 2
+        while tag_events.stats()["subscribers"] != count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(tag_events.stats()["subscribers"], count)
+
+    def test_websocket(self):
+        subscribers = tag_events.stats()["subscribers"]
+        with TestClient(app).websocket_connect("/ws/tags") as websocket:
+            self.wait_for_subscribers(subscribers + 1)
+            tag_events.publish(self.EVENT)
+            self.assertEqual(websocket.receive_json(), self.EVENT)
+        self.wait_for_subscribers(subscribers)
+
+    async def test_server_sent_events(self):
+        # The stream never ends, so read it straight from the endpoint instead of through TestClient
+        subscribers = tag_events.stats()["subscribers"]
+        request = Mock(is_disconnected=AsyncMock(return_value=False))
+        response = await tag_events_stream(request)
+        self.assertEqual(response.media_type, "text/event-stream")
+        tag_events.publish(self.EVENT)
+        chunk = await asyncio.wait_for(response.body_iterator.__anext__(), timeout=2)
+        self.assertEqual(chunk, f"event: tag\ndata: {json.dumps(self.EVENT)}\n\n")
+        await response.body_iterator.aclose()
+        self.assertEqual(tag_events.stats()["subscribers"], subscribers)
+
+
+class TestBulkEndpoints(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_bulk.csv")
+
+    def setUp(self):
+        self.patch = patch.object(db, "CSV_FILE", self.TEST_FILE)
+        self.patch.start()
+        db.init_db()
+        db.add_item(self._item("U1"))
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        db.reset_store()
+        self.patch.stop()
+        for path in (self.TEST_FILE, ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)):
+            path.unlink(missing_ok=True)
+            Path(f"{path}.lock").unlink(missing_ok=True)
+
+    def _item(self, uid):
+        return InventoryItem(sku="A", lot="L1", uid=uid, received_by="AA", date="11111")
+
+    def test_add_bulk(self):
+        items = [self._item(uid).to_dict() for uid in ("U1", "U2", "U2", "U3")]
+        body = self.client.post("/add_bulk", json=items).json()
+        self.assertEqual((body["accepted"], body["duplicates"], body["invalid"]), (2, 2, 0))
+        self.assertEqual([(r["uid"], r["status"]) for r in body["results"]],
+                         [("U1", "duplicate"), ("U2", "accepted"), ("U2", "duplicate"), ("U3", "accepted")])
+        self.assertEqual(len(db.get_all_items()), 3)
+
+    def test_add_from_tags(self):
+        epcs = ["bad", encode_epc(self._item("U2")), encode_epc(self._item("U1")), "1A1U3"]
+        response = self.client.post("/add_from_tags", json=epcs)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["accepted"], body["duplicates"], body["invalid"]), (1, 1, 2))
+        self.assertEqual([r["status"] for r in body["results"]], ["invalid", "accepted", "duplicate", "invalid"])
+        self.assertEqual(body["results"][0]["epc"], "bad")
+        self.assertIn("12 characters", body["results"][0]["error"])
+        self.assertIsNotNone(db.find_item_by_uid("U2"))
+
+    def test_update_conflicts(self):
+        db.add_item(self._item("U2"))
+        response = self.client.post("/update_item/U1", json=self._item("U2").to_dict())
+        self.assertEqual((response.status_code, response.json()["detail"]), (409, "Item 'U2' already exists."))
+        self.assertEqual(self.client.post("/update_item/U9", json=self._item("U9").to_dict()).status_code, 404)
+        self.assertEqual(db.find_item_by_uid("U1").uid, "U1")
+
+    def test_add_from_tags_without_valid_epcs(self):
+        response = self.client.post("/add_from_tags", json=["bad", "worse"])
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual([r["status"] for r in response.json()["detail"]["results"]], ["invalid", "invalid"])
+
+
+class TestChangeFeed(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_changes.csv")
+
+    def setUp(self):
+        self.patch = patch.object(db, "CSV_FILE", self.TEST_FILE)
+        self.patch.start()
+        db.init_db()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        db.reset_store()
+        self.patch.stop()
+        for path in (self.TEST_FILE, ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)):
+            path.unlink(missing_ok=True)
+            Path(f"{path}.lock").unlink(missing_ok=True)
+
+    def test_client_mutations_are_streamed_in_order(self):
+        item = InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111")
+        db.add_item(item)
+        db.add_item(item)  # duplicate, not a change
+        db.add_items_bulk([item.model_copy(update={"uid": "U2"}), item.model_copy(update={"uid": "U3"})])
+        db.update_item("U2", item.model_copy(update={"uid": "U2", "price": 4.0}))
+        db.exit_item("U1")
+        db.exit_item("missing")
+        db.delete_item("U3")
+
+        first = self.client.get("/changes", params={"limit": 2}).json()
+        self.assertFalse(first["resync_required"])
+        self.assertEqual([(c["seq"], c["op"], c["uid"]) for c in first["changes"]], [(1, "add", "U1"), (2, "add", "U2")])
+        self.assertTrue(first["has_more"])
+
+        rest = self.client.get("/changes", params={"since": first["next_seq"], "epoch": first["epoch"]}).json()
+        self.assertEqual([(c["op"], c["uid"]) for c in rest["changes"]],
+                         [("add", "U3"), ("update", "U2"), ("exit", "U1"), ("delete", "U3")])
+        self.assertEqual(rest["changes"][1]["item"]["price"], 4.0)
+        self.assertEqual((rest["next_seq"], rest["has_more"]), (6, False))
+
+        caught_up = self.client.get("/changes", params={"since": 6}).json()
+        self.assertEqual((caught_up["changes"], caught_up["resync_required"]), ([], False))
+
+    def test_repeated_exits_are_not_changes(self):
+        db.add_item(InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111"))
+        db.exit_item("U1")
+        last_seq = db.get_changelog().last_seq
+        self.assertTrue(db.exit_item("U1"))
+        self.assertEqual(db.exit_items_bulk(["U1", "U1"]), [True, True])
+        self.assertEqual(db.get_changelog().last_seq, last_seq)
+
+        db.add_item(InventoryItem(sku="A", lot="L1", uid="U2", received_by="AA", date="11111"))
+        db.exit_items_bulk(["U2", "U2", "U1"])
+        body = self.client.get("/changes", params={"since": last_seq + 1}).json()
+        self.assertEqual([(c["op"], c["uid"]) for c in body["changes"]], [("exit", "U2")])
+
+    def test_resync_required(self):
+        log = db.get_changelog()
+        log.record_many("add", [(f"U{i}", None) for i in range(log.max_entries + 5)])
+        behind = self.client.get("/changes", params={"since": 3}).json()
+        self.assertTrue(behind["resync_required"])
+        self.assertEqual((behind["changes"], behind["next_seq"]), ([], log.last_seq))
+        # The oldest kept change is still reachable
+        edge = self.client.get("/changes", params={"since": behind["oldest_seq"] - 1, "limit": 1}).json()
+        self.assertEqual(edge["changes"][0]["seq"], behind["oldest_seq"])
+        # A cursor from another log, e.g. before the inventory was recreated
+        self.assertTrue(self.client.get("/changes", params={"since": 1, "epoch": "other"}).json()["resync_required"])
+        self.assertTrue(self.client.get("/changes", params={"since": log.last_seq + 1}).json()["resync_required"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,32 @@
 import unittest
+from unittest.mock import patch
+from multiprocessing import get_context
 from pathlib import Path
 import csv
+import json
 from app.database.client import (
-    init_db, add_item, get_all_items, find_item_by_uid,
+    init_db, add_item, add_items_bulk, get_all_items, get_items_page, iter_items, find_item_by_uid,
     update_item, delete_item, count_items_by_lot,
-    count_items_by_sku, exit_item, FIELDS
+    count_items_by_sku, exit_item, exit_items_bulk, get_summary, get_columnar, group_items, reset_store, FIELDS,
+    get_stock_on, get_daily_movements, get_changelog, get_ledger
 )
+from app.database.aggregates import InventoryAggregates
+from app.database.changelog import ChangeLog, changelog_path
+from app.database.ledger import MovementLedger, ledger_path, julian_to_ordinal, ordinal_to_julian, ordinal_to_timestamp
+from app.database.sqlite_store import migrate_csv_to_sqlite
+from app.database.record_store import RecordStore, RECORD, HEADER_SIZE, migrate_csv_to_records
+from app.database.store import InventoryStore
 from app.models.item import InventoryItem
+from app.models.record import ItemRecord, records_to_json
+
+
+def _worker_writes(file_path: Path, worker: int, count: int):
+    # Runs in a separate process, like a uvicorn worker sharing the inventory file
+    for n in range(count):
+        uid = f"W{worker}{n:03d}"
+        add_item(InventoryItem(sku="AAA", lot="B1", uid=uid, received_by="AA", date="11111"), file_path)
+        if n % 5 == 0:
+            exit_item(uid, file_path)
 
 
 class TestInventoryDatabase(unittest.TestCase):
@@ -18,8 +38,13 @@ class TestInventoryDatabase(unittest.TestCase):
 
     def tearDown(self):
         # Elimina el archivo después de cada prueba
+        reset_store(self.TEST_FILE)
         if self.TEST_FILE.exists():
             self.TEST_FILE.unlink()
+        Path(f"{self.TEST_FILE}.lock").unlink(missing_ok=True)
+        for side_file in (ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)):
+            for path in (side_file, Path(f"{side_file}.lock")):
+                path.unlink(missing_ok=True)
 
     def test_add_and_find_item(self):
         item = InventoryItem(sku="001", lot="L001", uid="U001", received_by="XY", date="12345")
@@ -33,7 +58,9 @@ class TestInventoryDatabase(unittest.TestCase):
     def test_prevent_duplicate_uid(self):
         item = InventoryItem(sku="002", lot="L002", uid="U002", received_by="ZZ", date="12345")
         result1 = add_item(item, self.TEST_FILE)
-        result2 = add_item(item, self.TEST_FILE)
+        # A repeated read is rejected without taking the change log lock
+        with patch.object(ChangeLog, "writing", side_effect=AssertionError("change log locked")):
+            result2 = add_item(item, self.TEST_FILE)
 
         self.assertEqual(result1, 1)
         self.assertEqual(result2, 0)
@@ -47,6 +74,13 @@ class TestInventoryDatabase(unittest.TestCase):
         updated = find_item_by_uid("U003", self.TEST_FILE)
         self.assertEqual(updated.status, "0")
 
+    def test_exit_items_bulk(self):
+        add_items_bulk(["1A1U1DC22425", "1A1U2DC22425"], self.TEST_FILE)
+        exit_item("U1", self.TEST_FILE)
+        self.assertEqual(exit_items_bulk(["U1", "U2", "XX"], self.TEST_FILE), [True, True, False])
+        self.assertEqual(count_items_by_sku("1", self.TEST_FILE), 2)
+        self.assertEqual(get_summary(self.TEST_FILE)["by_status"], {"0": {"count": 2, "value": 0.0}})
+
     def test_update_item(self):
         original = InventoryItem(sku="004", lot="L004", uid="U004", received_by="CD", date="12347")
         updated = InventoryItem(sku="004", lot="L004", uid="U004", received_by="ZZ", date="54321")
@@ -57,6 +91,15 @@ class TestInventoryDatabase(unittest.TestCase):
         self.assertEqual(result.received_by, "ZZ")
         self.assertEqual(result.date, "54321")
 
+    def test_update_cannot_take_another_uid(self):
+        add_item(InventoryItem(sku="004", lot="L004", uid="U1", received_by="CD", date="12347"), self.TEST_FILE)
+        add_item(InventoryItem(sku="005", lot="L005", uid="U2", received_by="CD", date="12347"), self.TEST_FILE)
+        with self.assertRaises(ValueError):
+            update_item("U1", InventoryItem(sku="009", lot="L004", uid="U2", received_by="CD", date="12347"), self.TEST_FILE)
+        self.assertEqual([item.uid for item in get_all_items(self.TEST_FILE)], ["U1", "U2"])
+        self.assertEqual(get_summary(self.TEST_FILE)["by_sku"], {"004": {"count": 1, "value": 0.0}, "005": {"count": 1, "value": 0.0}})
+        self.assertEqual([item.uid for item in iter_items(file_path=self.TEST_FILE)], ["U1", "U2"])
+
     def test_delete_item(self):
         item = InventoryItem(sku="005", lot="L005", uid="U005", received_by="EF", date="12348")
         add_item(item, self.TEST_FILE)
@@ -76,6 +119,442 @@ class TestInventoryDatabase(unittest.TestCase):
         self.assertEqual(count_items_by_lot("B1", self.TEST_FILE), 2)
         self.assertEqual(count_items_by_sku("BBB", self.TEST_FILE), 1)
 
+    def test_add_items_bulk(self):
+        add_item(InventoryItem(sku="AAA", lot="B1", uid="ID1", received_by="AA", date="11111"), self.TEST_FILE)
+        batch = [
+            InventoryItem(sku="AAA", lot="B1", uid="ID1", received_by="AA", date="11111"),
+            InventoryItem(sku="AAA", lot="B1", uid="ID2", received_by="AA", date="11112"),
+            InventoryItem(sku="AAA", lot="B1", uid="ID2", received_by="AA", date="11112"),
+            "CL1U3DC22425",
+        ]
+        self.assertEqual(add_items_bulk(batch, self.TEST_FILE), [0, 1, 0, 1])
+        self.assertEqual(count_items_by_lot("B1", self.TEST_FILE), 2)
+        self.assertEqual(find_item_by_uid("U3", self.TEST_FILE).lot, "L1")
+
+    def test_paginate_and_filter(self):
+        add_items_bulk([
+            InventoryItem(sku="AAA" if n % 2 else "BBB", lot="B1", uid=f"ID{n:02d}", received_by="AA", date="11111")
+            for n in range(10, 0, -1)
+        ], self.TEST_FILE)
+
+        page, cursor = get_items_page(4, file_path=self.TEST_FILE)
+        self.assertEqual([item.uid for item in page], ["ID01", "ID02", "ID03", "ID04"])
+        page, cursor = get_items_page(4, after_uid=cursor, file_path=self.TEST_FILE)
+        self.assertEqual(cursor, "ID08")
+        page, cursor = get_items_page(4, after_uid=cursor, file_path=self.TEST_FILE)
+        self.assertEqual([item.uid for item in page], ["ID09", "ID10"])
+        self.assertIsNone(cursor)
+
+        exit_item("ID03", self.TEST_FILE)
+        active_aaa = iter_items(sku="AAA", status="1", after_uid="ID01", file_path=self.TEST_FILE)
+        self.assertEqual([item.uid for item in active_aaa], ["ID05", "ID07", "ID09"])
+
+    def test_indexes_follow_updates_and_deletes(self):
+        add_item(InventoryItem(sku="AAA", lot="B1", uid="ID1", received_by="AA", date="11111"), self.TEST_FILE)
+        add_item(InventoryItem(sku="AAA", lot="B1", uid="ID2", received_by="AA", date="11112"), self.TEST_FILE)
+        update_item("ID1", InventoryItem(sku="BBB", lot="B2", uid="ID1", received_by="AA", date="11111"), self.TEST_FILE)
+        delete_item("ID2", self.TEST_FILE)
+
+        self.assertEqual(count_items_by_sku("AAA", self.TEST_FILE), 0)
+        self.assertEqual(count_items_by_lot("B2", self.TEST_FILE), 1)
+        self.assertEqual(count_items_by_sku("BBB", self.TEST_FILE), 1)
+
+    def test_summary_matches_full_recount(self):
+        add_items_bulk([
+            InventoryItem(sku="A", lot=f"L{n % 3}", uid=f"S{n:02d}", received_by="AA", date="11111", price=n * 1.1)
+            for n in range(20)
+        ], self.TEST_FILE)
+        add_item(InventoryItem(sku="B", lot="L9", uid="S99", received_by="AA", date="11111", price=0.3), self.TEST_FILE)
+        update_item("S01", InventoryItem(sku="B", lot="L1", uid="S01", received_by="AA", date="11111", price=7.7), self.TEST_FILE)
+        update_item("S02", InventoryItem(sku="A", lot="L2", uid="S50", received_by="AA", date="11111", price=2.2), self.TEST_FILE)
+        exit_item("S03", self.TEST_FILE)
+        exit_item("S04", self.TEST_FILE)
+        delete_item("S05", self.TEST_FILE)
+        delete_item("S99", self.TEST_FILE)
+
+        recount = InventoryAggregates(get_all_items(self.TEST_FILE)).to_dict()
+        summary = get_summary(self.TEST_FILE)
+        self.assertEqual(summary, recount)
+        self.assertEqual(summary["total_items"], 19)
+        self.assertEqual(summary["by_status"]["0"]["count"], 2)
+        self.assertNotIn("L9", summary["by_lot"])
+        self.assertAlmostEqual(summary["total_value"], sum(item.price for item in get_all_items(self.TEST_FILE)))
+
+        # Rebuilt from the stored rows when the store is opened again
+        reset_store(self.TEST_FILE)
+        self.assertEqual(get_summary(self.TEST_FILE), recount)
+
+    def test_ledger_follows_stock(self):
+        add_items_bulk([InventoryItem(sku="A", lot="L1", uid=f"U{n}", received_by="AA", date="11111") for n in range(4)],
+                       self.TEST_FILE)
+        exit_item("U0", self.TEST_FILE)
+        exit_items_bulk(["U0", "U1", "U1"], self.TEST_FILE)  # repeated exit reads are not movements
+        delete_item("U2", self.TEST_FILE)
+        # Setting the status back to "1" receives the item again
+        update_item("U1", InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111"), self.TEST_FILE)
+
+        days = get_daily_movements(1, file_path=self.TEST_FILE)
+        self.assertEqual((days[0]["in"], days[0]["out"]), (5, 2))
+        today = days[0]["date"]
+        self.assertEqual(get_stock_on(today, file_path=self.TEST_FILE), get_summary(self.TEST_FILE)["in_stock"])
+        self.assertEqual(get_stock_on(today, lot="L1", file_path=self.TEST_FILE), 2)
+        self.assertEqual(get_stock_on(today, lot="other", file_path=self.TEST_FILE), 0)
+
+    def test_reset_closes_the_side_file_locks(self):
+        add_item(InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111"), self.TEST_FILE)
+        log, ledger = get_changelog(self.TEST_FILE), get_ledger(self.TEST_FILE)
+        reset_store(self.TEST_FILE)
+        self.assertEqual((log._file_lock._fd, ledger._file_lock._fd), (None, None))
+
+    def test_ledger_follows_lot_and_sku_changes(self):
+        add_item(InventoryItem(sku="A", lot="L1", uid="U1", received_by="AA", date="11111"), self.TEST_FILE)
+        update_item("U1", InventoryItem(sku="B", lot="L2", uid="U1", received_by="AA", date="11111"), self.TEST_FILE)
+        today = get_daily_movements(1, file_path=self.TEST_FILE)[0]["date"]
+        self.assertEqual(get_stock_on(today, file_path=self.TEST_FILE), 1)
+        self.assertEqual([get_stock_on(today, lot=lot, file_path=self.TEST_FILE) for lot in ("L1", "L2")], [0, 1])
+        self.assertEqual([get_stock_on(today, sku=sku, file_path=self.TEST_FILE) for sku in ("A", "B")], [0, 1])
+
+    def test_columnar_engine_matches_store(self):
+        add_items_bulk([
+            InventoryItem(sku=f"K{n % 4}", lot=f"L{n % 3}", uid=f"C{n:02d}", received_by="AA", date="11111", price=n * 0.7)
+            for n in range(30)
+        ], self.TEST_FILE)
+        exit_items_bulk(["C01", "C02", "C07"], self.TEST_FILE)
+        view = get_columnar(self.TEST_FILE)
+        self.assertEqual(get_summary(self.TEST_FILE, engine="columnar"), get_summary(self.TEST_FILE))
+        self.assertEqual(count_items_by_lot("L1", self.TEST_FILE, engine="columnar"), count_items_by_lot("L1", self.TEST_FILE))
+        self.assertEqual(count_items_by_sku("K9", self.TEST_FILE, engine="columnar"), 0)
+        self.assertEqual(group_items("sku", lot="L0", status="1", file_path=self.TEST_FILE, engine="columnar"),
+                         group_items("sku", lot="L0", status="1", file_path=self.TEST_FILE, engine="store"))
+        self.assertEqual(view.count(sku=["K0", "K1"], min_price=7.5), 10)
+        self.assertAlmostEqual(view.sum_price(status="0"), 0.7 + 1.4 + 4.9)
+        self.assertEqual([row["uid"] for row in view.select(limit=2, lot="L2")], ["C02", "C05"])
+        self.assertEqual(view.select(limit=1)[0], find_item_by_uid("C00", self.TEST_FILE).to_dict())
+
+        # Reused until the data changes, then rebuilt
+        self.assertIs(get_columnar(self.TEST_FILE), view)
+        delete_item("C00", self.TEST_FILE)
+        self.assertEqual(get_columnar(self.TEST_FILE).count(), 29)
+
+    def test_changes_written_through_to_disk(self):
+        add_item(InventoryItem(sku="006", lot="L006", uid="U006", received_by="GH", date="12349"), self.TEST_FILE)
+        add_item(InventoryItem(sku="007", lot="L007", uid="U007", received_by="GH", date="12349"), self.TEST_FILE)
+        exit_item("U006", self.TEST_FILE)
+        delete_item("U007", self.TEST_FILE)
+
+        # Un store nuevo debe ver lo mismo que hay en el CSV
+        reset_store(self.TEST_FILE)
+        with open(self.TEST_FILE, newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row["uid"] for row in rows], ["U006"])
+        self.assertEqual(find_item_by_uid("U006", self.TEST_FILE).status, "0")
+        self.assertIsNone(find_item_by_uid("U007", self.TEST_FILE))
+
+    def test_concurrent_worker_processes(self):
+        workers, count = 4, 40
+        context = get_context("spawn")
+        processes = [context.Process(target=_worker_writes, args=(self.TEST_FILE, w, count)) for w in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        # Nothing lost: every add and every exit of every worker is in the file
+        reset_store(self.TEST_FILE)
+        items = get_all_items(self.TEST_FILE)
+        self.assertEqual(len(items), workers * count)
+        self.assertEqual(len({item.uid for item in items}), workers * count)
+        self.assertEqual(count_items_by_lot("B1", self.TEST_FILE), workers * count)
+        self.assertEqual(sum(item.status == "0" for item in items), workers * count // 5)
+
+
+class TestItemRecord(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_records.csv")
+
+    def tearDown(self):
+        reset_store(self.TEST_FILE)
+        ledger, changes = ledger_path(self.TEST_FILE), changelog_path(self.TEST_FILE)
+        for path in (self.TEST_FILE, Path(f"{self.TEST_FILE}.lock"), ledger, Path(f"{ledger}.lock"),
+                     changes, Path(f"{changes}.lock")):
+            path.unlink(missing_ok=True)
+
+    def test_json_matches_json_dumps(self):
+        records = [
+            ItemRecord("A", "L1", "U1", "AA", "11111", "1", 2.5),
+            ItemRecord('"', "\\", "ü\n", "AA", "11111", "0", 1e-7),
+            ItemRecord.from_item(InventoryItem(sku="B", lot="L2", uid="U2", received_by="BB", date="22222")),
+        ]
+        for record in records:
+            self.assertEqual(record.to_json(), json.dumps(record.to_dict()))
+        self.assertEqual(json.loads(records_to_json(records)), [record.to_dict() for record in records])
+        self.assertEqual(records[2].to_item(), InventoryItem(**records[2].to_dict()))
+
+    def test_store_returns_records_without_copies(self):
+        # Columns in another order than FIELDS, as an older or hand-edited file could have
+        with open(self.TEST_FILE, mode='w', newline='') as file:
+            file.write("uid,sku,lot,received_by,date,price,status\nU1,A,L1,AA,11111,2.5,1\nU2,B,L2,BB,22222,,\n")
+        items = get_all_items(self.TEST_FILE)
+        self.assertEqual(items, [ItemRecord("A", "L1", "U1", "AA", "11111", "1", 2.5),
+                                 ItemRecord("B", "L2", "U2", "BB", "22222", "1", 0.0)])
+        self.assertIs(find_item_by_uid("U1", self.TEST_FILE), items[0])
+        exit_item("U1", self.TEST_FILE)
+        # Records are immutable: the one handed out earlier is unchanged
+        self.assertEqual(items[0].status, "1")
+        self.assertEqual(find_item_by_uid("U1", self.TEST_FILE).status, "0")
+
+
+class TestMovementLedger(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_ledger.csv.movements")
+
+    def setUp(self):
+        self.now = ordinal_to_timestamp(julian_to_ordinal("10025")) + 3600
+        self.ledger = MovementLedger(self.TEST_FILE, clock=lambda: self.now)
+
+    def tearDown(self):
+        for path in (self.TEST_FILE, Path(f"{self.TEST_FILE}.lock")):
+            path.unlink(missing_ok=True)
+
+    def _item(self, uid, lot="L1", date="10025", status="1"):
+        return ItemRecord("A", lot, uid, "AA", date, status)
+
+    def test_julian_dates(self):
+        self.assertEqual(julian_to_ordinal("00125") + 365, julian_to_ordinal("00126"))
+        self.assertEqual(ordinal_to_julian(julian_to_ordinal("36624")), "36624")
+        with self.assertRaises(ValueError):
+            julian_to_ordinal("2025-01-01")
+
+    def test_daily_flows_and_stock(self):
+        day = 86400
+        self.ledger.record("receive", [self._item("U1"), self._item("U2"), self._item("U3", lot="L2")])
+        self.ledger.record("exit", [self._item("U1")], ts=self.now + 2 * day)
+        # An event for an earlier day lands in the middle of the index
+        self.ledger.record("receive", [self._item("U4")], ts=self.now - 5 * day)
+
+        days = self.ledger.daily(3, end=julian_to_ordinal("10225"), lot="L1")
+        self.assertEqual(days, [{"date": "10025", "in": 2, "out": 0}, {"date": "10125", "in": 0, "out": 0},
+                                {"date": "10225", "in": 0, "out": 1}])
+        self.assertEqual(self.ledger.stock_on(julian_to_ordinal("09425")), 0)
+        self.assertEqual(self.ledger.stock_on(julian_to_ordinal("09525")), 1)
+        self.assertEqual(self.ledger.stock_on(julian_to_ordinal("10125")), 4)
+        self.assertEqual(self.ledger.stock_on(julian_to_ordinal("36525"), lot="L1"), 2)
+        with self.assertRaises(ValueError):
+            self.ledger.stock_on(julian_to_ordinal("10025"), lot="L1", sku="A")
+
+    def test_reopened_and_shared_ledgers(self):
+        self.assertEqual(self.ledger.backfill([self._item("U1", date="09025"), self._item("U2", status="0")]), 3)
+        self.assertEqual(self.ledger.backfill([self._item("U3")]), 0)  # only an empty ledger is seeded
+        other = MovementLedger(self.TEST_FILE, clock=lambda: self.now)
+        self.assertEqual(other.stock_on(julian_to_ordinal("09525")), 1)
+        # Rows appended through one instance are picked up by the other
+        other.record("receive", [self._item("U5")])
+        self.assertEqual(self.ledger.stock_on(self.ledger.today()), 2)
+        self.assertEqual(self.ledger.events, {"receive": 3, "exit": 1, "delete": 0})
+
+
+class TestChangeLog(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_log.csv.changes")
+
+    def tearDown(self):
+        for path in (self.TEST_FILE, Path(f"{self.TEST_FILE}.lock")):
+            path.unlink(missing_ok=True)
+
+    def test_workers_share_one_sequence(self):
+        # Two logs on one file stand in for two worker processes
+        worker_a, worker_b = ChangeLog(self.TEST_FILE), ChangeLog(self.TEST_FILE)
+        self.assertEqual(worker_a.record("add", "U1", ItemRecord("A", "L1", "U1", "AA", "11111", "1", 2.5)), 1)
+        self.assertEqual(worker_b.record("exit", "U1"), 2)
+        self.assertEqual(worker_a.record("delete", "U1"), 3)
+        body = worker_b.since(0, 10)
+        self.assertEqual([(c["seq"], c["op"]) for c in body["changes"]], [(1, "add"), (2, "exit"), (3, "delete")])
+        self.assertEqual(body["changes"][0]["item"]["price"], 2.5)
+        self.assertEqual(body["epoch"], worker_a.epoch)
+        # A restarted worker continues the same sequence
+        self.assertEqual(ChangeLog(self.TEST_FILE).record("add", "U2"), 4)
+
+    def test_trimmed_file(self):
+        reader = ChangeLog(self.TEST_FILE, max_entries=3)
+        writer = ChangeLog(self.TEST_FILE, max_entries=3)
+        writer.record("add", "U1")
+        self.assertEqual(reader.since(0, 10)["last_seq"], 1)
+        writer.record_many("add", [(f"U{i}", None) for i in range(2, 8)])
+        with open(self.TEST_FILE) as file:
+            self.assertEqual(len(file.readlines()), 4)  # epoch and the last 3 changes
+        body = reader.since(4, 10)
+        self.assertEqual([c["seq"] for c in body["changes"]], [5, 6, 7])
+        self.assertTrue(reader.since(3, 10)["resync_required"])
+        self.assertEqual(reader.record("exit", "U7"), 8)
+
+
+class TestCSVStoreInvalidation(unittest.TestCase):
+    TEST_FILE = Path("app/database/test_invalidation.csv")
+
+    def setUp(self):
+        init_db(self.TEST_FILE)
+        reset_store(self.TEST_FILE)
+        # Two stores on one file stand in for two worker processes
+        self.worker_a = InventoryStore(self.TEST_FILE)
+        self.worker_b = InventoryStore(self.TEST_FILE)
+
+    def tearDown(self):
+        for path in (self.TEST_FILE, Path(f"{self.TEST_FILE}.lock")):
+            path.unlink(missing_ok=True)
+
+    def test_appends_and_rewrites_become_visible(self):
+        self.worker_a.add(InventoryItem(sku="A", lot="L1", uid="X1", received_by="AA", date="11111"))
+        self.worker_a.add(InventoryItem(sku="A", lot="L1", uid="X2", received_by="AA", date="11111"))
+        self.assertEqual(self.worker_b.count_by("lot", "L1"), 2)
+        self.assertEqual([item.uid for item in self.worker_b.iter_items()], ["X1", "X2"])
+
+        self.worker_b.set_status("X1", "0")
+        self.worker_b.delete("X2")
+        self.assertEqual(self.worker_a.get("X1").status, "0")
+        self.assertNotIn("X2", self.worker_a)
+        self.assertEqual(self.worker_a.summary(), self.worker_b.summary())
+
+    def test_no_lost_update_between_workers(self):
+        self.worker_a.add(InventoryItem(sku="A", lot="L1", uid="X1", received_by="AA", date="11111"))
+        self.worker_b.add(InventoryItem(sku="A", lot="L1", uid="X2", received_by="AA", date="11111"))
+        # worker_a has not read X2 yet; its rewrite must not drop it
+        self.worker_a.set_status("X1", "0")
+        self.assertEqual(len(InventoryStore(self.TEST_FILE)), 2)
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.worker_a.add(InventoryItem(sku="A", lot="L1", uid="X1", received_by="AA", date="11111"))
+        self.worker_b.get("X1")
+        items = self.worker_b._items
+        self.worker_b.get("X1")
+        self.assertIs(self.worker_b._items, items)
+
+
+class TestSQLiteInventoryDatabase(TestInventoryDatabase):
+    TEST_FILE = Path("app/database/test_inventory.db")
+
+    def tearDown(self):
+        super().tearDown()
+        for suffix in ("-wal", "-shm"):
+            Path(f"{self.TEST_FILE}{suffix}").unlink(missing_ok=True)
+
+    def test_changes_written_through_to_disk(self):
+        add_item(InventoryItem(sku="006", lot="L006", uid="U006", received_by="GH", date="12349"), self.TEST_FILE)
+        exit_item("U006", self.TEST_FILE)
+
+        reset_store(self.TEST_FILE)
+        self.assertEqual(find_item_by_uid("U006", self.TEST_FILE).status, "0")
+
+    def test_migrate_from_csv(self):
+        csv_file = Path("app/database/test_migration.csv")
+        init_db(csv_file)
+        try:
+            add_item(InventoryItem(sku="AAA", lot="B1", uid="ID1", received_by="AA", date="11111", price=9.5), csv_file)
+            add_item(InventoryItem(sku="AAA", lot="B1", uid="ID2", received_by="AA", date="11112"), csv_file)
+            self.assertEqual(migrate_csv_to_sqlite(csv_file, self.TEST_FILE), 2)
+            # Una segunda migración no duplica filas
+            self.assertEqual(migrate_csv_to_sqlite(csv_file, self.TEST_FILE), 0)
+        finally:
+            reset_store(csv_file)
+            for path in (csv_file, ledger_path(csv_file), changelog_path(csv_file)):
+                path.unlink(missing_ok=True)
+                Path(f"{path}.lock").unlink(missing_ok=True)
+
+        self.assertEqual(count_items_by_lot("B1", self.TEST_FILE), 2)
+        self.assertEqual(find_item_by_uid("ID1", self.TEST_FILE).price, 9.5)
+
+
+
+class TestRecordInventoryDatabase(TestInventoryDatabase):
+    TEST_FILE = Path("app/database/test_inventory.rec")
+
+    def tearDown(self):
+        super().tearDown()
+        Path(f"{self.TEST_FILE}.journal").unlink(missing_ok=True)
+
+    def _item(self, uid, **fields):
+        return InventoryItem(**{"sku": "AAA", "lot": "B1", "uid": uid, "received_by": "AA", "date": "11111", **fields})
+
+    def test_changes_written_through_to_disk(self):
+        add_item(self._item("U006"), self.TEST_FILE)
+        add_item(self._item("U007"), self.TEST_FILE)
+        size = self.TEST_FILE.stat().st_size
+        exit_item("U006", self.TEST_FILE)
+        delete_item("U007", self.TEST_FILE)
+        # Exits and deletes write inside the existing records
+        self.assertEqual(self.TEST_FILE.stat().st_size, size)
+
+        reset_store(self.TEST_FILE)
+        self.assertEqual([item.uid for item in get_all_items(self.TEST_FILE)], ["U006"])
+        self.assertEqual(find_item_by_uid("U006", self.TEST_FILE).status, "0")
+
+    def test_status_flip_writes_one_byte(self):
+        add_items_bulk([self._item(f"U{n}", price=n) for n in range(3)], self.TEST_FILE)
+        data = self.TEST_FILE.read_bytes()
+        exit_item("U1", self.TEST_FILE)
+        changed = [i for i, (a, b) in enumerate(zip(data, self.TEST_FILE.read_bytes())) if a != b]
+        # The status byte of the second record, plus the version stamp in the header
+        self.assertIn(HEADER_SIZE + RECORD.size + 1, changed)
+        self.assertTrue(all(i < HEADER_SIZE for i in changed if i != HEADER_SIZE + RECORD.size + 1))
+
+    def test_tombstones_and_compaction(self):
+        add_items_bulk([self._item(f"U{n:02d}", price=n) for n in range(20)], self.TEST_FILE)
+        for n in range(0, 20, 3):
+            delete_item(f"U{n:02d}", self.TEST_FILE)
+        store = RecordStore(self.TEST_FILE)
+        try:
+            self.assertEqual(store.stats()["tombstones"], 7)
+            self.assertEqual(store.compact(), 7)
+            self.assertEqual(store.stats()["used_slots"], 13)
+            # Order and content survive, and the other store picks up the move
+            self.assertEqual([item.uid for item in store.all()], [f"U{n:02d}" for n in range(20) if n % 3])
+            exit_item("U19", self.TEST_FILE)
+            self.assertEqual(store.get("U19").status, "0")
+            self.assertEqual(get_summary(self.TEST_FILE), store.summary())
+        finally:
+            store.close()
+
+    def test_in_place_writes_do_not_reload_other_stores(self):
+        add_items_bulk([self._item(f"U{n}", price=n) for n in range(4)], self.TEST_FILE)
+        store = RecordStore(self.TEST_FILE)
+        try:
+            store.all()
+            store.load = None  # a full reload would fail
+            exit_item("U1", self.TEST_FILE)
+            update_item("U2", self._item("U9", lot="B2", price=7), self.TEST_FILE)
+            delete_item("U3", self.TEST_FILE)
+            add_item(self._item("U4"), self.TEST_FILE)
+            exit_item("U4", self.TEST_FILE)
+            self.assertEqual([(item.uid, item.status) for item in store.all()],
+                             [("U0", "1"), ("U1", "0"), ("U9", "1"), ("U4", "0")])
+            self.assertEqual(store.get("U9").price, 7)
+            self.assertIsNone(store.get("U2"))
+            self.assertEqual([item.uid for item in store.iter_items()], ["U0", "U1", "U4", "U9"])
+            self.assertEqual((store.count_by("lot", "B2"), store.stats()["tombstones"]), (1, 1))
+            self.assertEqual(store.summary(), get_summary(self.TEST_FILE))
+        finally:
+            store.close()
+
+    def test_fields_must_fit_the_record(self):
+        with self.assertRaises(ValueError):
+            add_item(self._item("U" * 33), self.TEST_FILE)
+        with self.assertRaises(ValueError):
+            add_items_bulk([self._item("U1"), self._item("U2", lot="L" * 17)], self.TEST_FILE)
+        self.assertEqual(get_all_items(self.TEST_FILE), [])
+
+    def test_migrate_from_csv(self):
+        csv_file = Path("app/database/test_migration.csv")
+        init_db(csv_file)
+        try:
+            add_item(self._item("ID1", price=9.5), csv_file)
+            add_item(self._item("ID2"), csv_file)
+            self.assertEqual(migrate_csv_to_records(csv_file, self.TEST_FILE), 2)
+            self.assertEqual(migrate_csv_to_records(csv_file, self.TEST_FILE), 0)
+        finally:
+            reset_store(csv_file)
+            for path in (csv_file, ledger_path(csv_file), changelog_path(csv_file)):
+                path.unlink(missing_ok=True)
+                Path(f"{path}.lock").unlink(missing_ok=True)
+        reset_store(self.TEST_FILE)
+        self.assertEqual(find_item_by_uid("ID1", self.TEST_FILE).price, 9.5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,523 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from pydantic import ValidationError
+from app.rfid.dedupe import TagDeduplicator
+from app.utils.event_bus import EventBus
+from app.utils.metrics import Registry
+from app.rfid.writer import build_write_frame
+from app.rfid.encoder import EncodeJob, EncodeJobManager
+from app.rfid.ingest_queue import IngestQueue
+from app.rfid.manager import ReaderManager, ReaderConfig
+from app.rfid.portal import PortalTracker
+from app.rfid.reader import RFIDReader
+from app.rfid.simulator import SimulatedSerial, TagPopulation, register_simulator, unregister_simulator
+from app.rfid.transport import close_transport
+from app.rfid.writer import write_tag, read_tag_epc
+from app.models.item import InventoryItem
+from app.models.record import ItemRecord
+from app.models.epc import EPCError, decode_epc, decode_epcs, encode_binary, encode_epc, encode_epcs
+from app.rfid.protocol import (
+    Frame, FrameParser, TagNotification, build_frame, build_multi_poll, build_notification, CMD_ERROR,
+    CMD_SINGLE_POLL, CMD_STOP_MULTI_POLL, TYPE_NOTIFICATION, TYPE_RESPONSE
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTagDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dedupe = TagDeduplicator(ttl=5, max_size=2, clock=self.clock)
+
+    def test_repeated_reads_are_suppressed(self):
+        self.assertTrue(self.dedupe.is_new("EPC1"))
+        self.clock.now = 1
+        self.assertFalse(self.dedupe.is_new("EPC1"))
+        self.clock.now = 4
+        self.assertFalse(self.dedupe.is_new("EPC1"))
+        self.assertEqual(self.dedupe.suppressed, 2)
+        self.assertEqual(self.dedupe.passed, 1)
+
+    def test_tag_passes_again_after_ttl(self):
+        self.assertTrue(self.dedupe.is_new("EPC1"))
+        self.clock.now = 5
+        self.assertTrue(self.dedupe.is_new("EPC1"))
+
+    def test_cache_is_bounded(self):
+        for epc in ("EPC1", "EPC2", "EPC3"):
+            self.assertTrue(self.dedupe.is_new(epc))
+        # EPC1 fue desalojado por ser el menos reciente
+        self.assertEqual(self.dedupe.stats()["cached_tags"], 2)
+        self.assertTrue(self.dedupe.is_new("EPC1"))
+        self.assertFalse(self.dedupe.is_new("EPC3"))
+
+
+class TestFrameParser(unittest.TestCase):
+    def test_build_frame_matches_reader_command(self):
+        self.assertEqual(build_frame(0x22), bytes([0xAA, 0x00, 0x22, 0x00, 0x00, 0x22, 0xDD]))
+
+    def test_write_frame(self):
+        frame = build_write_frame("1A1X9DC22425")
+        self.assertEqual(frame.hex(' ').upper(),
+                         "AA 00 49 00 15 00 00 00 00 01 00 02 00 06 31 41 31 58 39 44 43 32 32 34 32 35 21 DD")
+        with self.assertRaises(ValueError):
+            build_write_frame("1234567890123")
+
+    def test_decode_notification(self):
+        frame = build_notification(b"1A1X1DC22425", rssi=0xC9, pc=0x3000, crc=0xBEEF)
+        tags = FrameParser().feed_tags(frame)
+        self.assertEqual(tags, [TagNotification(rssi=-55, pc=0x3000, epc=b"1A1X1DC22425", crc=0xBEEF)])
+        self.assertEqual(tags[0].epc_ascii, "1A1X1DC22425")
+
+    def test_frames_split_across_reads(self):
+        stream = build_notification(b"AAAAAAAAAAAA") + build_notification(b"BBBBBBBBBBBB")
+        parser = FrameParser()
+        tags = []
+        for i in range(0, len(stream), 5):
+            tags += parser.feed_tags(stream[i:i + 5])
+        self.assertEqual([tag.epc_ascii for tag in tags], ["AAAAAAAAAAAA", "BBBBBBBBBBBB"])
+        self.assertEqual(parser.stats()["buffered_bytes"], 0)
+
+    def test_resync_after_corrupted_frame(self):
+        bad = bytearray(build_notification(b"CCCCCCCCCCCC"))
+        bad[10] ^= 0xFF
+        error = build_frame(CMD_ERROR, b"\x15", frame_type=TYPE_RESPONSE)
+        parser = FrameParser()
+        frames = parser.feed(b"\x00\x13" + bytes(bad) + error + build_notification(b"DDDDDDDDDDDD"))
+        self.assertEqual([frame.command for frame in frames], [CMD_ERROR, 0x22])
+        self.assertEqual(frames[0].error_code, 0x15)
+        self.assertEqual(parser.checksum_errors, 1)
+
+
+class TestMultiPollFrames(unittest.TestCase):
+    EPCS = [b"1A1U1DC22425", b"1A1U2DC22425", b"2B2U3DC22425"]
+
+    def setUp(self):
+        self.serial = SimulatedSerial(TagPopulation(self.EPCS, seed=1), timeout=0.05, rounds_per_second=200, seed=1)
+        self.parser = FrameParser()
+
+    def read_frames(self, until, seconds=2.0):
+        # Frames from the simulated port until ``until(frames)`` or an empty read after the deadline
+        frames = []
+        deadline = time.monotonic() + seconds
+        while not until(frames):
+            data = self.serial.read(256)
+            if not data and time.monotonic() > deadline:
+                break
+            frames += self.parser.feed(data)
+        return frames
+
+    def test_multi_poll_yields_tags_across_frames(self):
+        self.serial.write(build_multi_poll(4))
+        frames = self.read_frames(lambda frames: len(frames) >= 4 * len(self.EPCS))
+        # One notification frame per tag and round, as single polls would send them
+        self.assertEqual(len(frames), 4 * len(self.EPCS))
+        self.assertTrue(all((f.frame_type, f.command) == (TYPE_NOTIFICATION, CMD_SINGLE_POLL) for f in frames))
+        epcs = [TagNotification.from_frame(frame).epc for frame in frames]
+        self.assertEqual(sorted(set(epcs)), self.EPCS)
+        self.assertTrue(all(epcs.count(epc) == 4 for epc in self.EPCS))
+        # The run is over: nothing else arrives
+        self.assertEqual(self.read_frames(lambda frames: False, seconds=0.1), [])
+
+    def test_stop_ends_a_multi_poll(self):
+        self.serial.write(build_multi_poll(10000))
+        self.assertTrue(self.read_frames(lambda frames: len(frames) >= 2 * len(self.EPCS)))
+        self.serial.write(build_frame(CMD_STOP_MULTI_POLL))
+        frames = self.read_frames(lambda frames: frames and frames[-1].command == CMD_STOP_MULTI_POLL)
+        # Rounds already sent may still be in the buffer; the stop answer comes last
+        stop = frames[-1]
+        self.assertEqual((stop.frame_type, stop.params), (TYPE_RESPONSE, b"\x00"))
+        self.assertTrue(all(frame.command == CMD_SINGLE_POLL for frame in frames[:-1]))
+        self.assertEqual(self.read_frames(lambda frames: False, seconds=0.1), [])
+        self.assertEqual(self.parser.checksum_errors, 0)
+
+
+class TestEventBus(unittest.TestCase):
+    def test_fan_out_from_another_thread(self):
+        async def scenario():
+            bus = EventBus(queue_size=10)
+            first, second = bus.subscribe(), bus.subscribe()
+            publisher = threading.Thread(target=bus.publish, args=({"epc": "EPC1"},))
+            publisher.start()
+            publisher.join()
+            return await first.get(), await second.get()
+
+        self.assertEqual(asyncio.run(scenario()), ({"epc": "EPC1"}, {"epc": "EPC1"}))
+
+    def test_slow_consumer_drops_oldest(self):
+        async def scenario():
+            bus = EventBus(queue_size=2)
+            subscription = bus.subscribe()
+            for n in range(5):
+                bus.publish({"n": n})
+            await asyncio.sleep(0)
+            received = [await subscription.get(), await subscription.get()]
+            subscription.close()
+            return received, subscription.dropped, bus.stats()["subscribers"]
+
+        received, dropped, subscribers = asyncio.run(scenario())
+        self.assertEqual(received, [{"n": 3}, {"n": 4}])
+        self.assertEqual(dropped, 3)
+        self.assertEqual(subscribers, 0)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = Registry()
+        requests = registry.counter("requests", "Requests served.", ("path",))
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        requests.labels(path="/a").inc()
+        requests.labels(path="/a").inc(2)
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+        registry.register_collector(lambda: [("queue_depth", "gauge", "Depth.", [({"q": 'x"y'}, 3)])])
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE requests counter", lines)
+        self.assertIn('requests_total{path="/a"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{le="1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("latency_seconds_count 3", lines)
+        self.assertIn('queue_depth{q="x\\"y"} 3', lines)
+
+    def test_counter_is_thread_safe(self):
+        counter = Registry().counter("hits", "Hits.")
+        threads = [threading.Thread(target=lambda: [counter.inc() for _ in range(10000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.labels().value, 40000)
+
+
+class TestIngestQueue(unittest.TestCase):
+    def test_batches_by_size_and_delay(self):
+        batches = []
+        ingest = IngestQueue(batches.append, batch_size=4, max_delay=0.05)
+        for n in range(10):
+            ingest.put(n)
+        self.assertTrue(ingest.flush(timeout=2))
+        self.assertEqual([event for batch in batches for event in batch], list(range(10)))
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(ingest.stats()["applied"], 10)
+
+    def test_drop_policy_never_blocks(self):
+        release = threading.Event()
+        ingest = IngestQueue(lambda batch: release.wait(2), max_size=2, batch_size=1, policy="drop")
+        ingest.put("first")  # taken by the worker, which then waits
+        time.sleep(0.05)
+        accepted = [ingest.put(n) for n in range(5)]
+        release.set()
+        ingest.flush(timeout=2)
+        self.assertEqual(accepted, [True, True, False, False, False])
+        self.assertEqual(ingest.stats()["dropped"], 3)
+
+    def test_block_policy_waits_for_room(self):
+        release = threading.Event()
+        ingest = IngestQueue(lambda batch: release.wait(2), max_size=1, batch_size=1, policy="block")
+        ingest.put("first")
+        time.sleep(0.05)
+        ingest.put("second")
+        blocked = threading.Thread(target=ingest.put, args=("third",))
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+        release.set()
+        blocked.join(2)
+        self.assertTrue(ingest.flush(timeout=2))
+        self.assertEqual(ingest.stats()["dropped"], 0)
+        self.assertEqual(ingest.stats()["applied"], 3)
+
+    def test_failed_batch_does_not_stop_the_worker(self):
+        batches = []
+
+        def apply(batch):
+            if "bad" in batch:
+                raise IOError("disk full")
+            batches.append(batch)
+
+        ingest = IngestQueue(apply, batch_size=1)
+        ingest.put("bad")
+        ingest.put("good")
+        self.assertTrue(ingest.flush(timeout=2))
+        self.assertEqual(batches, [["good"]])
+        self.assertEqual(ingest.stats()["errors"], 1)
+
+
+class TestEncodeJob(unittest.TestCase):
+    def test_write_verify_and_retry(self):
+        tag_memory = {"epc": ""}
+        writes = []
+
+        def write(epc):
+            writes.append(epc)
+            # La primera escritura de U2 "falla" en silencio
+            if not (epc == "2A1U2DC22425" and writes.count(epc) == 1):
+                tag_memory["epc"] = epc
+            return True
+
+        items = [
+            InventoryItem(sku="1", lot="A1", uid="U1", received_by="DC", date="22425"),
+            InventoryItem(sku="2", lot="A1", uid="U2", received_by="DC", date="22425"),
+            InventoryItem(sku="3", lot="A1", uid="TOO_LONG", received_by="DC", date="22425"),
+        ]
+        job = EncodeJob(items, retries=2, write=write, verify=lambda: tag_memory["epc"], epc_format="ascii")
+        job.run()
+        report = job.to_dict()
+
+        self.assertEqual(writes, ["1A1U1DC22425", "2A1U2DC22425", "2A1U2DC22425"])
+        self.assertEqual([tag["status"] for tag in report["tags"]], ["verified", "verified", "failed"])
+        self.assertEqual(report["tags"][1]["attempts"], 2)
+        self.assertEqual(report["status"], "done_with_errors")
+        self.assertEqual(report["progress"], 1.0)
+
+    def test_finished_jobs_are_evicted(self):
+        manager = EncodeJobManager(ttl=60, max_jobs=2)
+        item = InventoryItem(sku="1", lot="A1", uid="U1", received_by="DC", date="22425")
+        release = threading.Event()
+        done = [manager.submit(EncodeJob([item], write=lambda epc: True, verify=lambda: "")) for _ in range(3)]
+        running = manager.submit(EncodeJob([item], write=lambda epc: release.wait(5), verify=lambda: ""))
+        deadline = time.monotonic() + 5
+        while running.status != "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Only the 2 most recent finished jobs are kept, the running one stays
+        self.assertEqual(manager.all(), done[1:] + [running])
+        self.assertIsNone(manager.get(done[0].id))
+
+        manager._clock = lambda: time.monotonic() + 61
+        self.assertEqual(manager.all(), [running])
+        release.set()
+
+
+class TestEPCCodec(unittest.TestCase):
+    def test_binary_round_trip(self):
+        items = [
+            InventoryItem(sku="1", lot="A1", uid="U1", received_by="DC", date="22425"),
+            InventoryItem(sku="XY", lot="z", uid="zz-900", received_by="", date="36699"),
+        ]
+        epcs = encode_epcs(items)
+        self.assertEqual([len(epc) for epc in epcs], [24, 24])
+        self.assertTrue(epcs[0].startswith("01"))
+        self.assertEqual(decode_epcs(epcs), [ItemRecord.from_item(item) for item in items])
+        self.assertEqual(decode_epc(encode_binary(items[1])).uid, "zz-900")
+        self.assertEqual(InventoryItem.from_epc(epcs[0]), items[0])
+
+    def test_items_from_tags_are_validated(self):
+        with patch("app.models.epc._decode_ascii", return_value=ItemRecord("1", "A1", None, "DC", "22425")):
+            with self.assertRaises(ValidationError):
+                InventoryItem.from_epc("1A1U1DC22425")
+
+    def test_ascii_tags_still_decode(self):
+        self.assertEqual(decode_epc("1A1U1DC22425"), ItemRecord("1", "A1", "U1", "DC", "22425"))
+        self.assertEqual(decode_epc(b"1A1U1DC22425"), decode_epc("1A1U1DC22425"))
+        self.assertEqual(encode_epc(InventoryItem(sku="1", lot="A1", uid="U1", received_by="DC", date="22425"), "ascii"),
+                         "1A1U1DC22425")
+
+    def test_invalid_epcs(self):
+        good = encode_epc(InventoryItem(sku="1", lot="A1", uid="U1", received_by="DC", date="22425"))
+        self.assertEqual(decode_epcs([
+            "1A1U1DC",                        # short ASCII tag
+            "02" + good[2:],                  # unknown version
+            good[:-3] + "041",                # uid symbols after padding
+            good[:14] + "0000" + good[18:],   # day 0
+            good,
+        ]), [None, None, None, None, ItemRecord("1", "A1", "U1", "DC", "22425")])
+        for fields in ({"uid": "1234567"}, {"uid": "U_1"}, {"uid": ""}, {"date": "40025"}):
+            values = {**dict(sku="1", lot="A1", uid="U1", received_by="DC", date="22425"), **fields}
+            with self.assertRaises(EPCError):
+                encode_epc(InventoryItem(**values))
+
+
+class TestPortalTracker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.passages = []
+        self.portal = PortalTracker(lambda epc, direction, reader: self.passages.append((epc, direction)),
+                                    idle_timeout=2, max_tags=100, clock=self.clock)
+        self.portal._sweeper = False  # the tests sweep by hand
+
+    def read(self, at, epc, zone):
+        self.clock.now = at
+        self.portal.observe(epc, zone)
+
+    def test_one_write_per_passage(self):
+        for n in range(10):
+            self.read(n * 0.1, "IN", "outside" if n < 5 else "inside")
+            self.read(n * 0.1, "OUT", "inside" if n < 5 else "outside")
+        self.read(0.5, "STAY", "outside")
+        self.read(0.6, "BACK", "outside")
+        self.read(0.7, "BACK", "inside")
+        self.read(0.8, "BACK", "outside")
+        self.assertEqual(self.portal.sweep(now=2.5), 0)
+        self.assertEqual(self.portal.active()["BACK"]["zones"], ["outside", "inside", "outside"])
+
+        self.assertEqual(self.portal.sweep(now=3.0), 4)
+        self.assertEqual(sorted(self.passages), [("BACK", None), ("IN", "entry"), ("OUT", "exit"), ("STAY", None)])
+        self.assertEqual((self.portal.entries, self.portal.exits, self.portal.no_movement), (1, 1, 2))
+        self.assertEqual(self.portal.reads, 24)
+
+    def test_direction_after_many_zone_changes(self):
+        # A tag bouncing between the antennas more often than MAX_ZONE_CHANGES
+        for n in range(PortalTracker.MAX_ZONE_CHANGES + 3):
+            self.read(n * 0.1, "BOUNCE", "outside" if n % 2 == 0 else "inside")
+        self.read(2.0, "BOUNCE", "outside")
+        zones = self.portal.active()["BOUNCE"]["zones"]
+        self.assertEqual((len(zones), zones[-1]), (PortalTracker.MAX_ZONE_CHANGES, "outside"))
+        self.read(2.1, "BOUNCE", "inside")
+        self.portal.flush()
+        self.assertEqual(self.passages, [("BOUNCE", "entry")])
+
+    def test_stalest_passage_is_closed_when_full(self):
+        self.portal.max_tags = 3
+        for n, epc in enumerate(["A", "B", "C"]):
+            self.read(n, epc, "outside")
+        self.read(3, "A", "inside")
+        self.read(4, "D", "outside")
+        self.assertEqual(self.passages, [("B", None)])
+        self.portal.flush()
+        self.assertIn(("A", "entry"), self.passages)
+        self.assertEqual(self.portal.active(), {})
+
+
+class TestReaderManager(unittest.TestCase):
+    def test_configuration_is_validated(self):
+        manager = ReaderManager([ReaderConfig("dock1", port="COM6"), ReaderConfig("dock2", port="COM7", role="exit")])
+        with self.assertRaises(ValueError):
+            manager.add(ReaderConfig("dock3", port="COM6"))
+        with self.assertRaises(ValueError):
+            manager.add(ReaderConfig("dock3", port="COM8", role="shipping"))
+        with self.assertRaises(KeyError):
+            manager.start("unknown")
+
+        with self.assertRaises(ValueError):
+            manager.add(ReaderConfig("dock3", port="COM8", role="portal"))
+
+        self.assertEqual(manager.default, "dock1")
+        self.assertEqual([status["role"] for status in manager.statuses()], ["entry", "exit"])
+        self.assertFalse(manager.any_reading)
+
+
+class TestSimulatedReader(unittest.TestCase):
+    PORT = "sim-test"
+    EPCS = [b"1A1U1DC22425", b"1A1U2DC22425", b"2B2U3DC22425"]
+
+    def start_simulator(self, **options):
+        self.simulator = SimulatedSerial(TagPopulation(self.EPCS, seed=1), rounds_per_second=200, seed=1, **options)
+        register_simulator(self.PORT, self.simulator)
+
+    def tearDown(self):
+        close_transport(self.PORT)
+        unregister_simulator(self.PORT)
+
+    def read_for(self, reader, seconds):
+        tags = []
+        reader.start(tags.append)
+        time.sleep(seconds)
+        reader.stop()
+        return tags
+
+    def test_multi_poll_reads_every_tag_once(self):
+        self.start_simulator()
+        tags = self.read_for(RFIDReader(self.PORT, mode="multi", dedupe_ttl=5), 0.3)
+        self.assertEqual(sorted(tags), [epc.decode() for epc in self.EPCS])
+        self.assertGreater(self.simulator.frames_sent, len(self.EPCS))
+
+    def test_reader_metrics(self):
+        self.start_simulator()
+        manager = ReaderManager([ReaderConfig("dock", port=self.PORT, mode="multi", dedupe_ttl=5)],
+                                ingest=lambda epc, role, name: None)
+        manager.start("dock")
+        time.sleep(0.3)
+        manager.stop("dock")
+        values = {name: samples[0][1] for name, _, _, samples in manager.metric_families()}
+        self.assertEqual(values["rfid_tags_read_total"], len(self.EPCS))
+        self.assertGreater(values["rfid_dedupe_hits_total"], 0)
+        self.assertGreaterEqual(values["rfid_frames_parsed_total"],
+                                values["rfid_tags_read_total"] + values["rfid_dedupe_hits_total"])
+
+    def test_single_poll_mode(self):
+        self.start_simulator()
+        tags = self.read_for(RFIDReader(self.PORT, mode="single", dedupe_ttl=5), 0.3)
+        self.assertEqual(sorted(tags), [epc.decode() for epc in self.EPCS])
+
+    def test_corrupted_frames_are_dropped(self):
+        self.start_simulator(corrupt_probability=0.3)
+        reader = RFIDReader(self.PORT, mode="multi", dedupe_ttl=0)
+        tags = self.read_for(reader, 0.3)
+        self.assertTrue(tags)
+        self.assertTrue(set(tags) <= {epc.decode() for epc in self.EPCS})
+        self.assertGreater(reader.stats()["transport"]["checksum_errors"], 0)
+
+    def test_write_while_reading(self):
+        self.simulator = SimulatedSerial(TagPopulation([b"1A1U1DC22425"], seed=1), rounds_per_second=200, seed=1)
+        register_simulator(self.PORT, self.simulator)
+        reader = RFIDReader(self.PORT, mode="multi", dedupe_ttl=5)
+        tags = []
+        reader.start(tags.append)
+        time.sleep(0.1)
+        self.assertTrue(write_tag("9Z9U9DC22425", port=self.PORT))
+        self.assertEqual(read_tag_epc(port=self.PORT), "9Z9U9DC22425")
+        time.sleep(0.1)
+        reader.stop()
+        self.assertEqual(tags, ["1A1U1DC22425", "9Z9U9DC22425"])
+
+    def test_write_error_without_code(self):
+        empty_error = Frame(TYPE_RESPONSE, CMD_ERROR, b"")
+        with patch("app.rfid.writer.get_transport") as get_transport:
+            get_transport.return_value.request.return_value = empty_error
+            self.assertFalse(write_tag("9Z9U9DC22425", port=self.PORT))
+
+    def test_portal_readers_run_together(self):
+        outside = SimulatedSerial(TagPopulation([b"1A1U1DC22425"], seed=1), rounds_per_second=200, seed=1)
+        inside = SimulatedSerial(TagPopulation([], seed=2), rounds_per_second=200, seed=2)
+        register_simulator("sim-out", outside)
+        register_simulator("sim-in", inside)
+        passages = []
+        portal = PortalTracker(lambda epc, direction, reader: passages.append((epc, direction, reader)), idle_timeout=0.2)
+        manager = ReaderManager([ReaderConfig("door_out", port="sim-out", role="portal", zone="outside", mode="multi"),
+                                 ReaderConfig("door_in", port="sim-in", role="portal", zone="inside", mode="multi")],
+                                portal=portal.observe)
+        try:
+            manager.start_all()
+            time.sleep(0.1)
+            # The pallet moves through the door
+            outside.population.remove(b"1A1U1DC22425")
+            inside.population.add(b"1A1U1DC22425")
+            time.sleep(0.1)
+            inside.population.remove(b"1A1U1DC22425")
+            time.sleep(0.5)
+            manager.stop_all()
+        finally:
+            for port in ("sim-out", "sim-in"):
+                close_transport(port)
+                unregister_simulator(port)
+        self.assertEqual(passages, [("1A1U1DC22425", "entry", "door_in")])
+        self.assertGreater(portal.reads, 2)
+
+    def test_binary_epcs_reach_the_callback_intact(self):
+        epc = encode_binary(ItemRecord("1", "A1", "U00001", "DC", "22425"))
+        self.simulator = SimulatedSerial(TagPopulation([epc, b"1A1U1DC22425"], seed=1), rounds_per_second=200, seed=1)
+        register_simulator(self.PORT, self.simulator)
+        tags = self.read_for(RFIDReader(self.PORT, mode="multi", dedupe_ttl=5), 0.2)
+        self.assertEqual(sorted(tags), [epc.hex().upper(), "1A1U1DC22425"])
+        self.assertEqual([record.uid for record in decode_epcs(sorted(tags))], ["U00001", "U1"])
+
+        # Writing a binary EPC and reading it back gives the same text
+        self.simulator.population.remove(b"1A1U1DC22425")
+        binary = encode_epc(InventoryItem(sku="9", lot="Z9", uid="U99999", received_by="DC", date="22425"))
+        self.assertTrue(write_tag(binary, port=self.PORT))
+        self.assertEqual(read_tag_epc(port=self.PORT), binary)
+
+
+if __name__ == "__main__":
+    unittest.main()
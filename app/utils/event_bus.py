@@ -0,0 +1,86 @@
+# UltraSteelChallenge/app/utils/event_bus.py
+
+import asyncio
+import threading
+from app.config import EVENT_QUEUE_SIZE
+
+
+class Subscription:
+    """
+    One consumer of an EventBus, with its own bounded queue.
+
+    When the consumer falls behind and the queue is full, the oldest event is
+    dropped so a slow dock screen never blocks the reader or other clients.
+    """
+
+    def __init__(self, bus: "EventBus", loop: asyncio.AbstractEventLoop, maxsize: int):
+        self._bus = bus
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, event: dict):
+        # Runs inside the subscriber's event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    Fan-out bus that takes events from any thread (e.g. the RFID reader thread)
+    and delivers a copy to every asyncio subscriber.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        """
+        Register a new consumer. Must be called from inside a running event loop.
+        """
+        subscription = Subscription(self, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: dict):
+        """
+        Deliver ``event`` to every subscriber. Safe to call from any thread; never blocks.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # The subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "published": self.published,
+            "subscribers": len(subscribers),
+            "dropped": sum(subscription.dropped for subscription in subscribers),
+        }
+
+
+# Tag reads coming from the RFID pipeline
+tag_events = EventBus()